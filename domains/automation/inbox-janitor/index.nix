@@ -65,12 +65,43 @@ in
         Recommended rollout: deploy with dryRun=true, watch `journalctl -u inbox-janitor`
         for a few cycles, then set false.'';
     };
+
+    watch = lib.mkOption {
+      type = lib.types.bool;
+      default = false;
+      description = ''
+        Also run `inbox-janitor --watch`: a long-lived inotify watcher that drains
+        loose files as they land instead of waiting for the next timer tick. The
+        timer keeps running as the catch-up and reporting pass; a drain lock keeps
+        the two from moving files at the same time. Honours dryRun.'';
+    };
   };
 
   #==========================================================================
   # IMPLEMENTATION
   #==========================================================================
   config = lib.mkIf cfg.enable {
+    systemd.services.inbox-janitor-watch = lib.mkIf cfg.watch {
+      description = "Drain ~/000_inbox/downloads as files land (inotify)";
+      wantedBy = [ "multi-user.target" ];
+      after = [ "syncthing.service" ];
+      wants = [ "syncthing.service" ];
+      serviceConfig = {
+        Type = "simple";
+        User = cfg.user;
+        Group = "users";
+        ExecStart =
+          "${lib.getExe janitorBin} --config ${cfg.rulesFile} --watch"
+          + lib.optionalString (!cfg.dryRun) " --apply";
+        Restart = "on-failure";
+        RestartSec = "30s";
+        Environment = [
+          "HOME=/home/${cfg.user}"
+          "SYNCTHING_CONFIG=/home/${cfg.user}/.config/syncthing/config.xml"
+        ];
+      };
+    };
+
     systemd.services.inbox-janitor = {
       description = "Drain ~/000_inbox/downloads per the routing rule table";
       # Ordered after Syncthing so the post-move rescan (republish) can reach the
@@ -16,29 +16,53 @@ ARCHITECTURE (hexagonal):
   CORE (pure, no I/O):
     - FILTERS registry: each filter is (FileMeta, param) -> dict|None.
         None = no match. dict = matched, plus any emitted template vars.
+        Built-ins are COMPILERS: param -> predicate closure, parsed once.
+    - compile_rules(): the rule table -> a RuleSet of predicates, indexed by
+        extension. Done once per run, not once per file.
     - classify(): quarantine > rules (first match wins) > fallback. Pure.
     - render()/target_name(): build the new name from a template + vars. Pure.
   EDGES (all side effects, isolated):
+    - iter_entries(): scandir walk; each DirEntry's cached stat feeds gather().
     - gather(): stat + xattr + mimetype -> a FileMeta parsed once at the boundary.
-    - apply_move(): mkdir + move + conflict handling.
+        gather_all() runs it in a thread pool (--workers), order preserved.
+    - run(): plans every move first (unique() checks a DestNames listing, one
+        scandir per dest dir), then applies them grouped by dest: one mkdir each.
     - republish(): tell Syncthing to re-index touched paths (the v1 sync bug).
+        One scan per outermost touched dir.
         Late-bound: only fires if SYNCTHING_* env is injected by the unit.
+    - Journal: SQLite state outside the inbox. Files already found in their
+        bucket (inode + mtime/ctime + size) are skipped before gather(), and
+        per-dir counts let report_unexpected_dirs() relist only changed dirs.
+    - watch(): --watch daemon; inotify feeds newly landed files to run().
 
 SAFETY: dry-run by default; host-guarded (single-writer); fail-loud to _review.
 """
 from __future__ import annotations
 
 import argparse
+import ctypes
+import ctypes.util
 import datetime as dt
+import fcntl
+import fnmatch
+import hashlib
+import json
 import mimetypes
+import operator
 import os
 import re
+import select
 import shutil
 import socket
+import sqlite3
+import struct
 import sys
+import threading
+import time
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from typing import Any, Callable, Optional
 
@@ -89,78 +113,119 @@ def stem_of(name: str, ext: str) -> str:
 
 
 # ---- filter registry: the expansion seam. Add a filter = add a function. ----
+# Two kinds of entry, same YAML surface:
+#   @filt(name):     (FileMeta, param) -> dict|None, interpreted per file.
+#   @compiler(name): (param, now) -> Predicate, run ONCE when the rule table is
+#                    compiled; the returned closure holds the parsed regexes /
+#                    thresholds, so per-file work is just the comparison.
+# Built-ins are compilers (each also gets a FILTERS entry for direct calls);
+# a plain @filt still works and is wrapped at compile time.
 FilterFn = Callable[[FileMeta, Any], Optional[dict]]
+Predicate = Callable[[FileMeta], Optional[dict]]
+CompilerFn = Callable[[Any, dt.datetime], Predicate]
 FILTERS: dict[str, FilterFn] = {}
+COMPILERS: dict[str, CompilerFn] = {}
 
 
 def filt(name: str):
     def reg(fn: FilterFn) -> FilterFn:
         FILTERS[name] = fn
+        COMPILERS.pop(name, None)
         return fn
     return reg
 
 
-@filt("ext")
-def _f_ext(m: FileMeta, param) -> Optional[dict]:
-    wanted = [str(e).lower().lstrip(".") for e in param]
-    return {} if m.ext in wanted else None
+def compiler(name: str):
+    def reg(fn: CompilerFn) -> CompilerFn:
+        COMPILERS[name] = fn
+        FILTERS[name] = lambda m, param: fn(param, dt.datetime.now())(m)
+        return fn
+    return reg
+
+
+def _ext_list(param) -> frozenset:
+    return frozenset(str(e).lower().lstrip(".") for e in param)
 
 
-@filt("mimetype")
-def _f_mimetype(m: FileMeta, param) -> Optional[dict]:
+@compiler("ext")
+def _f_ext(param, now) -> Predicate:
+    wanted = _ext_list(param)
+    return lambda m: {} if m.ext in wanted else None
+
+
+@compiler("mimetype")
+def _f_mimetype(param, now) -> Predicate:
     # partial / prefix match, e.g. "image/" matches "image/png"
-    prefixes = [param] if isinstance(param, str) else list(param)
-    return {} if m.mimetype and any(m.mimetype.startswith(p) for p in prefixes) else None
+    prefixes = (param,) if isinstance(param, str) else tuple(param)
+    return lambda m: {} if m.mimetype and m.mimetype.startswith(prefixes) else None
 
 
-@filt("name")
-def _f_name(m: FileMeta, param: dict) -> Optional[dict]:
-    n = m.name
-    if "startswith" in param and not n.startswith(param["startswith"]):
-        return None
-    if "endswith" in param and not n.endswith(param["endswith"]):
-        return None
-    if "contains" in param and param["contains"] not in n:
-        return None
-    if "glob" in param and not Path(n).match(param["glob"]):
+def _glob_regex(pattern: str) -> Optional[re.Pattern]:
+    """Path(name).match(pattern) for a bare filename, as one compiled regex.
+    A multi-part or absolute pattern can never match a single name -> None."""
+    if not pattern:
+        raise ValueError("empty glob pattern")
+    if "/" in pattern.strip("/") or pattern.startswith("/"):
         return None
+    return re.compile(fnmatch.translate(pattern.rstrip("/")))
+
+
+@compiler("name")
+def _f_name(param: dict, now) -> Predicate:
+    startswith, endswith, contains = param.get("startswith"), param.get("endswith"), param.get("contains")
+    glob = _glob_regex(param["glob"]) if "glob" in param else False
     if "iregex" in param:
-        mo = re.search(param["iregex"], n, re.I)
-        if not mo:
+        rx = re.compile(param["iregex"], re.I)
+    elif "regex" in param:
+        rx = re.compile(param["regex"])
+    else:
+        rx = None
+
+    def pred(m: FileMeta) -> Optional[dict]:
+        n = m.name
+        if startswith is not None and not n.startswith(startswith):
+            return None
+        if endswith is not None and not n.endswith(endswith):
+            return None
+        if contains is not None and contains not in n:
             return None
-        return dict(mo.groupdict())
-    if "regex" in param:
-        mo = re.search(param["regex"], n)
-        if not mo:
+        if glob is not False and (glob is None or not glob.match(n)):
             return None
-        return dict(mo.groupdict())
-    return {}
+        if rx is not None:
+            mo = rx.search(n)
+            return dict(mo.groupdict()) if mo else None
+        return {}
+    return pred
 
 
-@filt("size")
-def _f_size(m: FileMeta, param: str) -> Optional[dict]:
-    mo = re.match(r"\s*(>=|<=|>|<|==)\s*([\d.]+)\s*([kmgt]?b?)\s*$", str(param), re.I)
+_SIZE = re.compile(r"\s*(>=|<=|>|<|==)\s*([\d.]+)\s*([kmgt]?b?)\s*$", re.I)
+_SIZE_UNITS = {"": 1, "b": 1, "kb": 1e3, "k": 1e3, "mb": 1e6, "m": 1e6,
+               "gb": 1e9, "g": 1e9, "tb": 1e12, "t": 1e12}
+_SIZE_OPS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt, "==": operator.eq}
+
+
+@compiler("size")
+def _f_size(param: str, now) -> Predicate:
+    mo = _SIZE.match(str(param))
     if not mo:
-        return None
-    op, num, unit = mo.group(1), float(mo.group(2)), mo.group(3).lower()
-    mult = {"": 1, "b": 1, "kb": 1e3, "k": 1e3, "mb": 1e6, "m": 1e6,
-            "gb": 1e9, "g": 1e9, "tb": 1e12, "t": 1e12}.get(unit, 1)
-    threshold = num * mult
-    ok = {">=": m.size >= threshold, "<=": m.size <= threshold, ">": m.size > threshold,
-          "<": m.size < threshold, "==": m.size == threshold}[op]
-    return {} if ok else None
-
-
-@filt("age")
-def _f_age(m: FileMeta, param: dict) -> Optional[dict]:
-    # {newer|older: "<N>d"} against mtime
-    now = dt.datetime.now()
-    age_days = (now - m.mtime).total_seconds() / 86400
-    if "newer" in param and age_days > _days(param["newer"]):
-        return None
-    if "older" in param and age_days < _days(param["older"]):
-        return None
-    return {}
+        return lambda m: None
+    op, threshold = _SIZE_OPS[mo.group(1)], float(mo.group(2)) * _SIZE_UNITS.get(mo.group(3).lower(), 1)
+    return lambda m: {} if op(m.size, threshold) else None
+
+
+@compiler("age")
+def _f_age(param: dict, now) -> Predicate:
+    # {newer|older: "<N>d"} against mtime, as mtime cutoffs fixed at compile time
+    newer = now - dt.timedelta(days=_days(param["newer"])) if "newer" in param else None
+    older = now - dt.timedelta(days=_days(param["older"])) if "older" in param else None
+
+    def pred(m: FileMeta) -> Optional[dict]:
+        if newer is not None and m.mtime < newer:
+            return None
+        if older is not None and m.mtime > older:
+            return None
+        return {}
+    return pred
 
 
 def _days(s) -> float:
@@ -171,39 +236,113 @@ def _days(s) -> float:
     return n * {"d": 1, "w": 7, "m": 30, "y": 365, "": 1}[u]
 
 
-def match_block(m: FileMeta, block: dict) -> Optional[dict]:
-    """AND across all filters in a match block; merge their emitted vars. Pure."""
-    emitted: dict = {}
+def compile_block(block: dict, now: dt.datetime) -> Predicate:
+    """One predicate for a match block: AND across its filters, merged vars."""
+    preds = []
     for fname, param in block.items():
-        fn = FILTERS.get(fname)
-        if fn is None:
+        if fname in COMPILERS:
+            preds.append(COMPILERS[fname](param, now))
+        elif fname in FILTERS:
+            fn = FILTERS[fname]
+            preds.append(lambda m, fn=fn, param=param: fn(m, param))
+        else:
             raise KeyError(f"unknown filter '{fname}' (known: {sorted(FILTERS)})")
-        out = fn(m, param)
-        if out is None:
-            return None
-        emitted.update(out)
-    return emitted
+    if len(preds) == 1:
+        return preds[0]
 
+    def pred(m: FileMeta) -> Optional[dict]:
+        emitted: dict = {}
+        for p in preds:
+            out = p(m)
+            if out is None:
+                return None
+            emitted.update(out)
+        return emitted
+    return pred
 
-def classify(m: FileMeta, cfg: dict) -> Decision:
-    """quarantine > rules (first match wins) > fallback. Pure."""
-    dl = Path(cfg["meta"]["inbox_root"]) / "downloads"
 
-    for q in cfg.get("quarantine", []):
-        v = match_block(m, q["match"])
-        if v is not None:
-            return Decision("quarantine", dl / q["dest"], rename=q.get("rename", False),
-                            reason=f"quarantine:{q['dest'].rstrip('/')}", vars=v)
+def match_block(m: FileMeta, block: dict) -> Optional[dict]:
+    """AND across all filters in a match block; merge their emitted vars. Pure."""
+    return compile_block(block, dt.datetime.now())(m)
+
+
+class _Tier:
+    """Ordered (predicate, decision) rules, indexed by extension.
+
+    A rule whose block has an `ext` filter can only match those extensions,
+    so each extension maps to the rules that could possibly match it, still
+    in table order; rules without `ext` are candidates for every extension.
+    First match wins exactly as in a linear scan, without testing the rest."""
 
-    for r in cfg.get("rules", []):
-        v = match_block(m, r["match"])
-        if v is not None:
-            return Decision("route", dl / r["dest"], rename=True,
-                            reason=r.get("name", r["dest"].rstrip("/")), vars=v)
+    def __init__(self, rules: list):
+        self.rules = rules                      # [(predicate, Decision, exts|None)]
+        self.by_ext: dict[str, list] = {}
+        for ext in {e for _, _, exts in rules if exts for e in exts}:
+            self.by_ext[ext] = [(p, d) for p, d, exts in rules if exts is None or ext in exts]
+        self.any_ext = [(p, d) for p, d, exts in rules if exts is None]
+
+    def first(self, m: FileMeta):
+        for pred, dec in self.by_ext.get(m.ext, self.any_ext):
+            v = pred(m)
+            if v is not None:
+                return dec, v
+        return None, None
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """The rule table compiled once: classify() is then pure predicate calls."""
+    quarantine: _Tier
+    rules: _Tier
+    fallback: Decision
+    horizons: tuple = ()            # `age` thresholds, seconds: where a decision can flip
+
+    def expires(self, mtime: float, now: float) -> Optional[float]:
+        """When the decision for a file with this mtime can next change (None: never).
+        An `age` filter flips exactly when now crosses mtime + threshold."""
+        return min((mtime + h for h in self.horizons if mtime + h > now), default=None)
+
+    def classify(self, m: FileMeta) -> Decision:
+        """quarantine > rules (first match wins) > fallback. Pure."""
+        for tier in (self.quarantine, self.rules):
+            dec, v = tier.first(m)
+            if dec is not None:
+                return replace(dec, vars=v) if v else dec
+        return self.fallback
+
+
+def compile_rules(cfg: dict, now: Optional[dt.datetime] = None) -> RuleSet:
+    """Parse the rule table into predicates + prebuilt Decisions. `age`
+    thresholds are taken relative to `now` (default: compile time)."""
+    now = now or dt.datetime.now()
+    dl = Path(cfg["meta"]["inbox_root"]) / "downloads"
+
+    def tier(entries, decide):
+        out = []
+        for e in entries:
+            exts = _ext_list(e["match"]["ext"]) if "ext" in e["match"] else None
+            out.append((compile_block(e["match"], now), decide(e), exts))
+        return _Tier(out)
 
     fb = cfg["fallback"]["dest"]
-    return Decision("fallback", dl / fb, rename=cfg["fallback"].get("rename", True),
-                    reason="no rule matched")
+    ages = [e["match"]["age"] for e in list(cfg.get("quarantine", [])) + list(cfg.get("rules", []))
+            if "age" in e["match"]]
+    return RuleSet(
+        quarantine=tier(cfg.get("quarantine", []), lambda q: Decision(
+            "quarantine", dl / q["dest"], rename=q.get("rename", False),
+            reason=f"quarantine:{q['dest'].rstrip('/')}")),
+        rules=tier(cfg.get("rules", []), lambda r: Decision(
+            "route", dl / r["dest"], rename=True, reason=r.get("name", r["dest"].rstrip("/")))),
+        fallback=Decision("fallback", dl / fb, rename=cfg["fallback"].get("rename", True),
+                          reason="no rule matched"),
+        horizons=tuple(sorted({_days(a[k]) * 86400 for a in ages for k in ("newer", "older") if k in a})),
+    )
+
+
+def classify(m: FileMeta, cfg: dict) -> Decision:
+    """quarantine > rules (first match wins) > fallback. Pure.
+    One-off convenience; run() compiles the table once via compile_rules()."""
+    return compile_rules(cfg).classify(m)
 
 
 # ---- naming (pure templating; no eval) --------------------------------------
@@ -245,8 +384,8 @@ def target_name(m: FileMeta, decision: Decision, cfg: dict) -> str:
 
 # ============================================================ EDGES (I/O) =====
 
-def gather(p: Path) -> FileMeta:
-    st = p.stat()
+def gather(p: Path, st: Optional[os.stat_result] = None) -> FileMeta:
+    st = st or p.stat()
     name = p.name
     ext = ext_of(name)
     mime = mimetypes.guess_type(name)[0] or ""
@@ -270,9 +409,11 @@ def source_host_of(p: Path) -> Optional[str]:
     return None
 
 
-def unique(dest_dir: Path, name: str, on_conflict: str) -> Optional[Path]:
+def unique(dest_dir: Path, name: str, on_conflict: str,
+           taken: Optional["DestNames"] = None) -> Optional[Path]:
+    exists = taken.exists if taken is not None else (lambda d, n: (d / n).exists())
     t = dest_dir / name
-    if not t.exists():
+    if not exists(dest_dir, name):
         return t
     if on_conflict == "skip":
         return None
@@ -280,36 +421,349 @@ def unique(dest_dir: Path, name: str, on_conflict: str) -> Optional[Path]:
         return t
     stem, dot, ext = name.partition(".")          # rename_new (default): counter
     i = 2
-    while (dest_dir / f"{stem}_{i}{dot}{ext}").exists():
+    while exists(dest_dir, f"{stem}_{i}{dot}{ext}"):
         i += 1
     return dest_dir / f"{stem}_{i}{dot}{ext}"
 
 
-def iter_files(cfg: dict, all_mode: bool, locations: Optional[list] = None):
-    """Default: loose files at downloads/ root (idempotent drain).
+class DestNames:
+    """Names present in each destination dir, listed once per dir and then
+    kept in step with the planned moves — so conflict checks for a whole run
+    cost one scandir per bucket instead of an exists() per candidate name,
+    and two files planned into the same name still get distinct targets."""
+
+    def __init__(self):
+        self._names: dict[Path, set] = {}
+        self._freed: dict[Path, set] = {}     # planned away before the dir was listed
+
+    def _dir(self, d: Path) -> set:
+        names = self._names.get(d)
+        if names is None:
+            try:
+                with os.scandir(d) as it:
+                    names = {e.name for e in it}
+            except OSError:
+                names = set()
+            names -= self._freed.pop(d, set())
+            self._names[d] = names
+        return names
+
+    def exists(self, d: Path, name: str) -> bool:
+        return name in self._dir(d)
+
+    def moved(self, src: Path, target: Path) -> None:
+        if src.parent in self._names:
+            self._names[src.parent].discard(src.name)
+        else:
+            self._freed.setdefault(src.parent, set()).add(src.name)
+        self._dir(target.parent).add(target.name)
+
+
+def iter_entries(cfg: dict, all_mode: bool, locations: Optional[list] = None):
+    """(Path, os.DirEntry) for every file to classify.
+
+    Default: loose files at downloads/ root (idempotent drain).
     --all: walk the whole downloads tree (reclassify / preview).
     --from LOC: walk only the given location(s) — relative to downloads/ or
     absolute. Lets you re-sort a specific subtree (e.g. migrating old folders)
-    without touching the rest. Destinations are still the downloads/ buckets."""
+    without touching the rest. Destinations are still the downloads/ buckets.
+
+    Built on os.scandir: file/dir tests come from the directory read itself,
+    and entry.stat() caches, so gather() gets the stat without another call."""
     dl = Path(cfg["meta"]["inbox_root"]) / "downloads"
     skip_dirs = {d.rstrip("/") for d in cfg.get("preview_skip_dirs", [])}
-    if locations:
-        roots = [Path(loc) if Path(loc).is_absolute() else dl / loc for loc in locations]
-    elif all_mode:
-        roots = [dl]
-    else:
-        for e in sorted(dl.iterdir()):
+    roots = walk_roots(cfg, all_mode, locations)
+    if not roots:
+        with os.scandir(dl) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for e in entries:
             if e.is_file() and not e.name.startswith("."):
-                yield e
+                yield dl / e.name, e
         return
     for base in roots:
-        if not base.exists():
+        if base.is_dir():
+            yield from _walk(base, skip_dirs)
+
+
+def walk_roots(cfg: dict, all_mode: bool, locations: Optional[list] = None) -> list[Path]:
+    """Trees walked by --from / --all; [] for the loose-root drain."""
+    dl = Path(cfg["meta"]["inbox_root"]) / "downloads"
+    if locations:
+        return [Path(loc) if Path(loc).is_absolute() else dl / loc for loc in locations]
+    return [dl] if all_mode else []
+
+
+def _walk(d: Path, skip_dirs: set):
+    """os.walk order (a dir's files, then its subdirs), without following links."""
+    try:
+        with os.scandir(d) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for e in entries:
+        if e.name.startswith("."):
             continue
-        for root, dirs, files in os.walk(base):
-            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in skip_dirs]
-            for fn in files:
-                if not fn.startswith("."):
-                    yield Path(root) / fn
+        try:
+            is_dir = e.is_dir()
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            yield d / e.name, e
+        elif e.name not in skip_dirs and not e.is_symlink():
+            subdirs.append(e.name)
+    for name in subdirs:
+        yield from _walk(d / name, skip_dirs)
+
+
+def iter_files(cfg: dict, all_mode: bool, locations: Optional[list] = None):
+    """Paths only; see iter_entries()."""
+    for path, _ in iter_entries(cfg, all_mode, locations):
+        yield path
+
+
+def gather_all(entries, workers: int,
+               settled: Optional[Callable[[Path, os.stat_result], bool]] = None):
+    """gather() each (Path, DirEntry|None) in a thread pool, in input order,
+    yielding (path, stat, FileMeta). stat and the xattr reads are blocking
+    syscalls that release the GIL, so on a Syncthing tree of thousands of
+    files they overlap instead of queueing.
+
+    FileMeta is None when `settled(path, stat)` says an earlier run already
+    found the file in place (Journal.settled); stat is None too when the file
+    vanished or can't be read mid-run."""
+    def one(item):
+        path, entry = item
+        try:
+            st = entry.stat() if entry is not None else path.stat()
+            if settled is not None and settled(path, st):
+                return path, st, None
+            return path, st, gather(path, st)
+        except OSError:
+            return path, None, None
+    if workers <= 1:
+        yield from map(one, entries)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(one, entries, chunksize=64)
+
+
+def default_workers() -> int:
+    return min(16, (os.cpu_count() or 2) * 4)
+
+
+# ---- journal: what earlier runs already settled -------------------------------
+# Kept outside the Syncthing tree (state_dir()), so it is never synced or routed.
+#   files: paths a run found already in their bucket, keyed by (inode, mtime,
+#          ctime, size) — ctime moves on rename and xattr writes too, so any
+#          change to a FileMeta input invalidates the row. `expires` is when an
+#          `age` rule could flip the decision (RuleSet.expires). Cleared when
+#          the rule table or this file changes (rules_fingerprint()).
+#   dirs:  direct file count + subdirs per dir, reused while the dir's mtime
+#          holds, so counting a big stray tree relists only what changed.
+_JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    ino      INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    expires  REAL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    files    INTEGER NOT NULL,
+    subdirs  TEXT NOT NULL
+);
+"""
+
+# Anything modified this recently may change again within one mtime tick
+# without its mtime moving, so it is never journalled (cf. git's "racy" index).
+_RACY_S = 2.0
+
+
+def state_dir() -> Path:
+    return Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local/state") / "inbox-janitor"
+
+
+def rules_fingerprint(cfg: dict) -> str:
+    h = hashlib.sha256(json.dumps(cfg, sort_keys=True, default=str).encode())
+    h.update(Path(__file__).read_bytes())       # a routing change in code, too
+    return h.hexdigest()
+
+
+def _stat_key(st: os.stat_result) -> tuple:
+    return st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size
+
+
+class Journal:
+    """Persisted record of settled files and per-dir counts (schema above).
+
+    A run loads it once (begin), checks it from gather threads (settled, a
+    dict lookup), and writes everything back in one transaction (finish)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_JOURNAL_SCHEMA)
+        self._lock = threading.Lock()
+
+    def begin(self, fingerprint: str) -> None:
+        with self._lock, self._db:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+            if row is None or row[0] != fingerprint:
+                self._db.execute("DELETE FROM files")
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (fingerprint,))
+            self._files = {path: (tuple(key), expires) for path, *key, expires in self._db.execute(
+                "SELECT path, ino, mtime_ns, ctime_ns, size, expires FROM files")}
+            self._dirs = {path: (mtime_ns, files, subdirs) for path, mtime_ns, files, subdirs in
+                          self._db.execute("SELECT path, mtime_ns, files, subdirs FROM dirs")}
+        self._now = time.time()
+        self._kept: set[str] = set()
+        self._settle: dict[str, tuple] = {}
+        self._dirs_seen: set[str] = set()
+        self._dirs_new: dict[str, tuple] = {}
+
+    def settled(self, path: Path, st: os.stat_result) -> bool:
+        """True if an earlier run found this exact file in place. Thread-safe."""
+        row = self._files.get(str(path))
+        if row is None or row[0] != _stat_key(st) or (row[1] is not None and row[1] <= self._now):
+            return False
+        self._kept.add(str(path))
+        return True
+
+    def settle(self, path: Path, st: os.stat_result, expires: Optional[float]) -> None:
+        """Record that this run found `path` in place."""
+        if max(st.st_mtime, st.st_ctime) < self._now - _RACY_S:
+            self._settle[str(path)] = (*_stat_key(st), expires)
+
+    def dir_listing(self, d: Path, st: os.stat_result) -> Optional[tuple[int, list]]:
+        key = str(d)
+        self._dirs_seen.add(key)
+        row = self._dirs.get(key)
+        if row is None or row[0] != st.st_mtime_ns:
+            return None
+        return row[1], json.loads(row[2])
+
+    def record_dir(self, d: Path, st: os.stat_result, files: int, subdirs: list) -> None:
+        if st.st_mtime < self._now - _RACY_S:
+            self._dirs_new[str(d)] = (st.st_mtime_ns, files, json.dumps(subdirs))
+
+    def finish(self, walked: list[Path]) -> None:
+        """Write this run's rows. Under each fully `walked` root, rows not
+        confirmed this run (moved, deleted, changed) are dropped; dir rows not
+        consulted are dropped if any were (the stray dirs are all counted)."""
+        with self._lock, self._db:
+            for root in walked:
+                prefix = str(root).rstrip("/") + "/"
+                stale = [(p,) for p in self._files
+                         if p.startswith(prefix) and p not in self._kept and p not in self._settle]
+                self._db.executemany("DELETE FROM files WHERE path = ?", stale)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files (path, ino, mtime_ns, ctime_ns, size, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)", [(p, *row) for p, row in self._settle.items()])
+            if self._dirs_seen:
+                self._db.executemany("DELETE FROM dirs WHERE path = ?",
+                                     [(p,) for p in self._dirs if p not in self._dirs_seen])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, files, subdirs) VALUES (?, ?, ?, ?)",
+                [(p, *row) for p, row in self._dirs_new.items()])
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def count_files(d: Path, journal: Optional[Journal] = None) -> int:
+    """Files under d, counted as `sum(1 for f in d.rglob("*") if f.is_file())`
+    would (dotfiles included, symlinked dirs not entered). With a journal, a
+    dir whose mtime hasn't moved isn't relisted."""
+    try:
+        st = d.stat()
+    except OSError:
+        return 0
+    cached = journal.dir_listing(d, st) if journal is not None else None
+    if cached is not None:
+        files, subdirs = cached
+    else:
+        files, subdirs = 0, []
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    try:
+                        if e.is_file():
+                            files += 1
+                        elif e.is_dir() and not e.is_symlink():
+                            subdirs.append(e.name)
+                    except OSError:
+                        pass
+        except OSError:
+            return 0
+        if journal is not None:
+            journal.record_dir(d, st, files, subdirs)
+    return files + sum(count_files(d / name, journal) for name in subdirs)
+
+
+class drain_lock:
+    """Exclusive flock held for one drain, so the timer's pass and --watch
+    (two processes, one host) never move files at the same time."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        os.close(self._fd)                  # closing drops the flock
+
+
+# ---- inotify (stdlib ctypes; Linux only) --------------------------------------
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+_EVENT = struct.Struct("iIII")             # wd, mask, cookie, len; then the name
+
+
+class Inotify:
+    """Minimal inotify: watch dirs, read (mask, name) events with a timeout."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, d: Path, mask: int) -> None:
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(d), mask) < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, f"inotify_add_watch {d}: {os.strerror(e)}")
+
+    def read(self, timeout: Optional[float]) -> Optional[list[tuple[int, str]]]:
+        """Events, or None if `timeout` seconds passed without any."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return None
+        buf = os.read(self.fd, 64 * 1024)
+        events, i = [], 0
+        while i < len(buf):
+            _, mask, _, n = _EVENT.unpack_from(buf, i)
+            i += _EVENT.size
+            events.append((mask, os.fsdecode(buf[i:i + n].rstrip(b"\0"))))
+            i += n
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
 
 
 def _syncthing_apikey() -> Optional[str]:
@@ -344,7 +798,7 @@ def republish(touched: set[Path], cfg: dict, log) -> None:
     if not (url and folder and key and touched):
         return
     root = Path(cfg["meta"]["inbox_root"])
-    for d in sorted(touched):
+    for d in _outermost(touched):
         sub = str(d.relative_to(root))
         req = urllib.request.Request(
             f"{url}/rest/db/scan?folder={folder}&sub={urllib.parse.quote(sub)}",
@@ -355,9 +809,18 @@ def republish(touched: set[Path], cfg: dict, log) -> None:
             log(f"  republish WARN: rescan of {sub} failed: {e}")
 
 
+def _outermost(dirs: set[Path]) -> list[Path]:
+    """Drop dirs already covered by a touched ancestor — a scan is recursive."""
+    out: list[Path] = []
+    for d in sorted(dirs):
+        if not (out and d.is_relative_to(out[-1])):
+            out.append(d)
+    return out
+
+
 # ============================================================ ORCHESTRATION ===
 
-def report_unexpected_dirs(cfg: dict, log) -> list:
+def report_unexpected_dirs(cfg: dict, log, journal: Optional[Journal] = None) -> list:
     """Name top-level dirs under downloads/ that no rule produces and no skip
     entry claims.
 
@@ -387,7 +850,7 @@ def report_unexpected_dirs(cfg: dict, log) -> list:
     for p in entries:
         if not p.is_dir() or p.name.startswith(".") or p.name in known:
             continue
-        n = sum(1 for f in p.rglob("*") if f.is_file())
+        n = count_files(p, journal)
         strays.append(p)
         log(f"  UNEXPECTED DIR: {p.name}/ ({n} files) — no rule routes here and "
             f"nothing walks it; agents must not create dirs under downloads/")
@@ -497,13 +960,32 @@ def report_dangling_agent_citations(cfg: dict, log) -> list:
     return dangling
 
 
-def run(cfg: dict, apply: bool, all_mode: bool, log, locations: Optional[list] = None) -> dict:
+def run(cfg: dict, apply: bool, all_mode: bool, log, locations: Optional[list] = None,
+        workers: Optional[int] = None, journal: Optional[Journal] = None,
+        paths: Optional[list] = None) -> dict:
+    """One drain. `paths` (--watch) limits it to those loose files and skips
+    the reports; `journal` skips files an earlier run already found in place."""
     stats: dict[str, int] = {}
     touched: set[Path] = set()
     n = 0
-    for path in iter_files(cfg, all_mode, locations):
-        m = gather(path)
-        dec = classify(m, cfg)
+    now = dt.datetime.now()
+    rules = compile_rules(cfg, now)
+    if journal is not None:
+        journal.begin(rules_fingerprint(cfg))
+    root = Path(cfg["meta"]["inbox_root"])
+    on_conflict = cfg.get("on_conflict", "rename_new")
+    taken = DestNames()
+    resolved: dict[Path, Path] = {}
+    plan: list[tuple[Path, Path]] = []     # (src, target), in the order they were planned
+    if paths is None:
+        entries = iter_entries(cfg, all_mode, locations)
+    else:
+        entries = [(p, None) for p in paths if p.is_file() and not p.name.startswith(".")]
+    for path, st, m in gather_all(entries, default_workers() if workers is None else workers,
+                                  journal.settled if journal is not None else None):
+        if m is None:
+            continue                        # settled by an earlier run, or gone
+        dec = rules.classify(m)
         new_name = target_name(m, dec, cfg)
         # Already in its correct bucket: done, not a conflict. Without this,
         # unique() compares the file against ITSELF — `t.exists()` is true for
@@ -513,33 +995,110 @@ def run(cfg: dict, apply: bool, all_mode: bool, log, locations: Optional[list] =
         # *_2.* files in downloads/agent/ got there. Harmless for the default
         # loose-root drain (root is never a bucket), so the blast radius of this
         # guard is the re-run path only.
-        if dec.dest.resolve() == path.parent.resolve() and new_name == m.name:
+        for d in (dec.dest, path.parent):
+            if d not in resolved:
+                resolved[d] = d.resolve()
+        if resolved[dec.dest] == resolved[path.parent] and new_name == m.name:
+            if journal is not None:
+                journal.settle(path, st, rules.expires(st.st_mtime, now.timestamp()))
             continue
         bucket = dec.dest.name
         stats[bucket] = stats.get(bucket, 0) + 1
         n += 1
-        target = unique(dec.dest, new_name, cfg.get("on_conflict", "rename_new"))
+        target = unique(dec.dest, new_name, on_conflict, taken)
         if target is None:
             log(f"[{dec.reason:14}] SKIP (conflict)  {m.name}")
             continue
-        log(f"[{dec.reason:14}] {m.name}  ->  {target.relative_to(Path(cfg['meta']['inbox_root']))}")
-        if apply:
-            target.parent.mkdir(parents=True, exist_ok=True)
+        log(f"[{dec.reason:14}] {m.name}  ->  {target.relative_to(root)}")
+        taken.moved(path, target)
+        plan.append((path, target))
+    if apply:
+        # Plan order matters: a name counts as free once its file is planned
+        # away, so that move must run before the one that takes the name over
+        made: set[Path] = set()
+        for path, target in plan:
+            if target.parent not in made:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                made.add(target.parent)
+            if on_conflict != "overwrite" and os.path.lexists(target):
+                log(f"SKIP (target appeared)  {path.name}  ->  {target.relative_to(root)}")
+                continue
             shutil.move(str(path), str(target))
             touched.add(target.parent)
     log("")
     log(f"{'APPLIED' if apply else 'DRY-RUN'} {'(--all: whole tree)' if all_mode else '(loose root only)'}: {n} file(s)")
     for b in sorted(stats, key=lambda k: -stats[k]):
         log(f"  {stats[b]:5}  {b}/")
-    if not locations and not all_mode:
-        report_unexpected_dirs(cfg, log)
+    if not locations and not all_mode and paths is None:
+        report_unexpected_dirs(cfg, log, journal)
         report_agent_layout(cfg, log)
         report_dangling_agent_citations(cfg, log)
+    if journal is not None:
+        journal.finish(walk_roots(cfg, all_mode, locations) if paths is None else [])
     if apply:
         republish(touched, cfg, log)
     return stats
 
 
+def _loose(dl: Path) -> list[Path]:
+    try:
+        return sorted(p for p in dl.iterdir() if not p.name.startswith("."))
+    except OSError:
+        return []
+
+
+def watch(config: Path, apply: bool, log, workers: Optional[int] = None,
+          journal: Optional[Journal] = None, settle: float = 2.0,
+          max_wait: float = 30.0) -> None:
+    """--watch: drain loose files as they land instead of on the timer's cadence.
+
+    inotify reports a file once its writer closes it (IN_CLOSE_WRITE) or it is
+    renamed in (IN_MOVED_TO: browsers' .part/.crdownload and Syncthing's
+    .syncthing.*.tmp finish that way), so half-written files are never seen.
+    Events are batched until `settle` quiet seconds, or `max_wait` seconds
+    after the batch's first file so a steady stream cannot hold it forever,
+    then only those paths are drained; dot-named events neither join the
+    batch nor count as activity. The rule table is re-read per batch, as the
+    timer does per run. Reports and --all stay with the timer, which keeps
+    running as the catch-up pass; drain_lock keeps the two from moving at the
+    same time."""
+    cfg = yaml.safe_load(config.read_text())
+    dl = Path(cfg["meta"]["inbox_root"]) / "downloads"
+    lock = state_dir() / "drain.lock"
+    ino = Inotify()
+    ino.add_watch(dl, IN_CLOSE_WRITE | IN_MOVED_TO)
+    log(f"watching {dl}")
+    pending: set[Path] = set(_loose(dl))   # whatever landed while nothing watched
+    first = last = time.monotonic()        # batch start, latest counted event
+    try:
+        while True:
+            if pending:
+                # deadlines, not a fresh timeout per read, so ignored events don't extend the wait
+                timeout = min(last + settle, first + max_wait) - time.monotonic()
+                events = ino.read(timeout) if timeout > 0 else None
+            else:
+                events = ino.read(None)
+            if events is not None:
+                fresh: set[Path] = set()
+                for mask, name in events:
+                    if mask & IN_Q_OVERFLOW:    # kernel queue overflowed: rescan
+                        fresh.update(_loose(dl))
+                    elif name and not name.startswith("."):
+                        fresh.add(dl / name)
+                if fresh:
+                    last = time.monotonic()
+                    if not pending:
+                        first = last
+                    pending |= fresh
+                continue
+            cfg = yaml.safe_load(config.read_text())
+            with drain_lock(lock):
+                run(cfg, apply, False, log, workers=workers, journal=journal, paths=sorted(pending))
+            pending.clear()
+    finally:
+        ino.close()
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="Drain ~/000_inbox/downloads (declarative, hexagonal)")
     ap.add_argument("--config", default=str(Path.home() / "000_inbox/_inbox-routing.yaml"))
@@ -548,6 +1107,13 @@ def main() -> None:
     ap.add_argument("--from", dest="locations", action="append", metavar="LOC",
                     help="walk only this location (rel to downloads/ or absolute); repeatable")
     ap.add_argument("--force", action="store_true", help="bypass owner-host guard")
+    ap.add_argument("--workers", type=int, default=default_workers(), metavar="N",
+                    help="threads for stat/xattr gathering (default %(default)s; 1 = serial)")
+    ap.add_argument("--journal", default=str(state_dir() / "journal.sqlite"), metavar="PATH",
+                    help="settled-file journal (default %(default)s)")
+    ap.add_argument("--no-journal", action="store_true", help="reclassify everything, keep no state")
+    ap.add_argument("--watch", action="store_true",
+                    help="stay running; drain loose files as they land (inotify)")
     args = ap.parse_args()
 
     cfg = yaml.safe_load(Path(args.config).read_text())
@@ -555,7 +1121,19 @@ def main() -> None:
     if args.apply and not args.force and socket.gethostname() != owner:
         sys.exit(f"inbox-janitor: refusing to --apply on '{socket.gethostname()}' "
                  f"(owner_host={owner}). Use --force only if no other mover runs.")
-    run(cfg, args.apply, args.all, print, args.locations)
+    journal = None if args.no_journal else Journal(Path(args.journal))
+    try:
+        if args.watch:
+            if args.all or args.locations:
+                sys.exit("inbox-janitor: --watch drains the loose root only (no --all/--from)")
+            watch(Path(args.config), args.apply, lambda line: print(line, flush=True),
+                  args.workers, journal)
+        else:
+            with drain_lock(state_dir() / "drain.lock"):
+                run(cfg, args.apply, args.all, print, args.locations, args.workers, journal)
+    finally:
+        if journal is not None:
+            journal.close()
 
 
 if __name__ == "__main__":
@@ -50,6 +50,33 @@
         default = [ "en" "en-US" "en-GB" ];
         description = "Preferred transcript languages in priority order";
       };
+      concurrency = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 4;
+        description = "Videos extracted in parallel per job (request rate is still capped by rateLimit)";
+      };
+      jobRetentionHours = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 168;
+        description = "Finished jobs (status + per-video results) are kept this long in the job store";
+      };
+      rateLimit = {
+        transcriptApi = lib.mkOption {
+          type = lib.types.number;
+          default = 1.0;
+          description = "Sustained youtube-transcript-api requests/second, shared across all jobs (0 = unlimited)";
+        };
+        ytdlp = lib.mkOption {
+          type = lib.types.number;
+          default = 0.5;
+          description = "Sustained yt-dlp requests/second, shared across all jobs (0 = unlimited)";
+        };
+        burst = lib.mkOption {
+          type = lib.types.ints.positive;
+          default = 3;
+          description = "Token-bucket burst size for both backends";
+        };
+      };
     };
   };
 
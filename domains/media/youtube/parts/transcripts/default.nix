@@ -7,6 +7,10 @@
 # ARCHITECTURE:
 #   - Single FastAPI process
 #   - youtube-transcript-api for captions, yt-dlp for metadata only
+#     (in-process library; the yt-dlp binary on PATH is the fallback)
+#   - SQLite metadata/segment cache in the StateDirectory (only misses hit YouTube)
+#   - SQLite job store in the StateDirectory (jobs survive restarts; results
+#     reference the written files, progress streams over SSE)
 #   - No LLM, no spaCy, no PostgreSQL
 #   - Caddy vhost at transcripts.hwc.iheartwoodcraft.com (upstream 127.0.0.1:8100)
 
@@ -23,6 +27,7 @@ let
     uvicorn
     pydantic
     youtube-transcript-api
+    yt-dlp
   ];
 
   pythonPath = pkgs.python3Packages.makePythonPath pythonPackages;
@@ -42,6 +47,13 @@ let
     export YT_TRANSCRIPTS_OUTPUT_ROOTS="${lib.concatStringsSep ":" (map toString outputRoots)}"
     export YT_TRANSCRIPTS_DEFAULT_MODE="${cfg.defaultFormat}"
     export YT_TRANSCRIPTS_LANGUAGES="${lib.concatStringsSep "," cfg.languages}"
+    export YT_TRANSCRIPTS_CONCURRENCY="${toString cfg.concurrency}"
+    export YT_TRANSCRIPTS_RATE_TRANSCRIPT_API="${toString cfg.rateLimit.transcriptApi}"
+    export YT_TRANSCRIPTS_RATE_YTDLP="${toString cfg.rateLimit.ytdlp}"
+    export YT_TRANSCRIPTS_RATE_BURST="${toString cfg.rateLimit.burst}"
+    export YT_TRANSCRIPTS_CACHE="/var/lib/hwc/transcripts/cache.sqlite3"
+    export YT_TRANSCRIPTS_JOBS_DB="/var/lib/hwc/transcripts/jobs.sqlite3"
+    export YT_TRANSCRIPTS_JOB_TTL_HOURS="${toString cfg.jobRetentionHours}"
 
     exec ${pkgs.python3}/bin/python3 ${scriptDir}/api.py
   '';
@@ -8,13 +8,17 @@ preserving source files for continued seeding.
 Features:
 - Detects audiobooks by audio file extensions (mp3, m4a, m4b, flac, opus)
 - Uses rsync with --ignore-existing for safe incremental copies
-- Creates .abs-copied marker in source to prevent re-processing
-- Maintains JSON state at /var/lib/hwc/audiobook-copier/state.json
+- Copies several audiobooks concurrently under an aggregate bandwidth cap
+- Maintains SQLite state at /var/lib/hwc/audiobook-copier/state.db
+  (legacy state.json is imported automatically); also writes the .abs-copied
+  marker that hot-sweep's sweep_books() checks, and imports markers it finds
+- Skips flat non-audiobook directories whose mtime hasn't changed since last scan
 - Triggers Audiobookshelf library scan via API
 
 Usage:
     audiobook-copier.py <content_path>
     audiobook-copier.py --scan-all  # Process all uncopied audiobooks in source dir
+    audiobook-copier.py --compact   # Drop state for deleted sources and vacuum
 
 Environment Variables:
     SOURCE_DIR: Source directory (default: /mnt/hot/downloads/books)
@@ -22,6 +26,8 @@ Environment Variables:
     STATE_DIR: State directory (default: /var/lib/hwc/audiobook-copier)
     AUDIOBOOKSHELF_URL: API URL (default: http://localhost:13378)
     AUDIOBOOKSHELF_API_KEY: API key for library scan (optional)
+    COPY_WORKERS: Concurrent rsync copies during --scan-all (default: 2)
+    BANDWIDTH_LIMIT_KBPS: Aggregate copy bandwidth cap in KiB/s, 0 = unlimited (default: 0)
     DRY_RUN: Set to "1" for dry run mode
 """
 
@@ -29,11 +35,14 @@ import os
 import sys
 import json
 import logging
+import sqlite3
 import argparse
+import threading
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Iterator, Tuple
 
 import requests
 
@@ -47,9 +56,14 @@ logger = logging.getLogger(__name__)
 # Audio file extensions that indicate an audiobook
 AUDIO_EXTENSIONS = {'.mp3', '.m4a', '.m4b', '.flac', '.opus', '.ogg', '.wav', '.aac'}
 
-# Marker file to indicate audiobook has been copied
+# Marker file indicating an audiobook was copied. The state database is the
+# copier's own record; the marker is kept for hot-sweep (sweep_books), which
+# walks the same tree and writes/reads it as its "already copied" check.
 MARKER_FILE = '.abs-copied'
 
+# Per-audiobook rsync timeout in seconds
+COPY_TIMEOUT = 3600
+
 
 class Config:
     """Configuration from environment variables."""
@@ -61,103 +75,232 @@ class Config:
         self.audiobookshelf_url = os.getenv('AUDIOBOOKSHELF_URL', 'http://localhost:13378')
         self.audiobookshelf_api_key = os.getenv('AUDIOBOOKSHELF_API_KEY', '')
         self.dry_run = os.getenv('DRY_RUN', '0') == '1'
+        self.copy_workers = max(1, int(os.getenv('COPY_WORKERS', '2')))
+        self.bandwidth_limit_kbps = max(0, int(os.getenv('BANDWIDTH_LIMIT_KBPS', '0')))
 
     @property
     def state_file(self) -> Path:
+        return self.state_dir / 'state.db'
+
+    @property
+    def legacy_state_file(self) -> Path:
         return self.state_dir / 'state.json'
 
 
 class StateManager:
-    """Manages persistent state for processed audiobooks."""
+    """
+    Manages persistent state for processed audiobooks.
 
-    def __init__(self, state_file: Path):
+    State lives in a single SQLite database. Every update is its own
+    transaction, so a crash never loses or corrupts earlier entries, and
+    lookups are primary-key queries no matter how many books have been
+    processed. A legacy state.json is imported once and renamed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS processed (
+            path TEXT PRIMARY KEY,
+            dest TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scanned (
+            path TEXT PRIMARY KEY,
+            mtime REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, state_file: Path, legacy_file: Optional[Path] = None):
         self.state_file = state_file
-        self.state: Dict[str, Any] = self._load()
-
-    def _load(self) -> Dict[str, Any]:
-        """Load state from file."""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                logger.warning(f"Failed to load state file: {e}")
-        return {'processed': {}, 'last_scan': None}
-
-    def save(self) -> None:
-        """Save state to file."""
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.state_file, 'w') as f:
-            json.dump(self.state, f, indent=2, default=str)
-
-    def mark_processed(self, path: Path, dest_path: Path) -> None:
+        self.conn = sqlite3.connect(str(state_file))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+        if legacy_file is not None and legacy_file.exists():
+            self._migrate(legacy_file)
+
+    def _migrate(self, legacy_file: Path) -> None:
+        """Import a legacy JSON state file and move it out of the way."""
+        try:
+            with open(legacy_file, 'r') as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Failed to load legacy state file: {e}")
+            return
+
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO processed (path, dest, timestamp) VALUES (?, ?, ?)',
+                [(path, entry.get('dest', ''), entry.get('timestamp', ''))
+                 for path, entry in legacy.get('processed', {}).items()]
+            )
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO scanned (path, mtime) VALUES (?, ?)',
+                list(legacy.get('scanned', {}).items())
+            )
+            if legacy.get('last_scan'):
+                self.conn.execute(
+                    'INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)',
+                    ('last_scan', legacy['last_scan'])
+                )
+        legacy_file.rename(legacy_file.with_suffix('.json.migrated'))
+        logger.info(f"Migrated legacy state from {legacy_file}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
+
+    def mark_processed(self, path: Path, dest_path: Path,
+                       timestamp: Optional[str] = None) -> None:
         """Mark an audiobook as processed."""
-        self.state['processed'][str(path)] = {
-            'dest': str(dest_path),
-            'timestamp': datetime.now().isoformat()
-        }
-        self.save()
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO processed (path, dest, timestamp) VALUES (?, ?, ?)',
+                (str(path), str(dest_path), timestamp or datetime.now().isoformat())
+            )
 
     def is_processed(self, path: Path) -> bool:
         """Check if an audiobook was already processed."""
-        return str(path) in self.state['processed']
+        row = self.conn.execute(
+            'SELECT 1 FROM processed WHERE path = ?', (str(path),)
+        ).fetchone()
+        return row is not None
+
+    def is_unchanged(self, path: Path, mtime: float) -> bool:
+        """Check if a directory was scanned before and its mtime hasn't changed."""
+        row = self.conn.execute(
+            'SELECT mtime FROM scanned WHERE path = ?', (str(path),)
+        ).fetchone()
+        return row is not None and row[0] == mtime
+
+    def record_scan(self, path: Path, mtime: float) -> None:
+        """Remember a scanned non-audiobook directory."""
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO scanned (path, mtime) VALUES (?, ?)',
+                (str(path), mtime)
+            )
+
+    def prune_scanned(self, present: set) -> None:
+        """Drop scan index entries for directories that no longer exist."""
+        with self.conn:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS present (path TEXT PRIMARY KEY)')
+            self.conn.execute('DELETE FROM present')
+            self.conn.executemany('INSERT OR IGNORE INTO present (path) VALUES (?)',
+                                  [(p,) for p in present])
+            self.conn.execute('DELETE FROM scanned WHERE path NOT IN (SELECT path FROM present)')
 
     def update_last_scan(self) -> None:
         """Update the last scan timestamp."""
-        self.state['last_scan'] = datetime.now().isoformat()
-        self.save()
-
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                ('last_scan', datetime.now().isoformat())
+            )
 
-def is_audiobook_directory(path: Path) -> bool:
+    def compact(self) -> int:
+        """
+        Drop entries whose source directory is gone and reclaim space.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self.conn:
+            for table in ('processed', 'scanned'):
+                gone = [
+                    (path,) for (path,) in self.conn.execute(f'SELECT path FROM {table}')
+                    if not os.path.exists(path)
+                ]
+                self.conn.executemany(f'DELETE FROM {table} WHERE path = ?', gone)
+                removed += len(gone)
+        self.conn.execute('VACUUM')
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return removed
+
+
+def scan_directory(path: Path) -> Tuple[bool, bool]:
     """
-    Check if a directory contains audiobook files.
+    Walk a directory once, stopping at the first audio file.
 
     Args:
         path: Directory path to check
 
     Returns:
-        True if directory contains audio files
+        (contains audio files, has subdirectories)
     """
     if not path.is_dir():
-        return False
-
-    # Check for audio files in directory or subdirectories
-    for ext in AUDIO_EXTENSIONS:
-        if list(path.glob(f'*{ext}')) or list(path.glob(f'**/*{ext}')):
-            return True
-
-    return False
+        return False, False
+
+    nested = False
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        nested = True
+                    elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                        return True, nested
+        except OSError as e:
+            logger.debug(f"Cannot read {current}: {e}")
+
+    return False, nested
 
 
 def has_marker(path: Path) -> bool:
-    """Check if directory has already been processed."""
+    """Check if directory has a copy marker."""
     return (path / MARKER_FILE).exists()
 
 
-def create_marker(path: Path, dest_path: Path, dry_run: bool = False) -> None:
+def create_marker(path: Path, dest_path: Path) -> None:
     """Create marker file indicating audiobook was copied."""
     marker_path = path / MARKER_FILE
-    if dry_run:
-        logger.info(f"[DRY RUN] Would create marker: {marker_path}")
-        return
-
     marker_content = {
         'copied_at': datetime.now().isoformat(),
         'destination': str(dest_path)
     }
-    with open(marker_path, 'w') as f:
-        json.dump(marker_content, f, indent=2)
+    try:
+        with open(marker_path, 'w') as f:
+            json.dump(marker_content, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write marker {marker_path}: {e}")
+        return
     logger.info(f"Created marker: {marker_path}")
 
 
-def copy_audiobook(source: Path, dest_dir: Path, dry_run: bool = False) -> Optional[Path]:
+def import_marker(path: Path, state: StateManager) -> None:
+    """Record a marker file written elsewhere (hot-sweep, older copier) in the state database."""
+    marker_path = path / MARKER_FILE
+    try:
+        with open(marker_path, 'r') as f:
+            marker = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        marker = {}
+    state.mark_processed(path, Path(marker.get('destination', '')), marker.get('copied_at'))
+    logger.debug(f"Imported marker: {marker_path}")
+
+
+def copy_audiobook(source: Path, dest_dir: Path, dry_run: bool = False,
+                   bwlimit_kbps: int = 0) -> Optional[Path]:
     """
     Copy audiobook directory to destination using rsync.
 
+    rsync output is streamed line by line to the debug log rather than
+    buffered, so large copies don't hold their whole progress log in memory.
+
     Args:
         source: Source audiobook directory
         dest_dir: Destination parent directory
         dry_run: If True, only log what would be done
+        bwlimit_kbps: rsync --bwlimit in KiB/s (0 = unlimited)
 
     Returns:
         Destination path if successful, None otherwise
@@ -169,11 +312,12 @@ def copy_audiobook(source: Path, dest_dir: Path, dry_run: bool = False) -> Optio
         'rsync',
         '-av',
         '--ignore-existing',  # Don't overwrite existing files
-        '--progress',
         str(source) + '/',  # Trailing slash copies contents
         str(dest_path)
     ]
 
+    if bwlimit_kbps > 0:
+        rsync_cmd.insert(1, f'--bwlimit={bwlimit_kbps}')
     if dry_run:
         rsync_cmd.insert(1, '--dry-run')
 
@@ -181,29 +325,80 @@ def copy_audiobook(source: Path, dest_dir: Path, dry_run: bool = False) -> Optio
     logger.debug(f"Command: {' '.join(rsync_cmd)}")
 
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             rsync_cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=3600  # 1 hour timeout for large audiobooks
+            errors='replace'  # non-UTF-8 filenames must not abort the copy
         )
-
-        if result.returncode == 0:
-            logger.info(f"Successfully copied: {source.name}")
-            if result.stdout:
-                logger.debug(result.stdout)
-            return dest_path
-        else:
-            logger.error(f"rsync failed with code {result.returncode}")
-            logger.error(result.stderr)
-            return None
-
-    except subprocess.TimeoutExpired:
-        logger.error(f"rsync timed out for: {source}")
+    except Exception as e:
+        logger.error(f"Error copying {source}: {e}")
         return None
+
+    # Kill rsync if it runs past the timeout; reading stdout then hits EOF
+    timer = threading.Timer(COPY_TIMEOUT, proc.kill)
+    timer.start()
+    last_lines: List[str] = []
+    try:
+        for line in proc.stdout:
+            line = line.rstrip()
+            logger.debug(f"[{source.name}] {line}")
+            last_lines = (last_lines + [line])[-10:]
+        returncode = proc.wait()
+        timed_out = not timer.is_alive()
     except Exception as e:
         logger.error(f"Error copying {source}: {e}")
+        proc.kill()
+        proc.wait()
+        return None
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+
+    if timed_out:
+        logger.error(f"rsync timed out for: {source}")
         return None
+    if returncode == 0:
+        logger.info(f"Successfully copied: {source.name}")
+        return dest_path
+
+    logger.error(f"rsync failed with code {returncode}")
+    for line in last_lines:
+        logger.error(line)
+    return None
+
+
+def copy_audiobooks(sources: List[Path], config: Config) -> Iterator[Tuple[Path, Optional[Path]]]:
+    """
+    Copy several audiobooks concurrently.
+
+    At most config.copy_workers rsync processes run at once. The aggregate
+    bandwidth cap is split evenly between them so the library disk and
+    network stay usable for streaming while a batch copies.
+
+    Args:
+        sources: Audiobook directories to copy
+        config: Configuration instance
+
+    Yields:
+        (source, destination path or None) as each copy finishes
+    """
+    if not sources:
+        return
+
+    workers = min(config.copy_workers, len(sources))
+    bwlimit = 0
+    if config.bandwidth_limit_kbps > 0:
+        bwlimit = max(1, config.bandwidth_limit_kbps // workers)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rsync') as pool:
+        futures = {
+            pool.submit(copy_audiobook, source, config.dest_dir, config.dry_run, bwlimit): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
 
 
 def trigger_library_scan(config: Config) -> bool:
@@ -267,41 +462,76 @@ def trigger_library_scan(config: Config) -> bool:
         return False
 
 
-def process_audiobook(path: Path, config: Config, state: StateManager) -> bool:
+def needs_copy(path: Path, state: StateManager) -> bool:
     """
-    Process a single audiobook directory.
+    Check whether a directory is an audiobook that still needs copying.
 
     Args:
         path: Path to audiobook directory
-        config: Configuration instance
         state: State manager
 
     Returns:
-        True if processed successfully
+        True if the directory should be copied
     """
-    # Skip if already has marker
-    if has_marker(path):
-        logger.debug(f"Skipping (has marker): {path}")
-        return False
-
     # Skip if already in state
     if state.is_processed(path):
         logger.debug(f"Skipping (in state): {path}")
         return False
 
-    # Verify it's an audiobook
-    if not is_audiobook_directory(path):
+    # Skip marked directories, recording them so the marker is
+    # never read again
+    if has_marker(path):
+        logger.debug(f"Skipping (has marker): {path}")
+        import_marker(path, state)
+        return False
+
+    # Verify it's an audiobook. The mtime is taken before the walk so files
+    # landing mid-walk change it and force a rescan next time.
+    mtime = path.stat().st_mtime
+    is_audiobook, nested = scan_directory(path)
+    if not is_audiobook:
         logger.debug(f"Not an audiobook directory: {path}")
+        # Only flat directories go in the skip index: a file finishing in a
+        # subfolder (Book/CD1/track.mp3.!qB -> track.mp3) doesn't touch the
+        # top-level mtime, so nested ones are walked on every scan
+        if not nested:
+            state.record_scan(path, mtime)
+        return False
+
+    return True
+
+
+def finish_audiobook(path: Path, dest_path: Path, config: Config, state: StateManager) -> None:
+    """Update state and write the copy marker after a successful copy."""
+    if config.dry_run:
+        logger.info(f"[DRY RUN] Would mark processed: {path}")
+        return
+    state.mark_processed(path, dest_path)
+    create_marker(path, dest_path)
+
+
+def process_audiobook(path: Path, config: Config, state: StateManager) -> bool:
+    """
+    Process a single audiobook directory.
+
+    Args:
+        path: Path to audiobook directory
+        config: Configuration instance
+        state: State manager
+
+    Returns:
+        True if processed successfully
+    """
+    if not needs_copy(path, state):
         return False
 
     # Copy the audiobook
-    dest_path = copy_audiobook(path, config.dest_dir, config.dry_run)
+    dest_path = copy_audiobook(
+        path, config.dest_dir, config.dry_run, config.bandwidth_limit_kbps
+    )
 
     if dest_path:
-        # Create marker and update state
-        create_marker(path, dest_path, config.dry_run)
-        if not config.dry_run:
-            state.mark_processed(path, dest_path)
+        finish_audiobook(path, dest_path, config, state)
         return True
 
     return False
@@ -323,16 +553,36 @@ def scan_all(config: Config, state: StateManager) -> int:
         return 0
 
     processed_count = 0
-
-    # Scan immediate children of source directory
-    for item in config.source_dir.iterdir():
-        if item.is_dir() and not item.name.startswith('.'):
-            if process_audiobook(item, config, state):
-                processed_count += 1
-
-    logger.info(f"Processed {processed_count} audiobooks")
-
-    # Trigger library scan if any were processed
+    unchanged_count = 0
+    present = set()
+    pending: List[Path] = []
+
+    # Scan immediate children of source directory. Flat directories already
+    # known not to be audiobooks are skipped while their mtime is unchanged
+    # (needs_copy never indexes directories with subfolders).
+    with os.scandir(config.source_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            item = Path(entry.path)
+            present.add(str(item))
+            if state.is_unchanged(item, entry.stat().st_mtime):
+                unchanged_count += 1
+                continue
+            if needs_copy(item, state):
+                pending.append(item)
+
+    # Copies run concurrently; state is written here, on the main thread,
+    # as each one finishes
+    for item, dest_path in copy_audiobooks(pending, config):
+        if dest_path:
+            finish_audiobook(item, dest_path, config, state)
+            processed_count += 1
+
+    state.prune_scanned(present)
+    logger.info(f"Processed {processed_count} audiobooks ({unchanged_count} unchanged directories skipped)")
+
+    # Trigger a single library scan for the whole batch
     if processed_count > 0 and config.audiobookshelf_api_key:
         trigger_library_scan(config)
 
@@ -383,6 +633,11 @@ def main():
         action='store_true',
         help='Scan source directory for all unprocessed audiobooks'
     )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Drop state for sources that no longer exist and vacuum the database'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -405,7 +660,13 @@ def main():
         config.dry_run = True
 
     # Initialize state manager
-    state = StateManager(config.state_file)
+    state = StateManager(config.state_file, config.legacy_state_file)
+
+    if args.compact:
+        removed = state.compact()
+        logger.info(f"Compacted state: removed {removed} stale entries")
+        state.close()
+        return 0
 
     logger.info(f"Source: {config.source_dir}")
     logger.info(f"Destination: {config.dest_dir}")
@@ -417,16 +678,19 @@ def main():
         config.dest_dir.mkdir(parents=True, exist_ok=True)
 
     # Process based on arguments
-    if args.scan_all:
-        count = scan_all(config, state)
-        return 0 if count >= 0 else 1
-    elif args.path:
-        path = Path(args.path)
-        success = process_single(path, config, state)
-        return 0 if success else 1
-    else:
-        parser.print_help()
-        return 1
+    try:
+        if args.scan_all:
+            count = scan_all(config, state)
+            return 0 if count >= 0 else 1
+        elif args.path:
+            path = Path(args.path)
+            success = process_single(path, config, state)
+            return 0 if success else 1
+        else:
+            parser.print_help()
+            return 1
+    finally:
+        state.close()
 
 
 if __name__ == '__main__':
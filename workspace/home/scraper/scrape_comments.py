@@ -14,11 +14,17 @@ Usage:
 
   # From stdin (pipe from n8n or jq)
   cat post_ids.txt | scrape_comments --output comments.jsonl
+
+Posts already in the output (or its .done progress file) are skipped, so an
+interrupted run picks up where it left off. Use --fresh to start over.
 """
 
 import argparse
 import json
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -46,6 +52,12 @@ class CommentData(BaseModel):
 
 USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+COMMENT_SELECTOR = "shreddit-comment"
+FIRST_COMMENT_TIMEOUT = 10000  # ms to wait for the first comment before treating a post as empty
+MORE_COMMENTS_TIMEOUT = 2000  # ms to wait for more comments after a scroll
+
+_MORE_COMMENTS_JS = "([sel, n]) => document.querySelectorAll(sel).length > n"
+
 
 def extract_comments_from_page(page, post_id: str, post_url: str) -> list[CommentData]:
     """Extract all comments from a Reddit post page."""
@@ -100,13 +112,44 @@ def extract_comments_from_page(page, post_id: str, post_url: str) -> list[Commen
     return comments
 
 
+def wait_for_comments(page, scrolls: int) -> None:
+    """
+    Wait for comments to render, then scroll until no more load.
+
+    Returns as soon as the first comment is attached (or after
+    FIRST_COMMENT_TIMEOUT for posts without comments). Each scroll waits only
+    until the comment count grows, and scrolling stops at the first scroll
+    that loads nothing new.
+    """
+    try:
+        page.wait_for_selector(COMMENT_SELECTOR, state="attached", timeout=FIRST_COMMENT_TIMEOUT)
+    except PlaywrightTimeoutError:
+        return  # No comments
+
+    for _ in range(scrolls):
+        count = page.eval_on_selector_all(COMMENT_SELECTOR, "els => els.length")
+        page.mouse.wheel(0, 3000)
+        try:
+            page.wait_for_function(
+                _MORE_COMMENTS_JS, arg=[COMMENT_SELECTOR, count], timeout=MORE_COMMENTS_TIMEOUT
+            )
+        except PlaywrightTimeoutError:
+            break
+
+
 def scrape_post_comments(
-    context,
+    page,
     post_id: str,
     subreddit: str = "",
     limiter: AdaptiveRateLimiter | None = None,
-) -> list[CommentData]:
-    """Scrape comments from a single post."""
+    scrolls: int = 3,
+) -> list[CommentData] | None:
+    """
+    Scrape comments from a single post.
+
+    Returns:
+        The post's comments, or None if the page failed to load/extract
+    """
     logger = get_logger()
 
     # Build URL
@@ -123,17 +166,9 @@ def scrape_post_comments(
     if limiter:
         limiter.wait()
 
-    page = context.new_page()
-    page.set_default_timeout(30000)
-
     try:
-        page.goto(url, wait_until="networkidle")
-        page.wait_for_timeout(2000)  # Let comments load
-
-        # Scroll to load more comments
-        for _ in range(3):
-            page.mouse.wheel(0, 3000)
-            page.wait_for_timeout(1000)
+        page.goto(url, wait_until="domcontentloaded")
+        wait_for_comments(page, scrolls)
 
         comments = extract_comments_from_page(page, post_id, url)
 
@@ -147,14 +182,62 @@ def scrape_post_comments(
         logger.warning(f"Timeout scraping {post_id}")
         if limiter:
             limiter.record_error()
-        return []
+        return None
     except Exception as e:
         logger.error(f"Error scraping {post_id}: {e}")
         if limiter:
             limiter.record_error()
-        return []
-    finally:
-        page.close()
+        return None
+
+
+class ResultWriter:
+    """
+    Thread-safe JSONL output plus a progress file of finished post IDs.
+
+    The progress file (`<output>.done`) also records posts that had no
+    comments, so a resumed run doesn't visit them again.
+    """
+
+    def __init__(self, output_path: Path, fresh: bool):
+        mode = "w" if fresh else "a"
+        self.output_path = output_path
+        self.done_path = output_path.with_name(output_path.name + ".done")
+        self._out = open(output_path, mode, encoding="utf-8")
+        self._done = open(self.done_path, mode, encoding="utf-8")
+        self._lock = threading.Lock()
+        self.total_comments = 0
+
+    def write(self, post_id: str, comments: list[CommentData]) -> None:
+        lines = "".join(comment.model_dump_json() + "\n" for comment in comments)
+        with self._lock:
+            self._out.write(lines)
+            self._out.flush()
+            self._done.write(post_id + "\n")
+            self._done.flush()
+            self.total_comments += len(comments)
+
+    def close(self) -> None:
+        self._out.close()
+        self._done.close()
+
+
+def load_done_ids(output_path: Path) -> set[str]:
+    """Post IDs already scraped into `output_path` (or listed in its .done file)."""
+    done: set[str] = set()
+
+    done_path = output_path.with_name(output_path.name + ".done")
+    if done_path.exists():
+        done.update(line.strip() for line in done_path.read_text(encoding="utf-8").splitlines() if line.strip())
+
+    if output_path.exists():
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["post_id"])
+                except (json.JSONDecodeError, KeyError):
+                    continue  # Truncated last line from an interrupted run
+
+    return done
 
 
 def load_post_ids(args) -> list[dict]:
@@ -215,6 +298,9 @@ Examples:
 
   # Pipe from jq/n8n
   jq -r '.post_id' posts.jsonl | scrape_comments -o comments.jsonl
+
+  # Resume an interrupted run (same command again), or start over
+  scrape_comments --input valuable_posts.jsonl -o comments.jsonl --fresh
         """
     )
 
@@ -223,6 +309,10 @@ Examples:
     parser.add_argument("--output", "-o", required=True, help="Output JSONL file")
     parser.add_argument("--subreddit", "-r", help="Subreddit name (if not in input data)")
     parser.add_argument("--delay", type=float, default=3.0, help="Delay between requests")
+    parser.add_argument("--rpm", type=int, default=15, help="Max page loads per minute across all workers (default: 15)")
+    parser.add_argument("--workers", "-w", type=int, default=3, help="Concurrent pages (default: 3)")
+    parser.add_argument("--scrolls", type=int, default=3, help="Max scrolls to load more comments per post")
+    parser.add_argument("--fresh", action="store_true", help="Overwrite the output instead of resuming")
     parser.add_argument("--headless", action="store_true", default=True)
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO")
 
@@ -237,42 +327,79 @@ Examples:
         logger.error("No post IDs provided. Use --ids, --input, or pipe to stdin.")
         return 1
 
+    # Resume: skip posts a previous run already finished
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if not args.fresh:
+        done = load_done_ids(output_path)
+        remaining = [post for post in posts if post["post_id"] not in done]
+        if len(remaining) < len(posts):
+            logger.info(f"Resuming: {len(posts) - len(remaining)} posts already scraped")
+        posts = remaining
+        if not posts:
+            logger.info(f"Nothing to do, all posts already in {output_path}")
+            return 0
+
     logger.info(f"Scraping comments from {len(posts)} posts")
 
-    # Set up rate limiter
+    # Set up rate limiter (shared by all workers)
     limiter = AdaptiveRateLimiter(RateLimitConfig(
         min_delay=args.delay,
-        requests_per_minute=15,  # Conservative for comment pages
+        requests_per_minute=args.rpm,  # Default is conservative for comment pages
     ))
 
-    # Open output file
-    output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    total_comments = 0
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=args.headless)
-        context = browser.new_context(user_agent=USER_AGENT)
-
-        with open(output_path, "w") as out_file:
-            for i, post in enumerate(posts):
-                post_id = post["post_id"]
-                subreddit = post.get("subreddit", "")
-
-                logger.info(f"[{i+1}/{len(posts)}] Processing {post_id}")
-
-                comments = scrape_post_comments(context, post_id, subreddit, limiter)
-
-                for comment in comments:
-                    out_file.write(comment.model_dump_json() + "\n")
-                    total_comments += 1
-
-                out_file.flush()
-
-        browser.close()
+    pending: queue.Queue[tuple[int, dict]] = queue.Queue()
+    for i, post in enumerate(posts):
+        pending.put((i, post))
+
+    writer = ResultWriter(output_path, args.fresh)
+    stop = threading.Event()
+    failed: list[str] = []
+
+    def worker() -> None:
+        # Sync Playwright is per-thread: each worker has its own browser and
+        # reuses a single page for all of its posts.
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=args.headless)
+            try:
+                context = browser.new_context(user_agent=USER_AGENT)
+                page = context.new_page()
+                page.set_default_timeout(30000)
+                while not stop.is_set():
+                    try:
+                        i, post = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    post_id = post["post_id"]
+                    logger.info(f"[{i+1}/{len(posts)}] Processing {post_id}")
+
+                    comments = scrape_post_comments(
+                        page, post_id, post.get("subreddit", ""), limiter, args.scrolls
+                    )
+                    if comments is None:
+                        failed.append(post_id)
+                    else:
+                        writer.write(post_id, comments)
+            finally:
+                browser.close()
+
+    n_workers = max(1, min(args.workers, len(posts)))
+    executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="comments")
+    try:
+        futures = [executor.submit(worker) for _ in range(n_workers)]
+        for future in futures:
+            future.result()
+    except KeyboardInterrupt:
+        logger.info("Interrupted, finishing in-flight posts (rerun to resume)")
+        stop.set()
+        return 130
+    finally:
+        executor.shutdown(wait=True)
+        writer.close()
 
-    logger.info(f"Done! Scraped {total_comments} comments from {len(posts)} posts")
+    logger.info(f"Done! Scraped {writer.total_comments} comments from {len(posts) - len(failed)} posts")
+    if failed:
+        logger.warning(f"{len(failed)} posts failed and will be retried on the next run: {', '.join(failed[:10])}")
     logger.info(f"Output: {output_path}")
 
     return 0
@@ -15,10 +15,21 @@ Usage:
   # With options:
   scraper --url "..." --scrolls 20 --format jsonl --output data.jsonl
 
+  # Several groups at once (shared per-site rate limits):
+  scraper --url-file groups.txt --workers 3 --output out/
+
 For more options: scraper --help
 """
 
+import queue
+import re
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from urllib.parse import urlsplit
+
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
 from scraper import (
@@ -30,10 +41,15 @@ from scraper import (
     extract_all_posts,
     ExtractionMetrics,
     PostDeduplicator,
+    SeenIndex,
     get_storage_backend,
     AdaptiveRateLimiter,
+    DomainRateLimiters,
     RateLimitConfig,
     ConfigurationError,
+    AuthenticationError,
+    SiteConfig,
+    SitesConfig,
 )
 from scraper.cli import parse_args
 from scraper.auth import ensure_authenticated, perform_auto_login
@@ -42,6 +58,10 @@ from scraper.auth import ensure_authenticated, perform_auto_login
 # Default config file location (next to this script)
 SCRIPT_DIR = Path(__file__).parent.resolve()
 DEFAULT_CONFIG = SCRIPT_DIR / "sites.json"
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
 
 
 def run_login_flow(page, site_name: str, auth_file: Path) -> None:
@@ -75,7 +95,12 @@ def run_scrape(
     scroll_delay: float,
     output_path: Path,
     output_format: str,
-) -> None:
+    limiter: AdaptiveRateLimiter | None = None,
+    stop: threading.Event | None = None,
+    label: str = "",
+    index: SeenIndex | None = None,
+    stop_after_known: int = 0,
+) -> int:
     """
     Run the main scraping loop.
 
@@ -86,28 +111,37 @@ def run_scrape(
         scroll_delay: Delay between scrolls
         output_path: Output file path
         output_format: Output format (csv, json, jsonl)
+        limiter: Shared rate limiter (default: a private one for this page)
+        stop: Event that ends the loop early when set
+        label: Prefix for log lines, to tell concurrent scrapes apart
+        index: Posts saved by earlier runs; only new or grown posts are written
+        stop_after_known: Stop after this many already-saved posts in a row (0: never)
+
+    Returns:
+        Number of posts saved
     """
     logger = get_logger()
     metrics = ExtractionMetrics()
-    deduplicator = PostDeduplicator()
+    deduplicator = PostDeduplicator(index)
+    saved = 0
+    prefix = f"[{label}] " if label else ""
 
     # Set up rate limiter
-    rate_limit_rpm = site_config.scraper_config.rate_limit_rpm
-    limiter = AdaptiveRateLimiter(
-        RateLimitConfig(
-            min_delay=scroll_delay,
-            requests_per_minute=rate_limit_rpm,
-        )
-    )
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(site_rate_limit(site_config, scroll_delay))
 
-    logger.info(f"Starting scrape: {scrolls} scrolls, {scroll_delay}s delay")
+    logger.info(f"{prefix}Starting scrape: {scrolls} scrolls, {scroll_delay}s delay")
 
     # Open storage for streaming writes
     storage = get_storage_backend(output_format, output_path)
 
     with storage:
         for i in range(scrolls):
-            logger.info(f"Scroll {i + 1}/{scrolls}")
+            if stop is not None and stop.is_set():
+                logger.info(f"{prefix}Stopping early")
+                break
+
+            logger.info(f"{prefix}Scroll {i + 1}/{scrolls}")
 
             # Wait according to rate limiter
             if i > 0:  # Don't wait before first extraction
@@ -123,30 +157,284 @@ def run_scrape(
                 for post in posts:
                     if deduplicator.add_or_update(post):
                         storage.append(post)
+                        deduplicator.written(post)
                         new_count += 1
+                saved += new_count
 
                 logger.info(
-                    f"Found {new_count} new posts "
-                    f"(total unique: {len(deduplicator)})"
+                    f"{prefix}Found {new_count} new posts "
+                    f"(total unique: {len(deduplicator)}, saved in earlier runs: {deduplicator.known})"
                 )
 
+                if stop_after_known and deduplicator.consecutive_known >= stop_after_known:
+                    logger.info(
+                        f"{prefix}{deduplicator.consecutive_known} already-saved posts in a row, "
+                        f"stopping early"
+                    )
+                    break
+
                 # Scroll down for more content
                 page.mouse.wheel(0, 15000)
 
             except PlaywrightTimeoutError:
-                logger.warning("Timeout during extraction, continuing...")
+                logger.warning(f"{prefix}Timeout during extraction, continuing...")
                 limiter.record_error()
             except Exception as e:
-                logger.error(f"Extraction error: {e}")
+                logger.error(f"{prefix}Extraction error: {e}")
                 limiter.record_error()
 
+    # Only now is the output complete; posts become "seen" for later runs here
+    deduplicator.commit()
+
     # Log final metrics
-    total_posts = len(deduplicator)
-    if total_posts > 0:
-        logger.info(f"Scrape complete: {total_posts} posts saved to {output_path}")
-        logger.debug(f"Extraction metrics: {metrics.summary()}")
+    if saved > 0:
+        logger.info(f"{prefix}Scrape complete: {saved} posts saved to {output_path}")
+        logger.debug(f"{prefix}Extraction metrics: {metrics.summary()}")
+    elif deduplicator.known:
+        logger.info(f"{prefix}No new posts ({deduplicator.known} already saved by earlier runs).")
     else:
-        logger.warning("No posts were scraped.")
+        logger.warning(f"{prefix}No posts were scraped.")
+    return saved
+
+
+def site_rate_limit(site_config: SiteConfig, scroll_delay: float) -> RateLimitConfig:
+    """Rate limits for a site: scroll delay as the floor, plus its RPM cap."""
+    return RateLimitConfig(
+        min_delay=scroll_delay,
+        requests_per_minute=site_config.scraper_config.rate_limit_rpm,
+    )
+
+
+def resolve_timing(args, site_config: SiteConfig, config: SitesConfig) -> tuple[float, int]:
+    """Scroll delay and page timeout (CLI > site config > global config)."""
+    scroll_delay = (
+        args.scroll_delay
+        or site_config.scraper_config.scroll_delay
+        or config.global_config.default_scroll_delay
+    )
+    timeout = (
+        args.timeout
+        or site_config.scraper_config.timeout
+        or config.global_config.default_timeout
+    )
+    return scroll_delay, timeout
+
+
+def context_options(
+    site_config: SiteConfig,
+    config: SitesConfig,
+    auth_file: Path,
+    login: bool = False,
+) -> tuple[dict, bool]:
+    """
+    Build browser context arguments for a site.
+
+    Returns:
+        (context kwargs, whether auto-login should be attempted)
+    """
+    logger = get_logger()
+
+    context_args = {}
+    use_auto_login = False
+    if auth_file.exists() and not login:
+        logger.info("Using saved authentication")
+        context_args["storage_state"] = str(auth_file)
+    elif site_config.login_required and not login:
+        # Check if we have credentials for auto-login
+        if site_config.credential_email_secret:
+            logger.info("Will attempt auto-login with stored credentials")
+            use_auto_login = True
+        else:
+            logger.warning(
+                f"Site requires login but no auth found. "
+                f"Run with --login first."
+            )
+
+    # Set user agent (required for sites like Reddit)
+    context_args["user_agent"] = (
+        site_config.user_agent
+        or config.global_config.user_agent
+        or DEFAULT_USER_AGENT
+    )
+    return context_args, use_auto_login
+
+
+# ---------------------------------------------------------------------------
+# Multi-URL mode
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ScrapeJob:
+    """One URL of a multi-URL run."""
+
+    url: str
+    site_config: SiteConfig
+    output_path: Path
+
+
+def multi_output_paths(
+    urls: list[str],
+    site_configs: list[SiteConfig],
+    output_dir: Path,
+    output_format: str,
+) -> list[Path]:
+    """One output file per URL: <site>_<last path segment>_data.<format>."""
+    paths = []
+    used: set[Path] = set()
+    for url, site_config in zip(urls, site_configs):
+        safe_name = site_config.name.lower().replace(" ", "_")
+        segments = [seg for seg in urlsplit(url).path.split("/") if seg]
+        slug = re.sub(r"[^\w.-]+", "_", segments[-1]) if segments else "root"
+        path = output_dir / f"{safe_name}_{slug}_data.{output_format}"
+        n = 2
+        while path in used:
+            path = output_dir / f"{safe_name}_{slug}_{n}_data.{output_format}"
+            n += 1
+        used.add(path)
+        paths.append(path)
+    return paths
+
+
+class ContextPool:
+    """
+    Browser contexts owned by one worker thread, reused across its URLs.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    worker runs its own browser and keeps one (authenticated) context per
+    site; each URL gets a fresh page in that context. Auto-login is guarded
+    by a per-site lock shared between workers, so only the first worker logs
+    in and the rest load the auth state it saved.
+    """
+
+    def __init__(self, browser, config: SitesConfig, login_locks: dict[str, threading.Lock]):
+        self.browser = browser
+        self.config = config
+        self.login_locks = login_locks
+        self._contexts: dict[str, object] = {}
+
+    def context_for(self, site_config: SiteConfig, timeout: int):
+        if site_config.name in self._contexts:
+            return self._contexts[site_config.name]
+
+        auth_file = get_auth_file_path(site_config.name)
+        with self.login_locks[site_config.name]:
+            context_args, use_auto_login = context_options(site_config, self.config, auth_file)
+            context = self.browser.new_context(**context_args)
+            if use_auto_login:
+                page = context.new_page()
+                page.set_default_timeout(timeout)
+                success = perform_auto_login(page, site_config)
+                page.close()
+                if not success:
+                    context.close()
+                    raise AuthenticationError(
+                        f"Auto-login to {site_config.name} failed. Run with --login for manual login."
+                    )
+                get_logger().info(f"Saving authentication to {auth_file}")
+                context.storage_state(path=str(auth_file))
+
+        self._contexts[site_config.name] = context
+        return context
+
+    def close(self) -> None:
+        for context in self._contexts.values():
+            context.close()
+        self._contexts.clear()
+
+
+def run_many(
+    jobs: list[ScrapeJob],
+    config: SitesConfig,
+    args,
+    headless: bool,
+    index: SeenIndex | None = None,
+) -> int:
+    """
+    Scrape several URLs concurrently.
+
+    Up to `args.workers` worker threads each run a browser and take URLs off
+    a shared queue, so page loads and scroll waits overlap across sites.
+    Every request goes through one AdaptiveRateLimiter per site, so two
+    groups on the same site together stay within that site's limits.
+
+    Returns:
+        Number of URLs that failed
+    """
+    logger = get_logger()
+    limiters = DomainRateLimiters()
+    login_locks: dict[str, threading.Lock] = defaultdict(threading.Lock)
+    stop = threading.Event()
+    failures: list[str] = []
+
+    pending: queue.Queue[ScrapeJob] = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+
+    def scrape_one(pool: ContextPool, job: ScrapeJob) -> None:
+        scroll_delay, timeout = resolve_timing(args, job.site_config, config)
+        limiter = limiters.get(job.site_config.name, site_rate_limit(job.site_config, scroll_delay))
+        context = pool.context_for(job.site_config, timeout)
+        page = context.new_page()
+        page.set_default_timeout(timeout)
+        try:
+            # Page loads count against the site's limits too
+            limiter.wait()
+            logger.info(f"[{job.url}] Navigating")
+            try:
+                page.goto(job.url, wait_until="domcontentloaded")
+            except PlaywrightTimeoutError:
+                logger.warning(f"[{job.url}] Page load timeout, attempting to continue...")
+            run_scrape(
+                page=page,
+                site_config=job.site_config,
+                scrolls=args.scrolls,
+                scroll_delay=scroll_delay,
+                output_path=job.output_path,
+                output_format=args.format,
+                limiter=limiter,
+                stop=stop,
+                label=job.url,
+                index=index,
+                stop_after_known=args.stop_after_seen,
+            )
+        finally:
+            page.close()
+
+    def worker() -> None:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=headless)
+            pool = ContextPool(browser, config, login_locks)
+            try:
+                while not stop.is_set():
+                    try:
+                        job = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        scrape_one(pool, job)
+                    except Exception as e:
+                        logger.error(f"[{job.url}] Scrape failed: {e}")
+                        failures.append(job.url)
+            finally:
+                pool.close()
+                browser.close()
+
+    n_workers = min(args.workers, len(jobs))
+    logger.info(f"Scraping {len(jobs)} URLs with {n_workers} workers")
+    executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="scrape")
+    futures = [executor.submit(worker) for _ in range(n_workers)]
+    try:
+        for future in futures:
+            future.result()
+    except KeyboardInterrupt:
+        # Let in-flight scrapes finish their current scroll and close their files
+        stop.set()
+        executor.shutdown(wait=True)
+        raise
+    executor.shutdown(wait=True)
+
+    logger.info(f"Finished {len(jobs) - len(failures)}/{len(jobs)} URLs")
+    return len(failures)
 
 
 def main() -> int:
@@ -169,28 +457,48 @@ def main() -> int:
         logger.error(str(e))
         return 1
 
-    # Find site config for URL
-    site_config = get_site_config(args.url, config)
-    if not site_config:
-        logger.error(f"No configuration found for URL: {args.url}")
-        logger.error(f"Configured sites: {[s.name for s in config.sites]}")
-        return 1
+    # Find site config for every URL
+    site_configs = []
+    for url in args.urls:
+        site_config = get_site_config(url, config)
+        if not site_config:
+            logger.error(f"No configuration found for URL: {url}")
+            logger.error(f"Configured sites: {[s.name for s in config.sites]}")
+            return 1
+        site_configs.append(site_config)
+
+    headless = args.headless if args.headless is not None else config.global_config.headless
+
+    # Posts saved by earlier runs (skipped unless their text grew)
+    index = None
+    if args.seen_index and not args.login:
+        index = SeenIndex(args.seen_index)
+        logger.debug(f"Seen index: {args.seen_index} ({len(index)} keys)")
+
+    if len(args.urls) > 1:
+        output_dir = args.output or Path(".")
+        paths = multi_output_paths(args.urls, site_configs, output_dir, args.format)
+        jobs = [ScrapeJob(url, sc, path) for url, sc, path in zip(args.urls, site_configs, paths)]
+        try:
+            return 1 if run_many(jobs, config, args, headless, index) else 0
+        except KeyboardInterrupt:
+            logger.info("\nScrape interrupted by user")
+            return 130
+        except Exception as e:
+            logger.exception(f"Unexpected error: {e}")
+            return 1
+        finally:
+            if index:
+                index.close()
+
+    url = args.urls[0]
+    site_config = site_configs[0]
 
     # Determine auth file location
     auth_file = get_auth_file_path(site_config.name)
 
     # Merge config values (CLI > site config > global config)
-    scroll_delay = (
-        args.scroll_delay
-        or site_config.scraper_config.scroll_delay
-        or config.global_config.default_scroll_delay
-    )
-    timeout = (
-        args.timeout
-        or site_config.scraper_config.timeout
-        or config.global_config.default_timeout
-    )
-    headless = args.headless if args.headless is not None else config.global_config.headless
+    scroll_delay, timeout = resolve_timing(args, site_config, config)
 
     # Determine output path
     if args.output:
@@ -199,7 +507,7 @@ def main() -> int:
         safe_name = site_config.name.lower().replace(" ", "_")
         output_path = Path(f"{safe_name}_data.{args.format}")
 
-    logger.info(f"Scraping: {args.url}")
+    logger.info(f"Scraping: {url}")
     logger.info(f"Site: {site_config.name}")
     logger.debug(f"Auth file: {auth_file}")
     logger.debug(f"Headless: {headless}, Timeout: {timeout}ms")
@@ -210,29 +518,7 @@ def main() -> int:
             browser = p.chromium.launch(headless=headless)
 
             # Set up context with auth and user agent
-            context_args = {}
-            use_auto_login = False
-            if auth_file.exists() and not args.login:
-                logger.info("Using saved authentication")
-                context_args["storage_state"] = str(auth_file)
-            elif site_config.login_required and not args.login:
-                # Check if we have credentials for auto-login
-                if site_config.credential_email_secret:
-                    logger.info("Will attempt auto-login with stored credentials")
-                    use_auto_login = True
-                else:
-                    logger.warning(
-                        f"Site requires login but no auth found. "
-                        f"Run with --login first."
-                    )
-
-            # Set user agent (required for sites like Reddit)
-            user_agent = (
-                site_config.user_agent
-                or config.global_config.user_agent
-                or "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            context_args["user_agent"] = user_agent
+            context_args, use_auto_login = context_options(site_config, config, auth_file, args.login)
 
             context = browser.new_context(**context_args)
             page = context.new_page()
@@ -251,9 +537,9 @@ def main() -> int:
                     return 1
 
             # Navigate to URL
-            logger.info(f"Navigating to: {args.url}")
+            logger.info(f"Navigating to: {url}")
             try:
-                page.goto(args.url, wait_until="domcontentloaded")
+                page.goto(url, wait_until="domcontentloaded")
             except PlaywrightTimeoutError:
                 logger.warning("Page load timeout, attempting to continue...")
 
@@ -268,6 +554,8 @@ def main() -> int:
                     scroll_delay=scroll_delay,
                     output_path=output_path,
                     output_format=args.format,
+                    index=index,
+                    stop_after_known=args.stop_after_seen,
                 )
 
             browser.close()
@@ -278,6 +566,9 @@ def main() -> int:
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
         return 1
+    finally:
+        if index:
+            index.close()
 
     return 0
 
@@ -17,9 +17,9 @@ from .exceptions import (
 )
 from .config import load_config, get_site_config, get_auth_file_path
 from .extractor import extract_all_posts, ExtractionMetrics
-from .deduplicator import PostDeduplicator
-from .storage import get_storage_backend, STORAGE_BACKENDS
-from .rate_limiter import AdaptiveRateLimiter, RateLimitConfig
+from .deduplicator import PostDeduplicator, SeenIndex
+from .storage import get_storage_backend, read_json_array, read_jsonl, STORAGE_BACKENDS
+from .rate_limiter import AdaptiveRateLimiter, DomainRateLimiters, RateLimitConfig
 from .logging_config import setup_logging, get_logger
 from .auth import perform_auto_login, ensure_authenticated, read_secret
 
@@ -44,11 +44,15 @@ __all__ = [
     "ExtractionMetrics",
     # Deduplication
     "PostDeduplicator",
+    "SeenIndex",
     # Storage
     "get_storage_backend",
+    "read_json_array",
+    "read_jsonl",
     "STORAGE_BACKENDS",
     # Rate Limiting
     "AdaptiveRateLimiter",
+    "DomainRateLimiters",
     "RateLimitConfig",
     # Logging
     "setup_logging",
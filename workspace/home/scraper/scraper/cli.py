@@ -3,7 +3,7 @@
 import argparse
 from pathlib import Path
 
-from .config import get_env_config
+from .config import get_env_config, get_seen_index_path
 from .storage import STORAGE_BACKENDS
 
 
@@ -26,20 +26,36 @@ Examples:
   # Run headless with JSON output
   scraper --url "..." --headless --format json --output data.json
 
+  # Scrape several groups concurrently (one output file per URL in out/)
+  scraper --url "https://reddit.com/r/a" "https://reddit.com/r/b" --workers 2 -o out/
+  scraper --url-file groups.txt --workers 3
+
+  # Re-scrape a group, stopping once 30 already-saved posts come in a row
+  scraper --url "..." --stop-after-seen 30
+
 Environment Variables:
   SCRAPER_LOG_LEVEL     Log level (DEBUG, INFO, WARNING, ERROR)
   SCRAPER_HEADLESS      Run browser headless (true/false)
   SCRAPER_SCROLL_DELAY  Delay between scrolls in seconds
   SCRAPER_TIMEOUT       Page timeout in milliseconds
   SCRAPER_CONFIG_FILE   Path to sites.json configuration
+  SCRAPER_WORKERS       Concurrent browsers for multi-URL runs
+  SCRAPER_SEEN_INDEX    Cross-run seen-posts index (SQLite)
         """,
     )
 
-    # Required arguments
+    # Target arguments (at least one URL required)
     parser.add_argument(
         "--url",
-        required=True,
-        help="URL of the page to scrape",
+        nargs="+",
+        default=[],
+        help="URL(s) of the page(s) to scrape",
+    )
+    parser.add_argument(
+        "--url-file",
+        type=Path,
+        default=None,
+        help="File with one URL per line (blank lines and # comments ignored)",
     )
 
     # Mode arguments
@@ -68,13 +84,37 @@ Environment Variables:
         default=None,
         help="Page timeout in milliseconds (default: 15000)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Concurrent browsers when scraping several URLs (default: 3)",
+    )
 
     # Output options
     parser.add_argument(
         "--output", "-o",
         type=Path,
         default=None,
-        help="Output file path",
+        help="Output file path (output directory when scraping several URLs)",
+    )
+    parser.add_argument(
+        "--seen-index",
+        type=Path,
+        default=None,
+        help="Index of posts saved by earlier runs; only new or grown posts are written",
+    )
+    parser.add_argument(
+        "--no-seen-index",
+        action="store_true",
+        help="Ignore earlier runs and write every post found",
+    )
+    parser.add_argument(
+        "--stop-after-seen",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Stop scrolling after N already-saved posts in a row (default: off)",
     )
     parser.add_argument(
         "--format", "-f",
@@ -148,11 +188,46 @@ def merge_config(args: argparse.Namespace) -> argparse.Namespace:
     if args.scrolls is None:
         args.scrolls = 10
 
+    if args.workers is None:
+        args.workers = env_config.get("workers", 3)
+
+    if args.no_seen_index:
+        args.seen_index = None
+    elif args.seen_index is None:
+        args.seen_index = env_config.get("seen_index") or get_seen_index_path()
+
     return args
 
 
+def read_url_file(path: Path) -> list[str]:
+    """Read URLs from a file, one per line, skipping blanks and # comments."""
+    urls = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
 def parse_args() -> argparse.Namespace:
     """Parse and validate command-line arguments."""
     parser = create_parser()
     args = parser.parse_args()
+
+    # Collect URLs from --url and --url-file, keeping order and dropping repeats
+    urls = list(args.url)
+    if args.url_file:
+        try:
+            urls.extend(read_url_file(args.url_file))
+        except OSError as e:
+            parser.error(f"cannot read --url-file: {e}")
+    args.urls = list(dict.fromkeys(urls))
+
+    if not args.urls:
+        parser.error("at least one URL is required (--url or --url-file)")
+    if args.login and len(args.urls) > 1:
+        parser.error("--login takes a single URL")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
     return merge_config(args)
@@ -68,11 +68,27 @@ def get_site_config(url: str, config: SitesConfig) -> SiteConfig | None:
     return None
 
 
-def get_auth_file_path(site_name: str) -> Path:
+def get_data_dir() -> Path:
     """
-    Get secure path for authentication storage.
+    Get the scraper's data directory.
 
     Uses XDG_DATA_HOME on Unix, AppData on Windows.
+    """
+    if os.name == "nt":  # Windows
+        data_dir = Path(os.getenv("APPDATA", Path.home() / "AppData/Roaming"))
+    else:  # Unix-like
+        data_dir = Path(os.getenv("XDG_DATA_HOME", Path.home() / ".local/share"))
+    return data_dir / "scraper"
+
+
+def get_seen_index_path() -> Path:
+    """Default location of the cross-run seen-posts index."""
+    return get_data_dir() / "seen.db"
+
+
+def get_auth_file_path(site_name: str) -> Path:
+    """
+    Get secure path for authentication storage.
 
     Args:
         site_name: Name of the site
@@ -80,12 +96,7 @@ def get_auth_file_path(site_name: str) -> Path:
     Returns:
         Path to auth file
     """
-    if os.name == "nt":  # Windows
-        data_dir = Path(os.getenv("APPDATA", Path.home() / "AppData/Roaming"))
-    else:  # Unix-like
-        data_dir = Path(os.getenv("XDG_DATA_HOME", Path.home() / ".local/share"))
-
-    auth_dir = data_dir / "scraper" / "auth"
+    auth_dir = get_data_dir() / "auth"
     auth_dir.mkdir(parents=True, exist_ok=True)
 
     # Set restrictive permissions (Unix only)
@@ -118,6 +129,8 @@ def get_env_config() -> dict:
         SCRAPER_SCROLL_DELAY: float seconds
         SCRAPER_TIMEOUT: int milliseconds
         SCRAPER_CONFIG_FILE: path to sites.json
+        SCRAPER_WORKERS: int concurrent browsers for multi-URL runs
+        SCRAPER_SEEN_INDEX: path to the cross-run seen-posts index
 
     Returns:
         Dict of environment-based config overrides
@@ -145,4 +158,13 @@ def get_env_config() -> dict:
     if config_file := os.getenv("SCRAPER_CONFIG_FILE"):
         config["config_file"] = Path(config_file)
 
+    if seen_index := os.getenv("SCRAPER_SEEN_INDEX"):
+        config["seen_index"] = Path(seen_index)
+
+    if workers := os.getenv("SCRAPER_WORKERS"):
+        try:
+            config["workers"] = max(1, int(workers))
+        except ValueError:
+            pass
+
     return config
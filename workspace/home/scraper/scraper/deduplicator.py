@@ -1,18 +1,114 @@
 """Content-based deduplication for posts."""
 
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
 from .logging_config import get_logger
 from .models import Post
 
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    key        TEXT PRIMARY KEY,
+    text_len   INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen  REAL NOT NULL
+);
+"""
+
+
+class SeenIndex:
+    """
+    On-disk index of posts emitted by previous runs.
+
+    Posts are keyed by content hash and, when they have one, by URL with the
+    text length alongside, so a post whose text grew since it was last saved
+    (e.g. a "See more" that got expanded) is recognised as an update rather
+    than a duplicate. Shared safely between threads.
+
+    Checking and recording are separate: a post is only recorded once it has
+    been written and the output closed (PostDeduplicator.commit), so a crash
+    or write failure never marks unsaved posts as seen.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(post: Post) -> list[str]:
+        keys = [post.content_hash]
+        if post.url:
+            keys.append(f"url:{post.url}")
+        return keys
+
+    def is_known(self, post: Post) -> bool:
+        """
+        Check whether an earlier run already saved this post.
+
+        Returns:
+            False if the post is new (or longer than the saved version)
+        """
+        keys = self._keys(post)
+        with self._lock, self._db:
+            marks = ",".join("?" * len(keys))
+            rows = dict(self._db.execute(
+                f"SELECT key, text_len FROM seen WHERE key IN ({marks})", keys
+            ).fetchall())
+            known = post.content_hash in rows or any(
+                text_len >= len(post.text) for text_len in rows.values()
+            )
+            if known:
+                self._db.execute(
+                    f"UPDATE seen SET last_seen = ? WHERE key IN ({marks})", (time.time(), *keys)
+                )
+            return known
+
+    def record(self, posts: Iterable[Post]) -> None:
+        """Record posts that have been saved, in one transaction."""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO seen (key, text_len, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET text_len = MAX(text_len, excluded.text_len), "
+                "last_seen = excluded.last_seen",
+                [(key, len(post.text), now, now) for post in posts for key in self._keys(post)],
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM seen").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
 class PostDeduplicator:
     """
     Deduplicator using content hashing.
 
-    Tracks posts by their content hash and handles updates.
+    Tracks posts by their content hash and handles updates. With a
+    SeenIndex, posts already saved by an earlier run are skipped too, and
+    `consecutive_known` counts how many of those came in a row. Posts
+    reported via `written()` reach the index only on `commit()`.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, index: SeenIndex | None = None) -> None:
         self.seen: dict[str, Post] = {}
+        self.index = index
+        self.known = 0
+        self.consecutive_known = 0
+        self._written: list[Post] = []
 
     def add_or_update(self, post: Post) -> bool:
         """
@@ -29,6 +125,11 @@ class PostDeduplicator:
 
         if content_hash not in self.seen:
             self.seen[content_hash] = post
+            if self.index is not None and self.index.is_known(post):
+                self.known += 1
+                self.consecutive_known += 1
+                return False
+            self.consecutive_known = 0
             return True
 
         # Check if this is an update (same author, different text length)
@@ -40,6 +141,17 @@ class PostDeduplicator:
 
         return False
 
+    def written(self, post: Post) -> None:
+        """Note that a post returned by add_or_update() was appended to the output."""
+        if self.index is not None:
+            self._written.append(post)
+
+    def commit(self) -> None:
+        """Record written posts in the index; call once the output is closed."""
+        if self.index is not None and self._written:
+            self.index.record(self._written)
+            self._written = []
+
     def get_unique_posts(self) -> list[Post]:
         """Get all unique posts."""
         return list(self.seen.values())
@@ -264,6 +264,196 @@ def extract_post(
         return None
 
 
+# Walks every post container once inside the page and returns all configured
+# fields as one JSON payload. Each field comes back as [status, value] with
+# status "ok", "not_found" or "error", mirroring the per-element path.
+_BATCH_EXTRACT_JS = """(spec) => {
+    const read = (el, type) => type === 'href' ? (el.getAttribute('href') || '') : el.innerText.trim();
+    const out = [];
+    for (const post of document.querySelectorAll(spec.container)) {
+        const attrs = {};
+        for (const [name, attr] of Object.entries(spec.attributes)) {
+            try {
+                attrs[name] = ['ok', (post.getAttribute(attr) || '').trim()];
+            } catch (e) {
+                attrs[name] = ['error', ''];
+            }
+        }
+        const fields = {};
+        for (const f of spec.fields) {
+            try {
+                const target = post.querySelector(f.selector);
+                fields[f.name] = target ? ['ok', read(target, f.type)] : ['not_found', ''];
+            } catch (e) {
+                fields[f.name] = ['error', ''];
+            }
+        }
+        const comments = [];
+        if (spec.comments) {
+            try {
+                for (const c of post.querySelectorAll(spec.comments.container)) {
+                    try {
+                        const a = spec.comments.author ? c.querySelector(spec.comments.author) : null;
+                        const t = spec.comments.text ? c.querySelector(spec.comments.text) : null;
+                        if (a && t) comments.push([a.innerText.trim(), t.innerText.trim()]);
+                    } catch (e) {
+                        comments.push(null);
+                    }
+                }
+            } catch (e) {}
+        }
+        out.push({attrs, fields, comments});
+    }
+    return out;
+}"""
+
+
+def _selector_of(scraper_config: ScraperDefinition | dict | str | None) -> str:
+    """Selector string from any of the shapes a scrapers entry can take."""
+    if scraper_config is None:
+        return ""
+    if isinstance(scraper_config, str):
+        return scraper_config
+    if isinstance(scraper_config, dict):
+        return scraper_config.get("selector", "")
+    return getattr(scraper_config, "selector", "")
+
+
+def build_batch_spec(site_config: SiteConfig) -> dict:
+    """
+    Describe a site's extraction rules for the in-page batch extractor.
+
+    Uses the same field selection as extract_post: comment/container keys
+    are left to the comment spec, everything else is a post field.
+    """
+    fields = []
+    for key, scraper_config in site_config.scrapers.items():
+        if "comment" in key.lower() or "container" in key.lower():
+            continue
+        if isinstance(scraper_config, dict):
+            field_type = scraper_config.get("type", "text")
+        else:
+            field_type = scraper_config.type
+        fields.append({"name": key, "selector": _selector_of(scraper_config), "type": field_type})
+
+    comments = None
+    container = _selector_of(site_config.scrapers.get("comments_container_selector"))
+    if container:
+        comments = {
+            "container": container,
+            "author": _selector_of(site_config.scrapers.get("comment_author")) or None,
+            "text": _selector_of(site_config.scrapers.get("comment_text")) or None,
+        }
+
+    return {
+        "container": site_config.post_container_selector,
+        "attributes": dict(site_config.attribute_map),
+        "fields": fields,
+        "comments": comments,
+    }
+
+
+def post_from_batch_item(
+    item: dict,
+    site_config: SiteConfig,
+    page_title: str,
+    metrics: ExtractionMetrics,
+) -> Post | None:
+    """
+    Build a Post from one container's batch payload.
+
+    Applies the same precedence, validation and metrics as extract_post.
+    """
+    logger = get_logger()
+
+    data = {
+        "source": site_config.name,
+        "group": page_title,
+    }
+
+    # Method 1: attribute values
+    for field_name, (status, value) in item["attrs"].items():
+        data[field_name] = value
+        if status == "error":
+            metrics.record_failure(field_name, "error")
+        elif value:
+            metrics.record_success(field_name)
+        else:
+            metrics.record_failure(field_name, "empty")
+
+    # Method 2: selector values (only fill what attributes left empty)
+    for key, (status, value) in item["fields"].items():
+        if status == "ok" and value:
+            metrics.record_success(key)
+        elif status == "ok":
+            metrics.record_failure(key, "empty")
+        else:
+            metrics.record_failure(key, status)
+        field_name = key.lower()
+        if field_name not in data or not data[field_name]:
+            data[field_name] = value
+
+    comments = []
+    for entry in item["comments"]:
+        if entry is None:
+            metrics.record_failure("comment", "error")
+            continue
+        author, text = entry
+        if not text:
+            continue
+        try:
+            comments.append(Comment(author=author, text=text))
+            metrics.record_success("comment")
+        except Exception as e:
+            logger.debug(f"Failed to extract comment: {e}")
+            metrics.record_failure("comment", "error")
+    data["comments"] = comments
+
+    # Validate - must have text
+    if not data.get("text"):
+        metrics.record_failure("post", "no_text")
+        return None
+
+    try:
+        post = Post(**data)
+        metrics.record_success("post")
+        return post
+    except Exception as e:
+        logger.debug(f"Failed to create Post model: {e}")
+        metrics.record_failure("post", "validation_error")
+        return None
+
+
+def extract_all_posts_batch(
+    page: Page,
+    site_config: SiteConfig,
+    metrics: ExtractionMetrics,
+) -> list[Post]:
+    """
+    Extract all posts with a single in-page JavaScript call.
+
+    One browser round-trip per page instead of several per field per post.
+
+    Raises:
+        Exception: Whatever page.evaluate raises; callers fall back to the
+            per-element path.
+    """
+    logger = get_logger()
+
+    page_title = page.title()
+    items = page.evaluate(_BATCH_EXTRACT_JS, build_batch_spec(site_config))
+    logger.debug(f"Found {len(items)} post containers")
+
+    posts = []
+    for item in items:
+        post = post_from_batch_item(item, site_config, page_title, metrics)
+        if post:
+            posts.append(post)
+
+    logger.info(f"Extracted {len(posts)} valid posts from {len(items)} containers")
+    return posts
+
+
 def extract_all_posts(
     page: Page,
     site_config: SiteConfig,
@@ -272,6 +462,10 @@ def extract_all_posts(
     """
     Extract all posts from a page.
 
+    Uses the batched in-page extractor unless the site sets
+    `extraction_mode: "element"`, and falls back to the per-element path
+    if the batch call fails.
+
     Args:
         page: Playwright page instance
         site_config: Site configuration
@@ -285,6 +479,33 @@ def extract_all_posts(
     if metrics is None:
         metrics = ExtractionMetrics()
 
+    if site_config.scraper_config.extraction_mode == "batch":
+        try:
+            return extract_all_posts_batch(page, site_config, metrics)
+        except Exception as e:
+            logger.warning(f"Batch extraction failed, falling back to per-element: {e}")
+
+    return extract_all_posts_per_element(page, site_config, metrics)
+
+
+def extract_all_posts_per_element(
+    page: Page,
+    site_config: SiteConfig,
+    metrics: ExtractionMetrics,
+) -> list[Post]:
+    """
+    Extract all posts with per-element Playwright queries.
+
+    Args:
+        page: Playwright page instance
+        site_config: Site configuration
+        metrics: Metrics tracker
+
+    Returns:
+        List of extracted posts
+    """
+    logger = get_logger()
+
     posts = []
     page_title = page.title()
 
@@ -77,6 +77,8 @@ class SiteScraperConfig(BaseModel):
     timeout: int | None = None
     rate_limit_rpm: int = Field(default=20, ge=1, le=60)
     max_scrolls: int | None = None
+    # "batch": one in-page JS call per extraction; "element": per-field queries
+    extraction_mode: Literal["batch", "element"] = "batch"
 
 
 class SiteConfig(BaseModel):
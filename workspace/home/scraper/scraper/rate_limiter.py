@@ -1,5 +1,6 @@
 """Adaptive rate limiting for scraping."""
 
+import threading
 from dataclasses import dataclass, field
 from time import sleep, time
 
@@ -22,18 +23,25 @@ class AdaptiveRateLimiter:
     Rate limiter with exponential backoff.
 
     Tracks request timing and adjusts delays based on success/failure.
+    Thread-safe: when several scrapes share one limiter, wait() lets them
+    through one at a time so their combined rate stays within the limits.
     """
 
     config: RateLimitConfig = field(default_factory=RateLimitConfig)
     request_times: list[float] = field(default_factory=list)
     current_delay: float = field(init=False)
     consecutive_errors: int = field(default=0)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.current_delay = self.config.min_delay
 
     def wait(self) -> None:
         """Wait appropriate time before next request."""
+        with self._lock:
+            self._wait()
+
+    def _wait(self) -> None:
         logger = get_logger()
         now = time()
 
@@ -56,21 +64,55 @@ class AdaptiveRateLimiter:
 
     def record_success(self) -> None:
         """Reset delay after successful request."""
-        self.consecutive_errors = 0
-        self.current_delay = max(
-            self.config.min_delay,
-            self.current_delay / self.config.backoff_multiplier,
-        )
+        with self._lock:
+            self.consecutive_errors = 0
+            self.current_delay = max(
+                self.config.min_delay,
+                self.current_delay / self.config.backoff_multiplier,
+            )
 
     def record_error(self) -> None:
         """Increase delay after error."""
         logger = get_logger()
-        self.consecutive_errors += 1
-        self.current_delay = min(
-            self.config.max_delay,
-            self.current_delay * self.config.backoff_multiplier,
-        )
+        with self._lock:
+            self.consecutive_errors += 1
+            self.current_delay = min(
+                self.config.max_delay,
+                self.current_delay * self.config.backoff_multiplier,
+            )
         logger.warning(
             f"Error #{self.consecutive_errors}, "
             f"increasing delay to {self.current_delay:.1f}s"
         )
+
+
+class DomainRateLimiters:
+    """
+    One shared AdaptiveRateLimiter per site.
+
+    Limiters are keyed by the site config's name, not the URL's hostname, so
+    www., m. and bare-host URLs of one site share a budget. Concurrent scrapes
+    of the same site draw from the same limiter, so running several groups in
+    parallel never exceeds that site's limits, while different sites are
+    limited independently.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: dict[str, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, site_name: str, config: RateLimitConfig) -> AdaptiveRateLimiter:
+        """
+        Get the limiter for a site, creating it on first use.
+
+        Args:
+            site_name: Name of the site config the URL matched
+            config: Limits to use if the site has no limiter yet
+
+        Returns:
+            The site's shared limiter
+        """
+        with self._lock:
+            if site_name not in self._limiters:
+                self._limiters[site_name] = AdaptiveRateLimiter(config)
+            return self._limiters[site_name]
@@ -1,6 +1,7 @@
 """Storage backends for scraped data."""
 
 import csv
+import gzip
 import json
 from abc import ABC, abstractmethod
 from pathlib import Path
@@ -71,28 +72,75 @@ class JSONLStorage(StorageBackend):
 
 class JSONStorage(StorageBackend):
     """
-    Standard JSON array storage.
+    Standard JSON array storage, written incrementally.
 
-    Best for small datasets that need to be read as a whole.
+    Each post is written as one array element per line as soon as it is
+    appended, so memory stays flat and a crash keeps everything up to the
+    last post; read_json_array() recovers such an unterminated file.
+    close() writes the closing bracket.
     """
 
-    def __init__(self, path: Path, indent: int = 2):
+    def __init__(self, path: Path):
         self.path = path
-        self.indent = indent
-        self._posts: list[dict] = []
+        self._file: IO | None = None
+        self._count = 0
 
     def open(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self._posts = []
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[")
+        self._count = 0
 
     def close(self) -> None:
-        self.path.write_text(
-            json.dumps(self._posts, indent=self.indent, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        if self._file:
+            self._file.write("\n]\n" if self._count else "]\n")
+            self._file.close()
+            self._file = None
 
     def append(self, post: Post) -> None:
-        self._posts.append(post.model_dump(mode="json"))
+        if not self._file:
+            raise RuntimeError("Storage not opened")
+        separator = ",\n" if self._count else "\n"
+        data = post.model_dump(mode="json")
+        self._file.write(separator + json.dumps(data, ensure_ascii=False))
+        self._file.flush()
+        self._count += 1
+
+
+class GzipJSONLStorage(StorageBackend):
+    """
+    Gzip-compressed JSON Lines storage.
+
+    Best for large scrapes: typically 5-10x smaller than plain JSONL. The
+    stream is sync-flushed every `flush_every` posts, so a crash loses at
+    most that many; read_jsonl() reads a truncated file up to that point.
+    """
+
+    def __init__(self, path: Path, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self._file: gzip.GzipFile | None = None
+        self._pending = 0
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, "wb")
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def append(self, post: Post) -> None:
+        if not self._file:
+            raise RuntimeError("Storage not opened")
+        data = post.model_dump(mode="json")
+        self._file.write((json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
 
 
 class CSVStorage(StorageBackend):
@@ -159,15 +207,69 @@ STORAGE_BACKENDS: dict[str, type[StorageBackend]] = {
     "csv": CSVStorage,
     "json": JSONStorage,
     "jsonl": JSONLStorage,
+    "jsonl.gz": GzipJSONLStorage,
 }
 
 
+def read_json_array(path: Path) -> list[dict]:
+    """
+    Read a JSONStorage file, including one left unterminated by a crash.
+
+    Args:
+        path: File written by JSONStorage
+
+    Returns:
+        The posts that were fully written
+    """
+    text = path.read_text(encoding="utf-8")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # One element per line: keep every line that parses on its own
+    posts = []
+    for line in text.splitlines()[1:]:
+        line = line.rstrip().rstrip(",")
+        if line in ("", "]"):
+            continue
+        try:
+            posts.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    return posts
+
+
+def read_jsonl(path: Path) -> list[dict]:
+    """
+    Read a JSONL or gzip JSONL file, stopping cleanly at a truncated tail.
+
+    Args:
+        path: File written by JSONLStorage or GzipJSONLStorage
+
+    Returns:
+        The posts that were fully written
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    posts = []
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    posts.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    except (EOFError, gzip.BadGzipFile):
+        pass  # Compressed stream cut off mid-write
+    return posts
+
+
 def get_storage_backend(format: str, path: Path) -> StorageBackend:
     """
     Get a storage backend by format name.
 
     Args:
-        format: One of 'csv', 'json', 'jsonl'
+        format: One of 'csv', 'json', 'jsonl', 'jsonl.gz'
         path: Output file path
 
     Returns:
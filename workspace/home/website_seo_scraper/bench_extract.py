@@ -0,0 +1,548 @@
+"""
+Benchmark + equivalence check for the parse-once extractor pipeline.
+
+Compares extractor.extract against the previous implementation (kept
+verbatim below), which parsed every page three times (document, reparsed
+content clone, head hash) and walked the tree once per selector. Reports
+per-page timings and exits non-zero if any extraction differs.
+
+Usage:
+    python3 bench_extract.py                      # synthetic CMS-style pages
+    python3 bench_extract.py saved/ page.html     # saved HTML files / directories
+"""
+
+import copy
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from extractor.extractor import (
+    CONTENT_PREFER, IMAGE_EXT_RE, NOISE_CONTAINERS, SCHEMA_VERSION, SOCIAL_DOMAINS, TOOL_VERSION,
+    dedupe_by_url, extract, get_attr, get_selector, has_level_skips, head_hash,
+    is_internal_href, jaccard, now_iso, parse_srcset_for_largest, pick_largest_text_block, safe,
+)
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation (reference)
+# ---------------------------------------------------------------------------
+def _legacy_build_clean_root(soup):
+    scope = None
+    for sel in CONTENT_PREFER:
+        found = soup.select_one(sel)
+        if found:
+            scope = found
+            break
+    if not scope:
+        scope = pick_largest_text_block(soup)
+    # clone by creating new soup from str(scope)
+    clone = BeautifulSoup(str(scope), "lxml")
+
+    # remove obvious noise
+    for sel in NOISE_CONTAINERS:
+        for n in clone.select(sel):
+            n.decompose()
+
+    # strip elements with inline fixed/overlay hints
+    for n in clone.select("[style*='position:fixed'], [style*='z-index']"):
+        n.decompose()
+
+    # remove iframes again (defensive)
+    for n in clone.select("iframe"):
+        n.decompose()
+
+    return clone
+
+
+def _legacy_text_from(root):
+    for n in root.select("script,style,template,noscript"):
+        n.decompose()
+    return root.get_text("\n", strip=True)
+
+
+def _legacy_extract_meta(soup, url):
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    meta_all = []
+    for m in soup.find_all("meta"):
+        meta_all.append({
+            "name": m.get("name"),
+            "property": m.get("property"),
+            "httpEquiv": m.get("http-equiv"),
+            "content": m.get("content")
+        })
+    def first_meta(selector):
+        el = soup.select_one(selector)
+        return el.get("content","") if el else ""
+    description = first_meta('meta[name="description"],meta[property="description"]')
+    robots = first_meta('meta[name="robots"]')
+    canonical = safe(lambda: soup.select_one('link[rel="canonical"]').get("href",""), "")
+    lang = soup.html.get("lang","") if soup.html else ""
+    viewport = first_meta('meta[name="viewport"]')
+    charset = safe(lambda: soup.select_one("meta[charset]")["charset"], "")
+
+    # OG/Twitter
+    og, tw = {}, {}
+    for m in meta_all:
+        if m["property"] and str(m["property"]).lower().startswith("og:"):
+            og[m["property"][3:]] = m["content"] or ""
+        if m["name"] and str(m["name"]).lower().startswith("twitter:"):
+            tw[m["name"][8:]] = m["content"] or ""
+
+    link_rels = []
+    for l in soup.find_all("link"):
+        link_rels.append({
+            "rel": l.get("rel")[0] if l.get("rel") else None,
+            "href": l.get("href"),
+            "as": l.get("as"),
+            "type": l.get("type"),
+            "hreflang": l.get("hreflang"),
+            "sizes": l.get("sizes")
+        })
+
+    return {
+        "meta": {
+            "title": title,
+            "titleLength": len(title),
+            "description": description,
+            "descriptionLength": len(description),
+            "robots": robots,
+            "hasRobots": bool(robots),
+            "canonical": canonical,
+            "hasCanonical": bool(canonical),
+            "language": lang,
+            "viewport": viewport,
+            "charset": charset
+        },
+        "metaAll": meta_all,
+        "openGraph": {
+            "title": og.get("title",""),
+            "description": og.get("description",""),
+            "image": og.get("image",""),
+            "url": og.get("url",""),
+            "type": og.get("type",""),
+            "site_name": og.get("site_name", og.get("site","")),
+            "locale": og.get("locale","")
+        },
+        "twitter": {
+            "card": tw.get("card",""),
+            "title": tw.get("title",""),
+            "description": tw.get("description",""),
+            "image": tw.get("image", tw.get("image:src","")),
+            "site": tw.get("site",""),
+            "creator": tw.get("creator","")
+        },
+        "linkRels": link_rels
+    }
+
+
+def _legacy_extract_headings(root, page_title):
+    items = []
+    for n in root.select("h1,h2,h3,h4,h5,h6"):
+        items.append({"tag": n.name.lower(), "text": (n.get_text(" ", strip=True) or "").strip(), "id": n.get("id")})
+    h1s = [i for i in items if i["tag"] == "h1"]
+    summary = {
+        "h1Count": len(h1s),
+        "duplicateH1": len(h1s) != 1,
+        "invalidStructure": has_level_skips(items),
+        "titleH1Similarity": round(jaccard(page_title, h1s[0]["text"] if h1s else ""), 2)
+    }
+    return {"items": items, "summary": summary}
+
+
+def _legacy_extract_links(root, origin):
+    anchors = []
+    for a in root.select("a[href]"):
+        href = a.get("href") or ""
+        abs_url = safe(lambda: urljoin(origin, href), "")
+        rel = a.get("rel")
+        rel_str = " ".join(rel) if isinstance(rel, list) else (rel or "")
+        nofollow = bool(re.search(r"\bnofollow\b", rel_str, re.I)) if rel_str else None
+        noopener = bool(re.search(r"\bnoopener\b", rel_str, re.I)) if rel_str else None
+        target = a.get("target")
+        ctx_tag = "content"
+        p = a.find_parent(["nav","header","footer","aside"])
+        if p: ctx_tag = p.name.lower()
+        is_media = bool(IMAGE_EXT_RE.search(href))
+        anchors.append({
+            "abs": abs_url,
+            "href": href,
+            "text": (a.get_text(" ", strip=True) or "").strip(),
+            "internal": is_internal_href(href, origin),
+            "context": ctx_tag if ctx_tag in ("nav","header","footer","aside") else "content",
+            "rel": rel_str or None,
+            "nofollow": nofollow,
+            "noopener": noopener,
+            "target": target,
+            "isMedia": is_media
+        })
+    internal = [x for x in anchors if x["internal"]]
+    external = [x for x in anchors if not x["internal"] and (x["href"].startswith("http://") or x["href"].startswith("https://"))]
+    return {
+        "counts": {"total": len(anchors), "internal": len(internal), "external": len(external)},
+        "internal": internal[:200],
+        "external": external[:200]
+    }
+
+
+def _legacy_extract_images(root):
+    items = []
+
+    for img in root.find_all("img"):
+        src = get_attr(img, ["src","data-src","data-lazy","data-original"]) or ""
+        srcset = get_attr(img, ["srcset","data-srcset"]) or ""
+        lazy_attr = None
+        for cand in ["data-src","data-lazy","data-original","data-srcset"]:
+            if img.has_attr(cand):
+                lazy_attr = cand
+                break
+        items.append({
+            "tag": "img",
+            "src": src,
+            "srcset": srcset,
+            "alt": img.get("alt",""),
+            "title": img.get("title",""),
+            "loading": img.get("loading",""),
+            "width": img.get("width",""),
+            "height": img.get("height",""),
+            "fromSource": bool(src),
+            "lazyAttr": lazy_attr or ""
+        })
+
+    for source in root.select("picture source"):
+        srcset = get_attr(source, ["srcset","data-srcset"]) or ""
+        largest = parse_srcset_for_largest(srcset) if srcset else ""
+        items.append({
+            "tag": "source",
+            "src": largest or "",
+            "srcset": srcset,
+            "alt": "",
+            "title": "",
+            "fromSource": bool(largest)
+        })
+
+    background_images = []
+    for el in root.select("[style*='background-image']"):
+        style = el.get("style") or ""
+        m = re.search(r"background-image:\s*url\((['\"]?)(.*?)\1\)", style, re.I)
+        if m and m.group(2):
+            background_images.append({"selector": get_selector(el), "url": m.group(2)})
+
+    img_els = root.find_all("img")
+    with_alt = sum(1 for i in img_els if (i.get("alt") or "").strip())
+    missing_alt = max(len(img_els) - with_alt, 0)
+
+    return {
+        "total": len(img_els),
+        "withAlt": with_alt,
+        "missingAlt": missing_alt,
+        "items": items[:500],
+        "backgroundImages": background_images
+    }
+
+
+def _legacy_extract_content(root):
+    scoped_text = re.sub(r"\s+\n", "\n", _legacy_text_from(root))
+    scoped_text = re.sub(r"\n{3,}", "\n\n", scoped_text)
+    blocks = []
+    candidates = root.select("p, li, h1, h2, h3, h4, h5, h6, div")
+    for el in candidates:
+        txt = (el.get_text(" ", strip=True) or "").strip()
+        if len(txt) >= 80:
+            blocks.append({"tag": el.name.lower(), "text": txt[:400]})
+        if len(blocks) >= 50: break
+    return {"scopedText": scoped_text, "blocks": blocks}
+
+
+def _legacy_nearest_label_text(field, form_root):
+    aria = field.get("aria-label")
+    if aria: return aria
+    fid = field.get("id")
+    if fid:
+        lab = form_root.select_one(f'label[for="{fid}"]')
+        if lab: return lab.get_text(" ", strip=True)
+    parent_label = field.find_parent("label")
+    if parent_label: return parent_label.get_text(" ", strip=True)
+    prev = field.find_previous_sibling()
+    hops = 0
+    while prev and hops < 2:
+        t = (prev.get_text(" ", strip=True) or "").strip()
+        if t: return t
+        prev = prev.find_previous_sibling()
+        hops += 1
+    ph = field.get("placeholder")
+    return ph or ""
+
+
+def _legacy_extract_forms(root):
+    forms_out = []
+    for f in root.find_all("form"):
+        fields = []
+        for field in f.select("input, select, textarea"):
+            label_text = (_legacy_nearest_label_text(field, root) or "").strip()
+            t_raw = (field.get("type") or field.name or "text").lower()
+            fields.append({
+                "name": field.get("name",""),
+                "id": field.get("id",""),
+                "label": re.sub(r"[*:]\s*$","", label_text),
+                "required": field.has_attr("required") or bool(re.search(r"\*\s*$", label_text)),
+                "type": t_raw or "text"
+            })
+        forms_out.append({
+            "action": f.get("action",""),
+            "method": (f.get("method","get") or "get").lower(),
+            "fields": fields
+        })
+    return forms_out
+
+
+def _legacy_extract_contacts_social(root):
+    phone_hrefs = [a.get("href","")[4:].strip() for a in root.select('a[href^="tel:"]')]
+    email_hrefs = [a.get("href","")[7:].strip() for a in root.select('a[href^="mailto:"]')]
+    phones = sorted(set(phone_hrefs))
+    emails = sorted(set(email_hrefs))
+
+    social = []
+    for a in root.select("a[href]"):
+        href = a.get("href")
+        if not href: continue
+        try:
+            host = urlparse(href).hostname or ""
+        except Exception:
+            host = ""
+        host = host.lower()
+        if any(d in host for d in SOCIAL_DOMAINS):
+            site = re.sub(r"^www\.", "", host).split(".")[0]
+            social.append({"site": site, "url": href})
+    return {"phones": phones, "emails": emails, "socialProfiles": dedupe_by_url(social)}
+
+
+def _legacy_extract_schema(soup):
+    jsonld = []
+    errors = []
+    for i, s in enumerate(soup.select('script[type="application/ld+json"]')):
+        raw = (s.string or s.get_text() or "").strip()
+        if not raw: continue
+        type_name = ""
+        try:
+            parsed = json.loads(raw)
+            items = parsed if isinstance(parsed, list) else (parsed.get("@graph") if isinstance(parsed, dict) and "@graph" in parsed else [parsed])
+            types = []
+            for it in items:
+                if isinstance(it, dict):
+                    t = it.get("@type")
+                    if isinstance(t, list) and t:
+                        types.append(str(t[0]))
+                    elif isinstance(t, str):
+                        types.append(t)
+            type_name = ", ".join([t for t in types if t])
+        except Exception as e:
+            errors.append({"index": i, "error": str(e)})
+        jsonld.append({"type": type_name, "raw": raw[:50000]})
+
+    microdata = [{"type": el.get("itemtype"), "selector": get_selector(el)} for el in soup.select("[itemscope][itemtype]")]
+    rdfa = [{"typeof": el.get("typeof",""), "vocab": el.get("vocab",""), "selector": get_selector(el)} for el in soup.select("[typeof],[vocab]")]
+    return {"count": len(jsonld)+len(microdata)+len(rdfa), "jsonLd": jsonld, "microdata": microdata, "rdfa": rdfa, "errors": errors}
+
+
+def _legacy_extract_platform_hints(soup):
+    hints = []
+    gens = [ (m.get("content") or "").lower() for m in soup.select('meta[name="generator"]') ]
+    if any("wordpress" in g for g in gens):
+        hints.append({"name":"WordPress","signal":"meta generator","confidence":0.9})
+    hrefs = []
+    for n in soup.find_all(["link","script"]):
+        hrefs.append(n.get("href") or n.get("src") or "")
+    if any(re.search(r"elementor", h or "", re.I) for h in hrefs):
+        hints.append({"name":"Elementor","signal":"assets","confidence":0.9})
+    if any(re.search(r"(et-|divi)", h or "", re.I) for h in hrefs):
+        hints.append({"name":"Divi","signal":"assets","confidence":0.85})
+    if any(re.search(r"(leadconnector|stcdn\.leadconnectorhq\.com)", h or "", re.I) for h in hrefs):
+        hints.append({"name":"GoHighLevel","signal":"CDN","confidence":0.95})
+    body = soup.body
+    body_cls = " ".join(body.get("class", [])) .lower() if body else ""
+    if not any(h["name"]=="WordPress" for h in hints) and re.search(r"\bwp-\w+", body_cls):
+        hints.append({"name":"WordPress","signal":"body class","confidence":0.7})
+    return {"hints": hints}
+
+
+def _legacy_extract_technical(soup, url, diagnostics=False):
+    u = urlparse(url)
+    https = (u.scheme == "https")
+    hreflang = [l.get("hreflang") for l in soup.select('link[rel="alternate"][hreflang]') if l.get("hreflang")]
+    mixed = any(
+        (tag.get("src","").startswith("http://") or tag.get("href","").startswith("http://"))
+        for tag in soup.find_all(["img","script","link"])
+    )
+    perf_timings = {"navigationStart": int(time.time()*1000), "domContentLoaded": None, "loadEvent": None}
+    resource_counts = None
+    if diagnostics:
+        resource_counts = {
+            "script": len(soup.select("script[src]")),
+            "stylesheet": len(soup.select('link[rel="stylesheet"]')),
+            "image": len(soup.select("img")) + len(soup.select("picture source"))
+        }
+    return {"https": https, "hreflang": hreflang, "mixedContentDetected": mixed, "perfTimings": perf_timings, "resourceCounts": resource_counts}
+
+
+def _legacy_extract(html: str, url: str, scoped: bool = True, diagnostics: bool = False) -> dict:
+    start = time.time()
+    soup = BeautifulSoup(html, "lxml")
+    root = _legacy_build_clean_root(soup) if scoped else BeautifulSoup(str(soup.body or soup), "lxml")
+
+    meta_blocks = _legacy_extract_meta(soup, url)
+    headings = _legacy_extract_headings(root, meta_blocks["meta"]["title"])
+    links = _legacy_extract_links(root, f"{urlparse(url).scheme}://{urlparse(url).netloc}")
+    images = _legacy_extract_images(root)
+    content = _legacy_extract_content(root)
+    forms = _legacy_extract_forms(root)
+    contacts_social = _legacy_extract_contacts_social(root)
+    schema = _legacy_extract_schema(soup)
+    platform = _legacy_extract_platform_hints(soup)
+    technical = _legacy_extract_technical(soup, url, diagnostics=diagnostics)
+
+    harvested = {
+        "meta": {
+            "toolVersion": TOOL_VERSION,
+            "schemaVersion": SCHEMA_VERSION,
+            "harvestedAt": now_iso(),
+            "url": url,
+            "domain": urlparse(url).hostname or "",
+            "userAgent": "Scrapy/embedded",
+            "scoped": bool(scoped),
+            "diagnosticsMode": bool(diagnostics),
+            "analysisTimeMs": int((time.time() - start) * 1000),
+        },
+        "extracted": {
+            **meta_blocks,
+            "headings": headings,
+            "links": links,
+            "images": images,
+            "content": content,
+            "forms": forms,
+            "contacts": {"phones": contacts_social["phones"], "emails": contacts_social["emails"]},
+            "socialProfiles": contacts_social["socialProfiles"],
+            "schema": schema,
+            "platform": platform,
+            "technical": technical,
+            "hashes": {"headHash": head_hash(soup.decode())},
+        },
+    }
+    return harvested
+
+
+# ---------------------------------------------------------------------------
+# Synthetic CMS-style pages
+# ---------------------------------------------------------------------------
+_WORDS = (
+    "kitchen remodel bathroom design custom cabinets quartz countertops tile "
+    "flooring lighting plumbing permit estimate schedule warranty local family "
+    "owned licensed insured project gallery before after consultation free"
+).split()
+
+
+def _sentence(rng, lo=8, hi=24) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi))).capitalize() + "."
+
+
+def synthetic_page(sections: int, seed: int = 0) -> str:
+    """WordPress-ish page: admin bar, nav/header/footer, JSON-LD, forms, images, overlays."""
+    rng = random.Random(seed)
+    body = []
+    for i in range(sections):
+        body.append(f'<section class="block block-{i % 4}"><h{2 + i % 3}>{_sentence(rng, 2, 6)}</h{2 + i % 3}>')
+        for _ in range(rng.randint(2, 5)):
+            body.append(f"<p>{_sentence(rng)} <a href=\"/service-{rng.randint(1, 40)}\">{_sentence(rng, 1, 3)}</a></p>")
+        body.append(f'<img src="/img/p{i}.jpg" srcset="/img/p{i}-480.webp 480w, /img/p{i}-1200.webp 1200w" '
+                    f'alt="{_sentence(rng, 0, 3) if i % 3 else ""}" width="800" height="600" loading="lazy">')
+        body.append(f'<div style="background-image:url(\'/img/bg{i}.png\')"><ul>'
+                    + "".join(f"<li>{_sentence(rng, 2, 6)}</li>" for _ in range(4)) + "</ul></div>")
+        if i % 5 == 0:
+            body.append(f'<form action="/contact" method="post"><label for="n{i}">Name</label><input id="n{i}" name="name" required>'
+                        f'<label>Email <input type="email" name="email"></label><textarea aria-label="Message"></textarea>'
+                        f'<select name="svc"><option>Kitchen</option></select><button>Send</button></form>')
+        if i % 7 == 0:
+            body.append('<div class="promo" style="position:fixed;z-index:99">Call now</div><div hidden>stale</div>'
+                        '<script>var x = 1;</script><noscript>enable js</noscript>')
+        body.append("</section>")
+    jsonld = json.dumps({"@context": "https://schema.org", "@type": "HomeAndConstructionBusiness",
+                         "name": "Example Remodeling", "telephone": "+1-555-0100"})
+    return f"""<!DOCTYPE html><html lang="en-US"><head><meta charset="utf-8">
+<title>Example Remodeling | Kitchens &amp; Baths</title>
+<meta name="description" content="{_sentence(rng)}"><meta name="robots" content="index,follow">
+<meta name="viewport" content="width=device-width, initial-scale=1"><meta name="generator" content="WordPress 6.6">
+<meta property="og:title" content="Example Remodeling"><link rel="canonical" href="https://example.com/services/">
+<link rel="alternate" hreflang="es" href="https://example.com/es/"><link rel="stylesheet" href="/wp-content/themes/x/style.css">
+<script src="/wp-includes/js/jquery.js"></script><script src="http://cdn.example.net/legacy.js"></script>
+<script type="application/ld+json">{jsonld}</script></head>
+<body class="page-template-default elementor-page"><div id="wpadminbar">admin</div>
+<header class="site-header"><nav><a href="/">Home</a><a href="/about/">About</a><a href="https://facebook.com/example">Facebook</a></nav></header>
+<div id="content" class="site-content"><main id="main" itemscope itemtype="https://schema.org/WebPage"><article class="hentry">
+<h1>{_sentence(rng, 3, 6)}</h1>{"".join(body)}
+<p>Call <a href="tel:+15550100">555-0100</a> or <a href="mailto:hello@example.com">email us</a>.
+Follow us on <a href="https://www.instagram.com/example/">Instagram</a>.</p>
+<iframe src="https://www.youtube.com/embed/x"></iframe></article></main>
+<aside><h3>Recent posts</h3><a href="/blog/1/">One</a></aside></div>
+<footer><a href="https://www.linkedin.com/company/example">LinkedIn</a><p>&copy; Example</p></footer></body></html>"""
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def _masked(result: dict) -> dict:
+    """Drop the fields that legitimately differ between two runs."""
+    result = copy.deepcopy(result)
+    result["meta"].pop("harvestedAt", None)
+    result["meta"].pop("analysisTimeMs", None)
+    result["extracted"]["technical"].get("perfTimings", {}).pop("navigationStart", None)
+    # added after the reference implementation
+    result["meta"].pop("toolVersion", None)
+    result["extracted"]["content"].pop("wordCount", None)
+    result["extracted"]["hashes"].pop("contentSimHash", None)
+    return result
+
+
+def _best_of(fn, html: str, url: str, scoped: bool, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(html, url, scoped)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(name: str, html: str, url: str = "https://example.com/services/") -> bool:
+    same = True
+    for scoped in (True, False):
+        same &= _masked(extract(html, url, scoped)) == _masked(_legacy_extract(html, url, scoped))
+    t_legacy = _best_of(_legacy_extract, html, url, True)
+    t_new = _best_of(extract, html, url, True)
+    print(f"{name[:32]:<32} {len(html) // 1024:>7} {t_legacy * 1000:>10.1f} {t_new * 1000:>10.1f} "
+          f"{t_legacy / t_new:>7.1f}x  {'OK' if same else 'MISMATCH'}")
+    return same
+
+
+def _html_files(args: list[str]) -> list[Path]:
+    files = []
+    for arg in map(Path, args):
+        files.extend(sorted(arg.rglob("*.htm*")) if arg.is_dir() else [arg])
+    return files
+
+
+def main() -> int:
+    print(f"{'page':<32} {'KiB':>7} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}")
+    if len(sys.argv) > 1:
+        inputs = [(p.name, p.read_text(encoding="utf-8", errors="replace")) for p in _html_files(sys.argv[1:])]
+    else:
+        inputs = [(f"synthetic {n} sections", synthetic_page(n, seed=n)) for n in (10, 50, 200)]
+    ok = all([bench(name, html) for name, html in inputs])
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
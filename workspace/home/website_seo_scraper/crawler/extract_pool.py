@@ -0,0 +1,77 @@
+"""
+Run the HTML extractor in a process pool instead of on the Twisted reactor.
+
+extract() is CPU-bound BeautifulSoup/lxml work; done inline in a
+spider callback it blocks the reactor, so downloads stall while a page is
+analysed and CONCURRENT_REQUESTS is effectively capped by one CPU. Spiders
+that mix in OffReactorExtractMixin hand each page to a pool of worker
+processes and await the result as a Deferred.
+
+Worker count comes from the EXTRACT_WORKERS setting (run.py: --extract-workers);
+0 runs the extractor inline like before.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+
+def default_workers() -> int:
+    """One worker per core, leaving one for the reactor."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class ExtractPool:
+    """ProcessPoolExecutor whose results arrive as Deferreds on the reactor thread."""
+
+    def __init__(self, workers: int):
+        # spawn, not fork: forking a process that's running the reactor and
+        # its thread pool can deadlock the children
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def submit(self, fn, *args, **kwargs) -> defer.Deferred:
+        from twisted.internet import reactor  # imported late so Scrapy picks the reactor
+
+        d = defer.Deferred()
+
+        def done(future: Future):
+            exc = future.exception()
+            if exc is not None:
+                reactor.callFromThread(d.errback, Failure(exc))
+            else:
+                reactor.callFromThread(d.callback, future.result())
+
+        self._executor.submit(fn, *args, **kwargs).add_done_callback(done)
+        return d
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class OffReactorExtractMixin:
+    """Spider mixin providing `await self.run_extractor(fn, ...)`."""
+
+    _extract_pool: ExtractPool | None = None
+
+    async def run_extractor(self, fn, *args, **kwargs):
+        workers = self.settings.getint("EXTRACT_WORKERS", default_workers())
+        if workers <= 0:
+            return fn(*args, **kwargs)
+        if self._extract_pool is None:
+            self._extract_pool = ExtractPool(workers)
+            self.logger.info("Extracting pages in %d worker processes", workers)
+        return await maybe_deferred_to_future(self._extract_pool.submit(fn, *args, **kwargs))
+
+    def closed(self, reason):
+        if self._extract_pool is not None:
+            self._extract_pool.shutdown()
+            self._extract_pool = None
+        parent = getattr(super(), "closed", None)
+        if parent:
+            parent(reason)
@@ -0,0 +1,241 @@
+"""
+Canonicalizing URL frontier: one request per page, in bounded memory.
+
+Scrapy's RFPDupeFilter keeps a fingerprint per request in a Python set, so
+memory grows with the crawl, and it treats /page, /page#top,
+/page?utm_source=x and HTTP://Example.com/page/ as four different pages.
+
+UrlCanonicalizer turns a link into:
+  - clean(url): what we request. The fragment and tracking parameters are
+    removed, the scheme and host are lowercased, default ports dropped.
+  - key(url): what we dedupe on. That is clean(url), plus sorted query
+    parameters, normalized percent-escapes (unreserved characters decoded,
+    reserved ones such as %2F kept), no trailing slash and
+    (optionally) a lowercased path.
+
+CanonicalBloomDupeFilter (DUPEFILTER_CLASS) records key(url) in a
+ScalableBloomFilter: a few bytes per URL, no stored strings. The price is
+a small false-positive rate (FRONTIER_ERROR_RATE, default 1e-4): about
+one unseen URL in 10,000 is taken as already seen and skipped. With
+JOBDIR set, the filter is saved there so paused crawls resume with it.
+
+Settings:
+  FRONTIER_STRIP_PARAMS       query params to drop; "utm_*"-style globs allowed
+  FRONTIER_IGNORE_PATH_CASE   treat /About and /about as one page (default False)
+  FRONTIER_INITIAL_CAPACITY   URLs before the filter first grows (default 100000)
+  FRONTIER_ERROR_RATE         false-positive rate (default 0.0001)
+"""
+
+import hashlib
+import logging
+import math
+import pickle
+import re
+import string
+from fnmatch import fnmatchcase
+from pathlib import Path
+from urllib.parse import quote, unquote_plus, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STRIP_PARAMS = [
+    "utm_*", "gclid", "gbraid", "wbraid", "dclid", "fbclid", "msclkid", "yclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "igshid", "ref_src", "_hsenc", "_hsmi",
+]
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Characters left as-is when quoting a path; everything else gets one canonical escape
+_PATH_SAFE = "/:@!$&'()*+,;=-._~%"
+_ESCAPE_RE = re.compile(r"%[0-9a-fA-F]{2}")
+# Only these may be decoded from an escape without changing the URL (RFC 3986 2.3);
+# %2F and other reserved escapes keep their meaning and stay encoded
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+
+
+def _normalize_escape(match) -> str:
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in _UNRESERVED else match.group(0).upper()
+
+
+class UrlCanonicalizer:
+    def __init__(self, strip_params=None, ignore_path_case: bool = False):
+        patterns = DEFAULT_STRIP_PARAMS if strip_params is None else strip_params
+        self._exact = {p.lower() for p in patterns if "*" not in p and "?" not in p}
+        self._globs = [p.lower() for p in patterns if p.lower() not in self._exact]
+        self.ignore_path_case = ignore_path_case
+
+    @classmethod
+    def from_settings(cls, settings) -> "UrlCanonicalizer":
+        strip = settings.getlist("FRONTIER_STRIP_PARAMS") or None
+        return cls(strip, settings.getbool("FRONTIER_IGNORE_PATH_CASE", False))
+
+    def _tracking(self, name: str) -> bool:
+        name = name.lower()
+        return name in self._exact or any(fnmatchcase(name, g) for g in self._globs)
+
+    def _parts(self, url: str):
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").rstrip(".")
+        if ":" in host:
+            host = f"[{host}]"  # IPv6
+        netloc = host
+        if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+            netloc = f"{host}:{parts.port}"
+        if parts.username:
+            netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+        # raw "name=value" pieces, so kept params are sent exactly as linked
+        params = [
+            piece for piece in parts.query.split("&")
+            if piece and not self._tracking(unquote_plus(piece.split("=", 1)[0]))
+        ]
+        return scheme, netloc, parts.path or "/", params
+
+    def clean(self, url: str) -> str:
+        """URL to request: no fragment or tracking params, lowercase scheme/host."""
+        scheme, netloc, path, params = self._parts(url)
+        return urlunsplit((scheme, netloc, path, "&".join(params), ""))
+
+    def key(self, url: str) -> str:
+        """Dedupe key: clean() plus sorted params, canonical escapes, no trailing slash."""
+        scheme, netloc, path, params = self._parts(url)
+        path = _ESCAPE_RE.sub(_normalize_escape, quote(path, safe=_PATH_SAFE))
+        if len(path) > 1:
+            path = path.rstrip("/") or "/"
+        if self.ignore_path_case:
+            path = path.lower()
+        return urlunsplit((scheme, netloc, path, "&".join(sorted(params)), ""))
+
+
+class BloomFilter:
+    """Fixed-capacity Bloom filter over a bytearray (double hashing, k probes)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _probes(self, digest: bytes):
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._probes(digest))
+
+    def add(self, digest: bytes) -> None:
+        for p in self._probes(digest):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filters chained as they fill (Almeida et al.): each new one is
+    `growth` times larger with a tighter error rate, so the overall
+    false-positive rate stays under `error_rate` however many keys arrive.
+    """
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 1e-4,
+                 growth: int = 2, tightening: float = 0.8):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: list[BloomFilter] = []
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+    def __contains__(self, key: str) -> bool:
+        digest = self._digest(key)
+        return any(digest in f for f in self.filters)
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    def add(self, key: str) -> bool:
+        """Add key; False if it was (probably) already present."""
+        digest = self._digest(key)
+        if any(digest in f for f in self.filters):
+            return False
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            n = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * self.growth ** n,
+                self.error_rate * (1 - self.tightening) * self.tightening ** n,
+            ))
+        self.filters[-1].add(digest)
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(f.bits) for f in self.filters)
+
+
+class CanonicalBloomDupeFilter:
+    """Scrapy dupefilter keyed on canonical URLs, stored in a scalable Bloom filter."""
+
+    def __init__(self, canonicalizer: UrlCanonicalizer, seen: ScalableBloomFilter,
+                 path: Path | None = None, debug: bool = False):
+        self.canonicalizer = canonicalizer
+        self.seen = seen
+        self.path = path
+        self.debug = debug
+        self.dropped = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        seen = None
+        path = None
+        if settings.get("JOBDIR"):
+            path = Path(settings["JOBDIR"]) / "frontier.bloom"
+            if path.exists():
+                with path.open("rb") as f:
+                    seen = pickle.load(f)
+                logger.info("Resumed URL frontier with %d seen URLs from %s", len(seen), path)
+        if seen is None:
+            seen = ScalableBloomFilter(
+                settings.getint("FRONTIER_INITIAL_CAPACITY", 100_000),
+                settings.getfloat("FRONTIER_ERROR_RATE", 1e-4),
+            )
+        return cls(UrlCanonicalizer.from_settings(settings), seen, path, settings.getbool("DUPEFILTER_DEBUG"))
+
+    def request_key(self, request) -> str:
+        key = self.canonicalizer.key(request.url)
+        if request.method != "GET" or request.body:
+            key = f"{request.method} {key} {hashlib.sha1(request.body).hexdigest()}"
+        return key
+
+    def request_seen(self, request) -> bool:
+        key = self.request_key(request)
+        if not self.seen.add(key):
+            redirected_from = request.meta.get("redirect_urls")
+            # /page -> /page/ style redirects land on the key of the URL that
+            # redirected, which is already recorded; let them through
+            if redirected_from and self.canonicalizer.key(redirected_from[-1]) == key:
+                return False
+            return True
+        return False
+
+    def open(self):
+        pass
+
+    def close(self, reason):
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("wb") as f:
+                pickle.dump(self.seen, f)
+        logger.info("URL frontier: %d unique URLs in %.1f KiB, %d duplicate requests dropped",
+                    len(self.seen), self.seen.size_bytes / 1024, self.dropped)
+
+    def log(self, request, spider):
+        self.dropped += 1
+        if self.debug:
+            logger.debug("Filtered duplicate request: %s (key %s)", request, self.request_key(request))
@@ -0,0 +1,146 @@
+"""
+Crawl-wide near-duplicate and thin-content report.
+
+extract() stores a 64-bit SimHash of each page's scoped text
+(hashes.contentSimHash) and its word count (content.wordCount).
+NearDuplicatePipeline feeds every harvested item into a NearDuplicateIndex
+and, when the spider closes, writes a JSON report next to the crawl output:
+
+  {"pages": N, "distance": 3, "thinWords": 250,
+   "clusters": [{"urls": [...], "size": n}, ...],
+   "thinPages": [{"url": ..., "words": n}, ...]}
+
+Two pages are near-duplicates when their SimHashes differ in at most
+NEAR_DUP_DISTANCE bits. Splitting the hash into NEAR_DUP_DISTANCE + 1 blocks,
+any such pair agrees exactly on at least one block, so each page is only
+compared against pages sharing a block (one dict lookup per block) instead
+of every other page. Clusters are the connected components of those pairs.
+
+Settings:
+  NEAR_DUP_REPORT    report path (default: <first FEEDS path>.near-duplicates.json)
+  NEAR_DUP_DISTANCE  max differing bits (default 3)
+  THIN_CONTENT_WORDS pages with fewer scoped words are "thin" (default 250)
+"""
+
+import json
+import logging
+from collections import defaultdict
+from pathlib import Path
+
+from scrapy.exceptions import NotConfigured
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+
+
+class NearDuplicateIndex:
+    """SimHash block index with union-find clustering."""
+
+    def __init__(self, distance: int = 3):
+        self.distance = distance
+        blocks = distance + 1
+        # (shift, mask) per block; widths differ by at most one bit
+        self._blocks = []
+        start = 0
+        for i in range(blocks):
+            width = HASH_BITS // blocks + (1 if i < HASH_BITS % blocks else 0)
+            self._blocks.append((start, (1 << width) - 1))
+            start += width
+        self._tables = [defaultdict(list) for _ in self._blocks]
+        self._hashes: list[int] = []
+        self._urls: list[str] = []
+        self._parent: list[int] = []
+        self._seen: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def _find(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def _union(self, a: int, b: int) -> None:
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[max(ra, rb)] = min(ra, rb)
+
+    def add(self, url: str, simhash: int) -> None:
+        if url in self._seen:
+            return
+        self._seen.add(url)
+        page = len(self._urls)
+        self._urls.append(url)
+        self._hashes.append(simhash)
+        self._parent.append(page)
+        compared = set()
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            bucket = table[(simhash >> shift) & mask]
+            for other in bucket:
+                if other not in compared:
+                    compared.add(other)
+                    if (simhash ^ self._hashes[other]).bit_count() <= self.distance:
+                        self._union(page, other)
+            bucket.append(page)
+
+    def clusters(self) -> list[list[str]]:
+        """Groups of 2+ near-duplicate URLs, largest first, in crawl order within a group."""
+        groups = defaultdict(list)
+        for page, url in enumerate(self._urls):
+            groups[self._find(page)].append(url)
+        return sorted((urls for urls in groups.values() if len(urls) > 1), key=len, reverse=True)
+
+
+class NearDuplicatePipeline:
+    """Item pipeline collecting SimHashes and writing the report on close."""
+
+    def __init__(self, report_path: Path, distance: int, thin_words: int):
+        self.report_path = report_path
+        self.thin_words = thin_words
+        self.index = NearDuplicateIndex(distance)
+        self.thin: list[dict] = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        report = settings.get("NEAR_DUP_REPORT")
+        if not report:
+            feeds = settings.getdict("FEEDS")
+            if not feeds:
+                raise NotConfigured("No NEAR_DUP_REPORT and no FEEDS output to put it next to")
+            report = f"{next(iter(feeds))}.near-duplicates.json"
+        return cls(
+            Path(report),
+            settings.getint("NEAR_DUP_DISTANCE", 3),
+            settings.getint("THIN_CONTENT_WORDS", 250),
+        )
+
+    def process_item(self, item, spider):
+        extracted = item.get("extracted") if isinstance(item, dict) else None
+        if not isinstance(extracted, dict):
+            return item
+        url = item.get("meta", {}).get("url", "")
+        simhash = extracted.get("hashes", {}).get("contentSimHash")
+        words = extracted.get("content", {}).get("wordCount")
+        if words is not None and words < self.thin_words:
+            self.thin.append({"url": url, "words": words})
+        # Empty pages all hash alike; they're reported as thin, not as duplicates
+        if simhash:
+            self.index.add(url, int(simhash, 16))
+        return item
+
+    def close_spider(self, spider):
+        clusters = self.index.clusters()
+        report = {
+            "pages": len(self.index),
+            "distance": self.index.distance,
+            "thinWords": self.thin_words,
+            "clusters": [{"urls": urls, "size": len(urls)} for urls in clusters],
+            "thinPages": self.thin,
+        }
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        logger.info("Near-duplicate report: %d clusters, %d thin pages -> %s",
+                    len(clusters), len(self.thin), self.report_path)
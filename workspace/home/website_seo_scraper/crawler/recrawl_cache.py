@@ -0,0 +1,180 @@
+"""
+Conditional re-crawl cache: skip pages that haven't changed since the last run.
+
+A SQLite file keeps, per URL, the validators the server sent (ETag,
+Last-Modified), a hash of the body and the extract() result. On the next
+crawl of the same site:
+
+  - RecrawlCacheMiddleware adds If-None-Match / If-Modified-Since, so
+    unchanged pages come back as an empty 304;
+  - RecrawlCacheMixin.extract_cached() reuses the stored result for a 304,
+    or for a 200 whose body hash matches (servers without validators), and
+    only sends changed pages to the extractor.
+
+Reused items are still emitted, tagged meta.recrawl = "not-modified" or
+"same-body" ("changed"/"new" for fresh extractions), so each audit's
+output stays complete. Rows written by another TOOL_VERSION are ignored.
+
+Enabled by the RECRAWL_CACHE setting (run.py: --recrawl-cache PATH).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from extractor.extractor import TOOL_VERSION
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    tool_version  TEXT NOT NULL,
+    etag          TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    body_hash     TEXT NOT NULL,
+    result        TEXT NOT NULL,
+    links         TEXT NOT NULL DEFAULT '[]',
+    fetched_at    REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class CachedPage:
+    etag: str
+    last_modified: str
+    body_hash: str
+    result: dict
+    links: list[str] = field(default_factory=list)
+
+
+def body_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class RecrawlCache:
+    """Per-URL validators, body hash and extraction result, persisted across runs."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, body_hash, result, links FROM pages "
+                "WHERE url = ? AND tool_version = ?",
+                (url, TOOL_VERSION),
+            ).fetchone()
+        if not row:
+            return None
+        etag, last_modified, digest, result, links = row
+        return CachedPage(etag, last_modified, digest, json.loads(result), json.loads(links))
+
+    def put(self, url: str, page: CachedPage) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, tool_version, etag, last_modified, body_hash, result, links, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, TOOL_VERSION, page.etag, page.last_modified, page.body_hash,
+                 json.dumps(page.result), json.dumps(page.links), time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class RecrawlCacheMiddleware:
+    """Downloader middleware: make requests for cached URLs conditional."""
+
+    def process_request(self, request, spider):
+        cache = getattr(spider, "recrawl_cache", None)
+        if cache is None or request.method != "GET":
+            return None
+        cached = cache.get(request.url)
+        if cached is None:
+            return None
+        request.meta["recrawl_cached"] = cached
+        if cached.etag:
+            request.headers.setdefault("If-None-Match", cached.etag)
+        if cached.last_modified:
+            request.headers.setdefault("If-Modified-Since", cached.last_modified)
+        return None
+
+
+class RecrawlCacheMixin:
+    """
+    Spider mixin providing `await self.extract_cached(response, fn, ...)`.
+
+    Needs OffReactorExtractMixin (for run_extractor) later in the MRO.
+    """
+
+    # 304s reach the callback instead of being dropped by HttpErrorMiddleware
+    handle_httpstatus_list = [304]
+
+    _recrawl_cache: RecrawlCache | None = None
+
+    @property
+    def recrawl_cache(self) -> RecrawlCache | None:
+        if self._recrawl_cache is None:
+            path = self.settings.get("RECRAWL_CACHE")
+            if path:
+                self._recrawl_cache = RecrawlCache(Path(path))
+                self.logger.info("Re-crawl cache: %s", path)
+        return self._recrawl_cache
+
+    async def extract_cached(self, response, fn, *args, links=(), **kwargs) -> tuple[Optional[dict], list[str]]:
+        """
+        Extraction result for `response`, reusing the cached one when the page
+        is unchanged. `links` are the page's outlinks, stored so a 304 can
+        still be followed; returns (result, links).
+
+        A 304 without a cache entry (validators sent by someone else) gives
+        (None, []).
+        """
+        cached: CachedPage | None = response.meta.get("recrawl_cached")
+        if response.status == 304:
+            if cached is None:
+                return None, []
+            return self._reused(cached, "not-modified"), cached.links
+
+        cache = self.recrawl_cache
+        etag = (response.headers.get(b"ETag") or b"").decode("latin-1")
+        last_modified = (response.headers.get(b"Last-Modified") or b"").decode("latin-1")
+        digest = body_hash(response.body)
+        if cached is not None and cached.body_hash == digest:
+            if cache is not None and (etag, last_modified) != (cached.etag, cached.last_modified):
+                # Same page, new validators: store them so next run can get a 304
+                cache.put(response.url, CachedPage(etag, last_modified, digest, cached.result, cached.links))
+            return self._reused(cached, "same-body"), cached.links
+
+        result = await self.run_extractor(fn, *args, **kwargs)
+        if cache is not None and isinstance(result, dict):
+            cache.put(response.url, CachedPage(etag, last_modified, digest, result, list(links)))
+            result.setdefault("meta", {})["recrawl"] = "changed" if cached is not None else "new"
+        return result, list(links)
+
+    @staticmethod
+    def _reused(cached: CachedPage, how: str) -> dict:
+        result = cached.result
+        result.setdefault("meta", {})["recrawl"] = how
+        return result
+
+    def closed(self, reason):
+        if self._recrawl_cache is not None:
+            self._recrawl_cache.close()
+            self._recrawl_cache = None
+        parent = getattr(super(), "closed", None)
+        if parent:
+            parent(reason)
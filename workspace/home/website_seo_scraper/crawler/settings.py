@@ -17,8 +17,32 @@ LOG_LEVEL = "INFO"
 # Respect common compressed content
 COMPRESSION_ENABLED = True
 
+# Processes running extractor.extract() off the reactor (crawler/extract_pool.py).
+# Unset = one per core minus one; 0 = run inline in the reactor thread.
+# EXTRACT_WORKERS = 4
+
+# Conditional re-crawls (crawler/recrawl_cache.py): SQLite file of per-URL
+# ETag/Last-Modified, body hash and extraction result. Unset = off.
+# RECRAWL_CACHE = "/data/recrawl-cache.sqlite"
+DOWNLOADER_MIDDLEWARES = {
+    "crawler.recrawl_cache.RecrawlCacheMiddleware": 560,
+}
+
+# Crawl-wide near-duplicate/thin-content report (crawler/near_duplicates.py),
+# written to <output>.near-duplicates.json unless NEAR_DUP_REPORT is set.
+# NEAR_DUP_DISTANCE = 3
+# THIN_CONTENT_WORDS = 250
+ITEM_PIPELINES = {
+    "crawler.near_duplicates.NearDuplicatePipeline": 800,
+}
+
 # Don’t fill logs with cookies unless debugging
 COOKIES_ENABLED = False
 
-# Avoid re-crawling the exact same URLs within one run
-DUPEFILTER_CLASS = "scrapy.dupefilters.RFPDupeFilter"
+# Avoid re-crawling the same page within one run: URLs are canonicalized
+# (fragment, tracking params, case, trailing slash) and remembered in a
+# scalable Bloom filter (crawler/frontier.py)
+DUPEFILTER_CLASS = "crawler.frontier.CanonicalBloomDupeFilter"
+# FRONTIER_STRIP_PARAMS = ["utm_*", "gclid", "fbclid", "msclkid"]
+# FRONTIER_IGNORE_PATH_CASE = False
+# FRONTIER_ERROR_RATE = 0.0001
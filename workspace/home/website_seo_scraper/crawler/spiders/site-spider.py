@@ -1,23 +1,29 @@
 import re
-from urllib.parse import urljoin, urlparse
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
 import tldextract
 import scrapy
 from extractor import extract
 
+from crawler.extract_pool import OffReactorExtractMixin
+from crawler.frontier import UrlCanonicalizer
+from crawler.recrawl_cache import RecrawlCacheMixin
+
 SKIP_EXT = re.compile(
     r"\.(?:pdf|zip|rar|7z|tar|gz|bz2|mp4|mp3|mov|avi|wmv|webm|mkv|jpg|jpeg|png|gif|svg|webp|ico|bmp|ttf|woff2?|eot|css|less|scss|js)$",
     re.IGNORECASE,
 )
 
-def same_registrable_domain(url_a: str, url_b: str) -> bool:
-    a = tldextract.extract(url_a)
-    b = tldextract.extract(url_b)
-    return (a.domain, a.suffix) == (b.domain, b.suffix)
+@lru_cache(maxsize=4096)
+def registrable_domain(host: str) -> tuple[str, str]:
+    ext = tldextract.extract(host)
+    return ext.domain, ext.suffix
 
-class SiteSpider(scrapy.Spider):
+class SiteSpider(RecrawlCacheMixin, OffReactorExtractMixin, scrapy.Spider):
     """
     Crawl one or more start URLs, stay on the same registrable domain,
-    run your extractor on every HTML page, and emit JSON lines.
+    run your extractor on every HTML page (in worker processes), and emit JSON lines.
+    With RECRAWL_CACHE set, unchanged pages reuse the previous run's result.
     """
     name = "site"
 
@@ -46,16 +52,45 @@ class SiteSpider(scrapy.Spider):
 
         # Anchor domain to the first URL; others are filtered by same registrable domain
         self.anchor = self._start_urls[0]
+        self._anchor_domain = registrable_domain(urlsplit(self.anchor).hostname or "")
+        self._canonicalizer = None
+
+    @property
+    def canonicalizer(self) -> UrlCanonicalizer:
+        if self._canonicalizer is None:
+            self._canonicalizer = UrlCanonicalizer.from_settings(self.settings)
+            self._anchor_netloc = urlsplit(self._canonicalizer.clean(self.anchor)).netloc
+        return self._canonicalizer
+
+    def follow_url(self, base: str, href: str):
+        """Canonical absolute URL for an in-scope crawlable link, else None."""
+        try:
+            url = self.canonicalizer.clean(urljoin(base, href))
+            parts = urlsplit(url)
+        except ValueError:
+            # Malformed port or IPv6 host in the href; skip the link, not the page
+            return None
+        if parts.scheme not in ("http", "https") or SKIP_EXT.search(parts.path):
+            return None
+        if not self.allow_subdomains:
+            # If subdomains not allowed, enforce exact netloc match with anchor
+            return url if parts.netloc == self._anchor_netloc else None
+        # Keep to same registrable domain
+        return url if registrable_domain(parts.hostname or "") == self._anchor_domain else None
 
     def start_requests(self):
         for u in self._start_urls:
             yield scrapy.Request(u, callback=self.parse, meta={"depth": 0})
 
-    def parse(self, response):
+    async def parse(self, response):
         # Run your extractor and yield record
         if "text/html" in (response.headers.get("Content-Type", b"text/html").decode().split(";")[0]):
+            # A 304 has no body; extract_cached() hands back the links stored with the cached result
+            html = response.text if response.status != 304 else ""
+            hrefs = response.css("a::attr(href)").getall() if html else []
             try:
-                data = extract(response.text, response.url)  # returns your full harvested dict
+                # returns your full harvested dict
+                data, hrefs = await self.extract_cached(response, extract, html, response.url, links=hrefs)
                 if data:
                     # If someone later swaps extract() to return just a fragment, we still add URL/status.
                     if not isinstance(data, dict) or "meta" not in data or "extracted" not in data:
@@ -73,15 +108,10 @@ class SiteSpider(scrapy.Spider):
             if depth >= self.max_depth:
                 return
 
-            # Discover links
-            for href in response.css("a::attr(href)").getall():
-                abs_url = urljoin(response.url, href.strip())
-                if SKIP_EXT.search(urlparse(abs_url).path):
-                    continue
-                # Keep to same registrable domain
-                if same_registrable_domain(abs_url, self.anchor):
-                    # If subdomains not allowed, enforce exact netloc match with anchor
-                    if not self.allow_subdomains:
-                        if urlparse(abs_url).netloc != urlparse(self.anchor).netloc:
-                            continue
-                    yield scrapy.Request(abs_url, callback=self.parse, meta={"depth": depth + 1})
+            # Discover links; the dupefilter (crawler/frontier.py) drops ones already seen
+            page_urls = set()
+            for href in hrefs:
+                url = self.follow_url(response.url, href.strip())
+                if url and url not in page_urls:
+                    page_urls.add(url)
+                    yield scrapy.Request(url, callback=self.parse, meta={"depth": depth + 1})
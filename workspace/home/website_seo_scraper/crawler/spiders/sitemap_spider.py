@@ -11,16 +11,20 @@ from scrapy.spiders import SitemapSpider
 # and the function is defined as: def extract(html: str, url: str, scoped: bool = True, diagnostics: bool = False) -> dict
 from extractor.extractor import extract  # <-- do not change
 
+from crawler.extract_pool import OffReactorExtractMixin
+from crawler.recrawl_cache import RecrawlCacheMixin
+
 logger = logging.getLogger(__name__)
 
 
-class HardenedSitemapSpider(SitemapSpider):
+class HardenedSitemapSpider(RecrawlCacheMixin, OffReactorExtractMixin, SitemapSpider):
     """
     A robust sitemap spider that:
       - Tries common sitemap endpoints
       - Falls back to robots.txt to discover 'Sitemap:' lines
       - Won't crash on empty/non-XML sitemap responses
-      - Calls your extractor.extract() for each page and yields the harvested dict
+      - Calls your extractor.extract() for each page (in worker processes) and yields the harvested dict
+      - With RECRAWL_CACHE set, reuses the previous run's result for unchanged pages
     """
 
     name = "sitemap"
@@ -132,18 +136,22 @@ class HardenedSitemapSpider(SitemapSpider):
 
     # ---- page handler ----
 
-    def parse_page(self, response):
+    async def parse_page(self, response):
         """
         Called for every URL matched by sitemap_rules.
-        Runs your extractor and yields the harvested dict directly as an item.
+        Runs your extractor off the reactor and yields the harvested dict directly as an item.
         """
         try:
-            harvested = extract(
-                html=response.text,
+            harvested, _ = await self.extract_cached(
+                response,
+                extract,
+                html=response.text if response.status != 304 else "",
                 url=response.url,
                 scoped=True,            # use the scoped main-content heuristic by default
                 diagnostics=False,      # flip to True if you want resource counts
             )
+            if harvested is None:
+                return
             # Ensure we always include the fetched URL (defensive)
             harvested["meta"] = harvested.get("meta", {})
             harvested["meta"]["fetchedUrl"] = response.url
@@ -4,9 +4,10 @@ import argparse, csv, json, math, re, sys, time, hashlib
 from urllib.parse import urljoin, urlparse
 from datetime import datetime, timezone
 import requests
+import soupsieve as sv
 from bs4 import BeautifulSoup, NavigableString, Tag
 
-TOOL_VERSION = "3.2.0"
+TOOL_VERSION = "3.3.0"
 SCHEMA_VERSION = "raw-harvest-v1"
 
 CONTENT_PREFER = [
@@ -30,6 +31,107 @@ SOCIAL_DOMAINS = [
 
 IMAGE_EXT_RE = re.compile(r"\.(jpe?g|png|webp|gif|svg|avif)(\?|#|$)", re.I)
 
+# Compiled once; matched against PageIndex buckets instead of re-walking the tree
+NOISE_SELECTORS = NOISE_CONTAINERS + ["[style*='position:fixed']", "[style*='z-index']"]
+NOISE_SEL = sv.compile(",".join(NOISE_SELECTORS))
+
+def selector_hints(selectors):
+    """
+    Tag names and attributes a tag needs to possibly match any of these
+    simple (combinator-free) selectors; cheap pre-filter before sv.match().
+    """
+    names = {m.group() for m in (re.match(r"[a-z][\w-]*", sel) for sel in selectors) if m}
+    attrs = set(re.findall(r"\[([\w-]+)", " ".join(selectors)))
+    if any("#" in sel for sel in selectors): attrs.add("id")
+    if any("." in re.sub(r"\[.*?\]", "", sel) for sel in selectors): attrs.add("class")
+    return names, attrs
+
+NOISE_NAMES, NOISE_ATTRS = selector_hints(NOISE_SELECTORS)
+SEL_DESCRIPTION = sv.compile('meta[name="description"],meta[property="description"]')
+SEL_ROBOTS = sv.compile('meta[name="robots"]')
+SEL_VIEWPORT = sv.compile('meta[name="viewport"]')
+SEL_CHARSET = sv.compile("meta[charset]")
+SEL_GENERATOR = sv.compile('meta[name="generator"]')
+SEL_CANONICAL = sv.compile('link[rel="canonical"]')
+SEL_HREFLANG = sv.compile('link[rel="alternate"][hreflang]')
+SEL_STYLESHEET = sv.compile('link[rel="stylesheet"]')
+SEL_SCRIPT_SRC = sv.compile("script[src]")
+SEL_LDJSON = sv.compile('script[type="application/ld+json"]')
+SEL_MICRODATA = sv.compile("[itemscope][itemtype]")
+SEL_RDFA = sv.compile("[typeof],[vocab]")
+SEL_PICTURE_SOURCE = sv.compile("picture source")
+SEL_BACKGROUND = sv.compile("[style*='background-image']")
+SEL_HREF = sv.compile("a[href]")
+SEL_TEL = sv.compile('a[href^="tel:"]')
+SEL_MAILTO = sv.compile('a[href^="mailto:"]')
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+
+class PageIndex:
+    """
+    Every tag under a root, collected in one traversal, in document order.
+
+    extract_* passes look tags up here (by name or attribute, then a compiled
+    selector match on just those candidates) instead of each walking the tree
+    with select()/find_all(). Removals go through remove() so the index
+    knows which subtrees are gone without touching the tree again.
+    """
+
+    def __init__(self, root, tags=None):
+        self.root = root
+        if tags is None:
+            tags = [el for el in root.descendants if isinstance(el, Tag)]
+            if not isinstance(root, BeautifulSoup):
+                tags.insert(0, root)
+        self.tags = tags
+        self._names = [el.name for el in tags]
+        self._pos = {id(el): i for i, el in enumerate(tags)}
+        self._removed = set()
+
+    def _live(self):
+        removed = self._removed
+        return ((el, name) for i, (el, name) in enumerate(zip(self.tags, self._names)) if i not in removed)
+
+    def _end(self, el):
+        """Position just past el's last descendant."""
+        after = el._last_descendant().next_element
+        while after is not None and not isinstance(after, Tag):
+            after = after.next_element
+        return self._pos.get(id(after), len(self.tags)) if after is not None else len(self.tags)
+
+    def find(self, *names):
+        wanted = set(names)
+        return [el for el, name in self._live() if name in wanted]
+
+    def with_attr(self, *attrs):
+        return [el for el, _ in self._live() if any(a in el.attrs for a in attrs)]
+
+    def select(self, pattern, *names, attrs=()):
+        """Tags matching the compiled selector, pre-filtered by tag name and/or attribute."""
+        if names:
+            candidates = self.find(*names)
+        elif attrs:
+            candidates = self.with_attr(*attrs)
+        else:
+            candidates = [el for el, _ in self._live()]
+        return [el for el in candidates if pattern.match(el)]
+
+    def subtree(self, el):
+        """Index of el and its descendants, sliced from this one (no traversal)."""
+        start = self._pos[id(el)]
+        end = self._end(el)
+        removed = self._removed
+        return PageIndex(el, [t for i, t in enumerate(self.tags[start:end], start) if i not in removed])
+
+    def remove(self, els):
+        """Decompose each tag (and drop its subtree from the index)."""
+        for el in els:
+            i = self._pos[id(el)]
+            if i in self._removed:
+                continue
+            self._removed.update(range(i, self._end(el)))
+            el.decompose()
+
 def now_iso():
     return datetime.now(timezone.utc).isoformat()
 
@@ -90,57 +192,76 @@ def pick_largest_text_block(soup):
     best = max(candidates, key=lambda el: wc(el.get_text(" ", strip=True)))
     return best
 
-def build_clean_root(soup):
-    scope = None
+def pick_scope(soup):
     for sel in CONTENT_PREFER:
         found = soup.select_one(sel)
         if found:
-            scope = found
-            break
-    if not scope:
-        scope = pick_largest_text_block(soup)
-    # clone by creating new soup from str(scope)
-    clone = BeautifulSoup(str(scope), "lxml")
-
-    # remove obvious noise
-    for sel in NOISE_CONTAINERS:
-        for n in clone.select(sel):
-            n.decompose()
-
-    # strip elements with inline fixed/overlay hints
-    for n in clone.select("[style*='position:fixed'], [style*='z-index']"):
-        n.decompose()
-
-    # remove iframes again (defensive)
-    for n in clone.select("iframe"):
-        n.decompose()
-
-    return clone
-
-def text_from(root):
-    for n in root.select("script,style,template,noscript"):
-        n.decompose()
+            return found
+    return pick_largest_text_block(soup)
+
+def detach_root(soup, doc_index, scoped=True):
+    """
+    Cut the analysed subtree out of the parsed document, in place.
+
+    Scoped: the main-content container with noise (nav/header/footer,
+    scripts, overlays, hidden nodes...) removed. Unscoped: the whole body.
+    Detaching stops ancestor lookups (e.g. link context) at the root, the
+    way the old reparsed copy did. Run document-level passes first, since
+    the document loses this subtree. Returns (root, root_index).
+    """
+    root = pick_scope(soup) if scoped else (soup.body or soup)
+    if root is soup:
+        index = doc_index
+    else:
+        index = doc_index.subtree(root)
+        root.extract()
+    if scoped:
+        noise = [
+            n for n in index.tags
+            if (n.name in NOISE_NAMES or not NOISE_ATTRS.isdisjoint(n.attrs)) and NOISE_SEL.match(n)
+        ]
+        if any(n is root for n in noise):
+            # the whole scope is noise: nothing left to analyse
+            empty = BeautifulSoup("", "lxml")
+            return empty, PageIndex(empty)
+        index.remove(noise)
+    return root, index
+
+def build_clean_root(soup):
+    """Standalone scoped root (parses a copy; extract() uses detach_root instead)."""
+    clone = BeautifulSoup(str(soup), "lxml")
+    root, _ = detach_root(clone, PageIndex(clone), scoped=True)
+    return root
+
+def text_from(root, index=None):
+    index = index or PageIndex(root)
+    index.remove(index.find("script", "style", "template", "noscript"))
     return root.get_text("\n", strip=True)
 
-def extract_meta(soup, url):
-    title = soup.title.get_text(strip=True) if soup.title else ""
+def extract_meta(soup, url, index=None):
+    index = index or PageIndex(soup)
+    titles = index.find("title")
+    title = titles[0].get_text(strip=True) if titles else ""
+    metas = index.find("meta")
     meta_all = []
-    for m in soup.find_all("meta"):
+    for m in metas:
         meta_all.append({
             "name": m.get("name"),
             "property": m.get("property"),
             "httpEquiv": m.get("http-equiv"),
             "content": m.get("content")
         })
-    def first_meta(selector):
-        el = soup.select_one(selector)
+    links = index.find("link")
+    def first_meta(pattern):
+        el = next((m for m in metas if pattern.match(m)), None)
         return el.get("content","") if el else ""
-    description = first_meta('meta[name="description"],meta[property="description"]')
-    robots = first_meta('meta[name="robots"]')
-    canonical = safe(lambda: soup.select_one('link[rel="canonical"]').get("href",""), "")
-    lang = soup.html.get("lang","") if soup.html else ""
-    viewport = first_meta('meta[name="viewport"]')
-    charset = safe(lambda: soup.select_one("meta[charset]")["charset"], "")
+    description = first_meta(SEL_DESCRIPTION)
+    robots = first_meta(SEL_ROBOTS)
+    canonical = safe(lambda: next(l for l in links if SEL_CANONICAL.match(l)).get("href",""), "")
+    html_tags = index.find("html")
+    lang = html_tags[0].get("lang","") if html_tags else ""
+    viewport = first_meta(SEL_VIEWPORT)
+    charset = safe(lambda: next(m for m in metas if SEL_CHARSET.match(m))["charset"], "")
 
     # OG/Twitter
     og, tw = {}, {}
@@ -151,7 +272,7 @@ def extract_meta(soup, url):
             tw[m["name"][8:]] = m["content"] or ""
 
     link_rels = []
-    for l in soup.find_all("link"):
+    for l in links:
         link_rels.append({
             "rel": l.get("rel")[0] if l.get("rel") else None,
             "href": l.get("href"),
@@ -205,9 +326,10 @@ def has_level_skips(headings):
         last = lv
     return False
 
-def extract_headings(root, page_title):
+def extract_headings(root, page_title, index=None):
+    index = index or PageIndex(root)
     items = []
-    for n in root.select("h1,h2,h3,h4,h5,h6"):
+    for n in index.find(*HEADING_TAGS):
         items.append({"tag": n.name.lower(), "text": (n.get_text(" ", strip=True) or "").strip(), "id": n.get("id")})
     h1s = [i for i in items if i["tag"] == "h1"]
     summary = {
@@ -218,9 +340,10 @@ def extract_headings(root, page_title):
     }
     return {"items": items, "summary": summary}
 
-def extract_links(root, origin):
+def extract_links(root, origin, index=None):
+    index = index or PageIndex(root)
     anchors = []
-    for a in root.select("a[href]"):
+    for a in index.select(SEL_HREF, "a"):
         href = a.get("href") or ""
         abs_url = safe(lambda: urljoin(origin, href), "")
         rel = a.get("rel")
@@ -268,10 +391,12 @@ def parse_srcset_for_largest(srcset):
     first = parts[0] if parts else ""
     return re.sub(r"\s+\d+w$", "", first).strip()
 
-def extract_images(root):
+def extract_images(root, index=None):
+    index = index or PageIndex(root)
+    img_els = index.find("img")
     items = []
 
-    for img in root.find_all("img"):
+    for img in img_els:
         src = get_attr(img, ["src","data-src","data-lazy","data-original"]) or ""
         srcset = get_attr(img, ["srcset","data-srcset"]) or ""
         lazy_attr = None
@@ -292,7 +417,7 @@ def extract_images(root):
             "lazyAttr": lazy_attr or ""
         })
 
-    for source in root.select("picture source"):
+    for source in index.select(SEL_PICTURE_SOURCE, "source"):
         srcset = get_attr(source, ["srcset","data-srcset"]) or ""
         largest = parse_srcset_for_largest(srcset) if srcset else ""
         items.append({
@@ -305,13 +430,12 @@ def extract_images(root):
         })
 
     background_images = []
-    for el in root.select("[style*='background-image']"):
+    for el in index.select(SEL_BACKGROUND, attrs=("style",)):
         style = el.get("style") or ""
         m = re.search(r"background-image:\s*url\((['\"]?)(.*?)\1\)", style, re.I)
         if m and m.group(2):
             background_images.append({"selector": get_selector(el), "url": m.group(2)})
 
-    img_els = root.find_all("img")
     with_alt = sum(1 for i in img_els if (i.get("alt") or "").strip())
     missing_alt = max(len(img_els) - with_alt, 0)
 
@@ -323,24 +447,28 @@ def extract_images(root):
         "backgroundImages": background_images
     }
 
-def extract_content(root):
-    scoped_text = re.sub(r"\s+\n", "\n", text_from(root))
+def extract_content(root, index=None):
+    index = index or PageIndex(root)
+    scoped_text = re.sub(r"\s+\n", "\n", text_from(root, index))
     scoped_text = re.sub(r"\n{3,}", "\n\n", scoped_text)
     blocks = []
-    candidates = root.select("p, li, h1, h2, h3, h4, h5, h6, div")
+    candidates = index.find("p", "li", *HEADING_TAGS, "div")
     for el in candidates:
         txt = (el.get_text(" ", strip=True) or "").strip()
         if len(txt) >= 80:
             blocks.append({"tag": el.name.lower(), "text": txt[:400]})
         if len(blocks) >= 50: break
-    return {"scopedText": scoped_text, "blocks": blocks}
+    return {"scopedText": scoped_text, "wordCount": wc(scoped_text), "blocks": blocks}
 
-def nearest_label_text(field, form_root):
+def nearest_label_text(field, form_root, labels_for=None):
     aria = field.get("aria-label")
     if aria: return aria
     fid = field.get("id")
     if fid:
-        lab = form_root.select_one(f'label[for="{fid}"]')
+        if labels_for is not None:
+            lab = labels_for.get(fid)
+        else:
+            lab = form_root.select_one(f'label[for="{fid}"]')
         if lab: return lab.get_text(" ", strip=True)
     parent_label = field.find_parent("label")
     if parent_label: return parent_label.get_text(" ", strip=True)
@@ -354,12 +482,21 @@ def nearest_label_text(field, form_root):
     ph = field.get("placeholder")
     return ph or ""
 
-def extract_forms(root):
+def extract_forms(root, index=None):
+    index = index or PageIndex(root)
+    forms = index.find("form")
+    # First <label for=...> per id, looked up per field without re-walking root
+    labels_for = {}
+    if forms:
+        for lab in index.find("label"):
+            lab_for = lab.get("for")
+            if lab_for and lab_for not in labels_for:
+                labels_for[lab_for] = lab
     forms_out = []
-    for f in root.find_all("form"):
+    for f in forms:
         fields = []
         for field in f.select("input, select, textarea"):
-            label_text = (nearest_label_text(field, root) or "").strip()
+            label_text = (nearest_label_text(field, root, labels_for) or "").strip()
             t_raw = (field.get("type") or field.name or "text").lower()
             fields.append({
                 "name": field.get("name",""),
@@ -383,14 +520,16 @@ def dedupe_by_url(arr):
             seen[url] = o
     return list(seen.values())
 
-def extract_contacts_social(root):
-    phone_hrefs = [a.get("href","")[4:].strip() for a in root.select('a[href^="tel:"]')]
-    email_hrefs = [a.get("href","")[7:].strip() for a in root.select('a[href^="mailto:"]')]
+def extract_contacts_social(root, index=None):
+    index = index or PageIndex(root)
+    anchors = index.select(SEL_HREF, "a")
+    phone_hrefs = [a.get("href","")[4:].strip() for a in anchors if SEL_TEL.match(a)]
+    email_hrefs = [a.get("href","")[7:].strip() for a in anchors if SEL_MAILTO.match(a)]
     phones = sorted(set(phone_hrefs))
     emails = sorted(set(email_hrefs))
 
     social = []
-    for a in root.select("a[href]"):
+    for a in anchors:
         href = a.get("href")
         if not href: continue
         try:
@@ -403,10 +542,11 @@ def extract_contacts_social(root):
             social.append({"site": site, "url": href})
     return {"phones": phones, "emails": emails, "socialProfiles": dedupe_by_url(social)}
 
-def extract_schema(soup):
+def extract_schema(soup, index=None):
+    index = index or PageIndex(soup)
     jsonld = []
     errors = []
-    for i, s in enumerate(soup.select('script[type="application/ld+json"]')):
+    for i, s in enumerate(index.select(SEL_LDJSON, "script")):
         raw = (s.string or s.get_text() or "").strip()
         if not raw: continue
         type_name = ""
@@ -426,17 +566,18 @@ def extract_schema(soup):
             errors.append({"index": i, "error": str(e)})
         jsonld.append({"type": type_name, "raw": raw[:50000]})
 
-    microdata = [{"type": el.get("itemtype"), "selector": get_selector(el)} for el in soup.select("[itemscope][itemtype]")]
-    rdfa = [{"typeof": el.get("typeof",""), "vocab": el.get("vocab",""), "selector": get_selector(el)} for el in soup.select("[typeof],[vocab]")]
+    microdata = [{"type": el.get("itemtype"), "selector": get_selector(el)} for el in index.select(SEL_MICRODATA, attrs=("itemscope",))]
+    rdfa = [{"typeof": el.get("typeof",""), "vocab": el.get("vocab",""), "selector": get_selector(el)} for el in index.select(SEL_RDFA, attrs=("typeof", "vocab"))]
     return {"count": len(jsonld)+len(microdata)+len(rdfa), "jsonLd": jsonld, "microdata": microdata, "rdfa": rdfa, "errors": errors}
 
-def extract_platform_hints(soup):
+def extract_platform_hints(soup, index=None):
+    index = index or PageIndex(soup)
     hints = []
-    gens = [ (m.get("content") or "").lower() for m in soup.select('meta[name="generator"]') ]
+    gens = [ (m.get("content") or "").lower() for m in index.select(SEL_GENERATOR, "meta") ]
     if any("wordpress" in g for g in gens):
         hints.append({"name":"WordPress","signal":"meta generator","confidence":0.9})
     hrefs = []
-    for n in soup.find_all(["link","script"]):
+    for n in index.find("link","script"):
         hrefs.append(n.get("href") or n.get("src") or "")
     if any(re.search(r"elementor", h or "", re.I) for h in hrefs):
         hints.append({"name":"Elementor","signal":"assets","confidence":0.9})
@@ -444,38 +585,64 @@ def extract_platform_hints(soup):
         hints.append({"name":"Divi","signal":"assets","confidence":0.85})
     if any(re.search(r"(leadconnector|stcdn\.leadconnectorhq\.com)", h or "", re.I) for h in hrefs):
         hints.append({"name":"GoHighLevel","signal":"CDN","confidence":0.95})
-    body = soup.body
+    bodies = index.find("body")
+    body = bodies[0] if bodies else None
     body_cls = " ".join(body.get("class", [])) .lower() if body else ""
     if not any(h["name"]=="WordPress" for h in hints) and re.search(r"\bwp-\w+", body_cls):
         hints.append({"name":"WordPress","signal":"body class","confidence":0.7})
     return {"hints": hints}
 
-def extract_technical(soup, url, diagnostics=False):
+def extract_technical(soup, url, diagnostics=False, index=None):
+    index = index or PageIndex(soup)
     u = urlparse(url)
     https = (u.scheme == "https")
-    hreflang = [l.get("hreflang") for l in soup.select('link[rel="alternate"][hreflang]') if l.get("hreflang")]
+    hreflang = [l.get("hreflang") for l in index.select(SEL_HREFLANG, "link") if l.get("hreflang")]
     mixed = any(
         (tag.get("src","").startswith("http://") or tag.get("href","").startswith("http://"))
-        for tag in soup.find_all(["img","script","link"])
+        for tag in index.find("img","script","link")
     )
     perf_timings = {"navigationStart": int(time.time()*1000), "domContentLoaded": None, "loadEvent": None}
     resource_counts = None
     if diagnostics:
         resource_counts = {
-            "script": len(soup.select("script[src]")),
-            "stylesheet": len(soup.select('link[rel="stylesheet"]')),
-            "image": len(soup.select("img")) + len(soup.select("picture source"))
+            "script": len(index.select(SEL_SCRIPT_SRC, "script")),
+            "stylesheet": len(index.select(SEL_STYLESHEET, "link")),
+            "image": len(index.find("img")) + len(index.select(SEL_PICTURE_SOURCE, "source"))
         }
     return {"https": https, "hreflang": hreflang, "mixedContentDetected": mixed, "perfTimings": perf_timings, "resourceCounts": resource_counts}
 
 def head_hash(html_text):
     try:
-        soup = BeautifulSoup(html_text, "lxml")
+        return head_hash_of(BeautifulSoup(html_text, "lxml"))
+    except Exception:
+        return ""
+
+def head_hash_of(soup):
+    """head_hash() for an already-parsed document."""
+    try:
         head_html = str(soup.head) if soup.head else ""
         return hashlib.md5(head_html.encode("utf-8")).hexdigest()[:8]
     except Exception:
         return ""
 
+def content_simhash(text, shingle=3):
+    """
+    64-bit SimHash of the text's word shingles, as 16 hex chars ("" if no words).
+
+    Near-duplicate pages differ in only a few bits (Hamming distance), so
+    crawl-wide duplicate detection can bucket pages by hash blocks instead
+    of comparing every pair with jaccard().
+    """
+    words = tokenize(text)
+    if not words:
+        return ""
+    shingles = {" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1))}
+    # one 64-char bit string per shingle; zip() turns them into per-bit columns
+    bits = [f"{int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'big'):064b}" for s in shingles]
+    half = len(bits) / 2
+    value = "".join("1" if column.count("1") > half else "0" for column in zip(*bits))
+    return f"{int(value, 2):016x}"
+
 def to_csv_rows(h):
     m = h["extracted"]["meta"]
     hd = h["extracted"]["headings"]["summary"]
@@ -500,67 +667,41 @@ def harvest(url, scoped=True, diagnostics=False, timeout=30, user_agent=None):
     headers = {"User-Agent": user_agent or f"RawSEOHarvester/{TOOL_VERSION} (+https://example.local)"}
     resp = requests.get(url, headers=headers, timeout=timeout)
     resp.raise_for_status()
-    html = resp.text
-    soup = BeautifulSoup(html, "lxml")
-
-    root = build_clean_root(soup) if scoped else BeautifulSoup(str(soup.body or soup), "lxml")
-
-    meta_blocks = extract_meta(soup, url)
-    headings = extract_headings(root, meta_blocks["meta"]["title"])
-    links = extract_links(root, f"{urlparse(url).scheme}://{urlparse(url).netloc}")
-    images = extract_images(root)
-    content = extract_content(root)
-    forms = extract_forms(root)
-    contacts_social = extract_contacts_social(root)
-    schema = extract_schema(soup)
-    platform = extract_platform_hints(soup)
-    technical = extract_technical(soup, url, diagnostics)
-
-    harvested = {
-        "meta": {
-            "toolVersion": TOOL_VERSION,
-            "schemaVersion": SCHEMA_VERSION,
-            "harvestedAt": now_iso(),
-            "url": url,
-            "domain": urlparse(url).hostname or "",
-            "userAgent": headers["User-Agent"],
-            "scoped": bool(scoped),
-            "diagnosticsMode": bool(diagnostics),
-            "analysisTimeMs": 0
-        },
-        "extracted": {
-            **meta_blocks,
-            "headings": headings,
-            "links": links,
-            "images": images,
-            "content": content,
-            "forms": forms,
-            "contacts": {"phones": contacts_social["phones"], "emails": contacts_social["emails"]},
-            "socialProfiles": contacts_social["socialProfiles"],
-            "schema": schema,
-            "platform": platform,
-            "technical": technical,
-            "hashes": {"headHash": head_hash(html)}
-        }
-    }
+    harvested = analyze(resp.text, url, scoped, diagnostics, headers["User-Agent"])
     harvested["meta"]["analysisTimeMs"] = int((time.time() - start) * 1000)
     return harvested
-    
+
 def extract(html: str, url: str, scoped: bool = True, diagnostics: bool = False) -> dict:
+    return analyze(html, url, scoped, diagnostics, "Scrapy/embedded")
+
+def analyze(html, url, scoped, diagnostics, user_agent):
+    """
+    Parse once and run every extract_* pass over that single tree.
+
+    Document-level passes (meta, schema, platform, technical, head hash)
+    read the full document first; then the content root is detached and
+    cleaned in place and the content passes run on it. Each tree gets one
+    PageIndex traversal that all of its passes share.
+    """
     start = time.time()
     soup = BeautifulSoup(html, "lxml")
-    root = build_clean_root(soup) if scoped else BeautifulSoup(str(soup.body or soup), "lxml")
-
-    meta_blocks = extract_meta(soup, url)
-    headings = extract_headings(root, meta_blocks["meta"]["title"])
-    links = extract_links(root, f"{urlparse(url).scheme}://{urlparse(url).netloc}")
-    images = extract_images(root)
-    content = extract_content(root)
-    forms = extract_forms(root)
-    contacts_social = extract_contacts_social(root)
-    schema = extract_schema(soup)
-    platform = extract_platform_hints(soup)
-    technical = extract_technical(soup, url, diagnostics=diagnostics)
+    doc_index = PageIndex(soup)
+
+    meta_blocks = extract_meta(soup, url, doc_index)
+    schema = extract_schema(soup, doc_index)
+    platform = extract_platform_hints(soup, doc_index)
+    technical = extract_technical(soup, url, diagnostics=diagnostics, index=doc_index)
+    hashes = {"headHash": head_hash_of(soup)}
+
+    root, index = detach_root(soup, doc_index, scoped)
+
+    headings = extract_headings(root, meta_blocks["meta"]["title"], index)
+    links = extract_links(root, f"{urlparse(url).scheme}://{urlparse(url).netloc}", index)
+    images = extract_images(root, index)
+    content = extract_content(root, index)
+    forms = extract_forms(root, index)
+    contacts_social = extract_contacts_social(root, index)
+    hashes["contentSimHash"] = content_simhash(content["scopedText"])
 
     harvested = {
         "meta": {
@@ -569,7 +710,7 @@ def extract(html: str, url: str, scoped: bool = True, diagnostics: bool = False)
             "harvestedAt": now_iso(),
             "url": url,
             "domain": urlparse(url).hostname or "",
-            "userAgent": "Scrapy/embedded",
+            "userAgent": user_agent,
             "scoped": bool(scoped),
             "diagnosticsMode": bool(diagnostics),
             "analysisTimeMs": int((time.time() - start) * 1000),
@@ -586,10 +727,11 @@ def extract(html: str, url: str, scoped: bool = True, diagnostics: bool = False)
             "schema": schema,
             "platform": platform,
             "technical": technical,
-            "hashes": {"headHash": head_hash(soup.decode())},
+            "hashes": hashes,
         },
     }
     return harvested
+
 def write_json(path, data):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
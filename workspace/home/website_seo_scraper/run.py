@@ -21,6 +21,11 @@ def parse_args(argv):
                    help="Obey robots.txt (default true). Use --no-respect-robots to disable.")
     p.add_argument("--no-respect-robots", dest="respect_robots", action="store_false")
     p.add_argument("--user-agent", dest="user_agent", help="Override User-Agent")
+    p.add_argument("--extract-workers", type=int,
+                   default=int(os.environ["EXTRACT_WORKERS"]) if os.getenv("EXTRACT_WORKERS") else None,
+                   help="Processes for HTML extraction (default: cores - 1; 0 = inline)")
+    p.add_argument("--recrawl-cache", default=os.getenv("RECRAWL_CACHE"),
+                   help="SQLite file of per-URL validators + results; unchanged pages skip extraction on re-crawls")
     return p.parse_args(argv)
 
 def main(argv=None):
@@ -29,6 +34,10 @@ def main(argv=None):
     if args.user_agent:
         settings.set("USER_AGENT", args.user_agent, priority="cmdline")
     settings.set("ROBOTSTXT_OBEY", bool(args.respect_robots), priority="cmdline")
+    if args.extract_workers is not None:
+        settings.set("EXTRACT_WORKERS", args.extract_workers, priority="cmdline")
+    if args.recrawl_cache:
+        settings.set("RECRAWL_CACHE", args.recrawl_cache, priority="cmdline")
     
     # Configure FEEDS dynamically (Scrapy 2.1+)
     settings.set("FEEDS", {args.output: {"format": "jsonlines"}}, priority="cmdline")
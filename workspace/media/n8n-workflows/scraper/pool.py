@@ -0,0 +1,209 @@
+"""
+Long-lived Playwright pool for the webhook service.
+
+One Chromium process is shared by every scrape. Each site gets one browser
+context loaded with its saved auth state, and each job runs in its own page.
+When the auth file changes, new jobs get a fresh context and the old one is
+closed once the last job using it finishes. Jobs wait in a bounded queue,
+at most `concurrency` run at once, and each is failed after SCRAPE_TIMEOUT.
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from playwright.async_api import async_playwright
+
+from scraper import (
+    AUTH_DIR, BROWSER_ARGS, load_sites_config, match_site, new_context,
+    scrape_page, CsvSink, extract_group_name, default_output_path,
+)
+
+# Finished jobs kept for GET /jobs/{id}
+MAX_FINISHED_JOBS = 200
+
+# Per-job limit in seconds, as the old subprocess runner had
+SCRAPE_TIMEOUT = 300
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class ScrapeJob:
+    job_id: str
+    url: str
+    scrolls: int
+    trigger_n8n: bool
+    status: str = "queued"  # queued | running | complete | failed
+    site: str = ""
+    posts: int = 0
+    output: str = ""
+    error: str = ""
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    finished_at: str = ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ScraperPool:
+    """Bounded job queue + worker tasks over a shared browser."""
+
+    def __init__(self, concurrency: int = 2, queue_size: int = 20,
+                 on_done: Optional[Callable[[ScrapeJob], Awaitable[None]]] = None):
+        self.concurrency = concurrency
+        self.on_done = on_done
+        self._queue: asyncio.Queue[ScrapeJob] = asyncio.Queue(maxsize=queue_size)
+        self._jobs: OrderedDict[str, ScrapeJob] = OrderedDict()
+        self._workers: list[asyncio.Task] = []
+        self._playwright = None
+        self._browser = None
+        self._contexts: dict[str, tuple[object, float]] = {}  # site -> (context, auth mtime)
+        self._context_users: dict[object, int] = {}  # context -> jobs with a page open in it
+        self._launch_lock = asyncio.Lock()
+        self._sites = load_sites_config()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._browser:
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+
+    # -- jobs -----------------------------------------------------------------
+
+    def submit(self, url: str, scrolls: int, trigger_n8n: bool) -> ScrapeJob:
+        job = ScrapeJob(job_id=uuid.uuid4().hex[:12], url=url, scrolls=scrolls, trigger_n8n=trigger_n8n)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull(f"Scrape queue is full ({self._queue.maxsize} jobs waiting)")
+        self._jobs[job.job_id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        running = sum(1 for j in self._jobs.values() if j.status == "running")
+        return {
+            "queued": self._queue.qsize(),
+            "running": running,
+            "concurrency": self.concurrency,
+            "queue_size": self._queue.maxsize,
+            "browser_connected": bool(self._browser and self._browser.is_connected()),
+        }
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status in ("complete", "failed")]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.job_id]
+
+    # -- browser --------------------------------------------------------------
+
+    async def _acquire_context(self, site_name: str):
+        """Shared context for a site, relaunching the browser if it died.
+
+        Every call must be paired with _release_context()."""
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                self._browser = await self._playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+                self._contexts.clear()
+                self._context_users.clear()
+
+            auth_file = AUTH_DIR / f"{site_name}_auth.json"
+            auth_mtime = auth_file.stat().st_mtime if auth_file.exists() else 0.0
+            cached = self._contexts.get(site_name)
+            if cached and cached[1] == auth_mtime:
+                context = cached[0]
+            else:
+                # First use, or the session was re-saved with --login: new jobs
+                # get the new cookies, jobs still in the old context finish there
+                context = await new_context(self._browser, site_name)
+                self._contexts[site_name] = (context, auth_mtime)
+                if cached and cached[0] not in self._context_users:
+                    await cached[0].close()
+            self._context_users[context] = self._context_users.get(context, 0) + 1
+            return context
+
+    async def _release_context(self, context):
+        """Drop a job's hold on a context; close it if it was replaced and is now idle."""
+        async with self._launch_lock:
+            users = self._context_users.get(context)
+            if users is None:
+                return  # browser was relaunched; the context died with it
+            if users > 1:
+                self._context_users[context] = users - 1
+                return
+            del self._context_users[context]
+            if all(context is not current for current, _ in self._contexts.values()):
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"Closing retired browser context failed: {e}")
+
+    # -- workers --------------------------------------------------------------
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                job.status, job.error = "failed", str(e)
+            finally:
+                job.finished_at = datetime.now().isoformat()
+                self._queue.task_done()
+            if self.on_done:
+                try:
+                    await self.on_done(job)
+                except Exception as e:
+                    print(f"on_done hook failed for {job.job_id}: {e}")
+
+    async def _run(self, job: ScrapeJob):
+        match = match_site(job.url, self._sites)
+        if not match:
+            job.status, job.error = "failed", f"No configuration found for URL: {job.url}"
+            return
+        site_name, config = match
+        job.site, job.status = site_name, "running"
+
+        group_name = extract_group_name(job.url, site_name)
+        sink = CsvSink(default_output_path(site_name, group_name, job.job_id), config["name"], group_name)
+
+        def on_posts(posts: list[dict]):
+            sink.write(posts)
+            job.posts = sink.count
+
+        # The sink is closed however the job ends, so no .part file is left behind
+        try:
+            context = await self._acquire_context(site_name)
+            try:
+                page = await context.new_page()
+                try:
+                    await asyncio.wait_for(
+                        scrape_page(page, job.url, config, job.scrolls, on_posts), SCRAPE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Scrape timed out after {SCRAPE_TIMEOUT // 60} minutes")
+                finally:
+                    await page.close()
+            finally:
+                await self._release_context(context)
+        finally:
+            output_path = sink.close()
+            # A failed job still points at whatever it saved before failing
+            job.output = str(output_path) if output_path else ""
+
+        job.status = "complete"
@@ -13,6 +13,8 @@ Usage:
 """
 
 import argparse
+import asyncio
+import csv
 import json
 import os
 import re
@@ -20,9 +22,10 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
-import pandas as pd
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightSyncTimeoutError
 
 # Configuration
 SCRIPT_DIR = Path(__file__).parent
@@ -30,8 +33,13 @@ SITES_CONFIG = SCRIPT_DIR / "sites.json"
 AUTH_DIR = SCRIPT_DIR / "auth"
 OUTPUT_DIR = Path(os.environ.get("SCRAPER_OUTPUT_DIR", "/data/scraper-output"))
 DEFAULT_SCROLLS = 10
-SCROLL_DELAY = 3  # Seconds between scrolls (increase if getting blocked)
+SCROLL_DELAY = 3  # Max seconds to wait for new posts after a scroll (increase if getting blocked)
+SCROLL_MIN_DELAY = 1  # Min seconds between scrolls, even when posts load instantly
+MAX_IDLE_SCROLLS = 3  # Stop after this many scrolls in a row load nothing new
 PAGE_LOAD_TIMEOUT = 30000  # ms
+BROWSER_ARGS = ["--disable-blink-features=AutomationControlled"]
+VIEWPORT = {"width": 1280, "height": 900}
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 
 def load_sites_config():
@@ -66,166 +74,288 @@ def save_auth(site_name: str, storage_state: dict):
     print(f"Session saved to {auth_file}")
 
 
-def extract_posts(page, selectors: dict) -> list[dict]:
-    """Extract posts from the current page using configured selectors."""
+# A container is handed to Python whenever its content signature differs from
+# the one recorded when it was last tagged: new nodes, skeletons that have
+# since rendered, and virtualized nodes recycled for another post all qualify.
+# Nodes that yield no post get their signature prefixed with "retry:"
+# (extract_new_posts), so the next scroll retries them, while they only count
+# as newly loaded posts for wait_for_new_posts once their content changes.
+_SIG_JS = "const sig = el.textContent.length + ':' + el.textContent.slice(0, 80);"
+
+# Tags every post container with new content with the scroll batch it was
+# picked up in; returns how many were tagged.
+_MARK_NEW_JS = """([sel, batch]) => {
+    let n = 0;
+    for (const el of document.querySelectorAll(sel)) {
+        %s
+        if (el.getAttribute('data-hwc-sig') !== sig) {
+            el.setAttribute('data-hwc-sig', sig);
+            el.setAttribute('data-hwc-batch', batch);
+            n++;
+        }
+    }
+    return n;
+}""" % _SIG_JS
+
+# True once a post container with content not yet extracted appears.
+_HAS_NEW_JS = """(sel) => {
+    for (const el of document.querySelectorAll(sel)) {
+        %s
+        const seen = el.getAttribute('data-hwc-sig');
+        if (seen !== sig && seen !== 'retry:' + sig) return true;
+    }
+    return false;
+}""" % _SIG_JS
+
+_RETRY_JS = "el => el.setAttribute('data-hwc-sig', 'retry:' + el.getAttribute('data-hwc-sig'))"
+
+
+async def extract_post(post_el, fields: dict) -> dict | None:
+    """Read one post container's fields; None if it has no text or author."""
+    post = {
+        "author": "",
+        "date": "",
+        "text": "",
+        "reactions": "",
+        "comments_count": "",
+        "comments": ""
+    }
+
+    # Extract each field using selectors
+    for field, selector in fields.items():
+        try:
+            el = await post_el.query_selector(selector)
+            if el:
+                post[field] = (await el.inner_text()).strip()
+        except Exception:
+            pass
+
+    # Only keep if we got meaningful content
+    if post.get("text") or post.get("author"):
+        return post
+    return None
+
+
+async def extract_new_posts(page, selectors: dict, batch: int) -> list[dict]:
+    """Extract only the post containers whose content changed since the previous call.
+
+    Such containers are tagged with `batch` in the DOM, so each rendered post
+    is read once no matter how many times the page scrolls. Containers that
+    give no post (still a skeleton, lazy content) are untagged and retried
+    on the next call.
+    """
     posts = []
 
     try:
-        post_elements = page.query_selector_all(selectors["post_container"])
+        tagged = await page.evaluate(_MARK_NEW_JS, [selectors["post_container"], batch])
+        if not tagged:
+            return posts
+        post_elements = await page.query_selector_all(f'[data-hwc-batch="{batch}"]')
     except Exception as e:
         print(f"Error finding posts: {e}")
         return posts
 
     for post_el in post_elements:
         try:
-            post = {
-                "author": "",
-                "date": "",
-                "text": "",
-                "reactions": "",
-                "comments_count": "",
-                "comments": ""
-            }
-
-            # Extract each field using selectors
-            for field, selector in selectors.get("fields", {}).items():
-                try:
-                    el = post_el.query_selector(selector)
-                    if el:
-                        post[field] = el.inner_text().strip()
-                except Exception:
-                    pass
-
-            # Only add if we got meaningful content
-            if post.get("text") or post.get("author"):
-                posts.append(post)
-
+            post = await extract_post(post_el, selectors.get("fields", {}))
         except Exception as e:
             print(f"Error extracting post: {e}")
+            post = None
+        if post:
+            posts.append(post)
             continue
+        try:
+            await post_el.evaluate(_RETRY_JS)
+        except Exception:
+            pass  # node detached; nothing left to retry
 
     return posts
 
 
-def deduplicate_posts(posts: list[dict]) -> list[dict]:
-    """Remove duplicate posts based on text content."""
-    seen = set()
-    unique = []
-    for post in posts:
-        # Create a fingerprint from text (first 100 chars) and author
-        fingerprint = f"{post.get('author', '')[:30]}|{post.get('text', '')[:100]}"
-        if fingerprint not in seen:
-            seen.add(fingerprint)
-            unique.append(post)
-    return unique
+def post_fingerprint(post: dict) -> str:
+    """Dedup key from author (first 30 chars) and text (first 100 chars)."""
+    return f"{post.get('author', '')[:30]}|{post.get('text', '')[:100]}"
 
 
-def scrape(url: str, site_name: str, config: dict, num_scrolls: int, login_mode: bool = False) -> list[dict]:
-    """Main scraping function."""
-    all_posts = []
+async def wait_for_new_posts(page, container_selector: str) -> bool:
+    """Wait after a scroll until new posts render, for at most SCROLL_DELAY.
 
-    with sync_playwright() as p:
-        # Launch browser
-        browser = p.chromium.launch(
-            headless=not login_mode,  # Show browser for login
-            args=["--disable-blink-features=AutomationControlled"]
-        )
-
-        # Load saved auth if available
-        auth_state = load_auth(site_name)
-        context_args = {"storage_state": auth_state} if auth_state else {}
-
-        context = browser.new_context(
-            viewport={"width": 1280, "height": 900},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            **context_args
-        )
-
-        page = context.new_page()
+    Returns True as soon as an unextracted post container exists (but never
+    before SCROLL_MIN_DELAY, to keep a human-like pace). If none shows up,
+    waits out network idle so a slow lazy-load isn't cut short, and returns
+    False.
+    """
+    await asyncio.sleep(SCROLL_MIN_DELAY)
+    remaining_ms = max(0, (SCROLL_DELAY - SCROLL_MIN_DELAY) * 1000)
+    try:
+        await page.wait_for_function(_HAS_NEW_JS, arg=container_selector,
+                                     polling=250, timeout=remaining_ms)
+        return True
+    except PlaywrightTimeoutError:
+        pass
+    try:
+        await page.wait_for_load_state("networkidle", timeout=remaining_ms)
+    except PlaywrightTimeoutError:
+        pass
+    return False
 
-        try:
-            print(f"Loading {url}...")
-            page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until="domcontentloaded")
 
-            # Wait for content to load
-            time.sleep(3)
-
-            if login_mode:
-                print("\n=== LOGIN MODE ===")
-                print("Log in manually in the browser window.")
-                print("Once you can see the feed, press Ctrl+C to save session.\n")
-                try:
-                    while True:
-                        time.sleep(1)
-                except KeyboardInterrupt:
-                    # Save the session
-                    storage_state = context.storage_state()
-                    save_auth(site_name, storage_state)
-                    browser.close()
-                    return []
-
-            # Scroll and collect posts
-            selectors = config.get("selectors", {})
-
-            for i in range(num_scrolls):
-                print(f"Scroll {i + 1}/{num_scrolls}...")
-
-                # Extract posts from current view
-                new_posts = extract_posts(page, selectors)
-                all_posts.extend(new_posts)
-
-                # Deduplicate after each scroll
-                all_posts = deduplicate_posts(all_posts)
-                print(f"  Found {len(all_posts)} unique posts so far")
-
-                # Scroll down
-                page.evaluate("window.scrollBy(0, window.innerHeight * 2)")
-                time.sleep(SCROLL_DELAY)
-
-        except PlaywrightTimeoutError:
-            print(f"Timeout loading {url}")
-        except Exception as e:
-            print(f"Error during scrape: {e}")
-        finally:
-            browser.close()
+async def new_context(browser, site_name: str):
+    """Open a browser context with the site's saved auth state, if any."""
+    auth_state = load_auth(site_name)
+    context_args = {"storage_state": auth_state} if auth_state else {}
+    return await browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT, **context_args)
 
-    return all_posts
 
+async def scrape_page(page, url: str, config: dict, num_scrolls: int,
+                      on_posts: Callable[[list[dict]], None]) -> int:
+    """Load `url` in an existing page and scroll through it collecting posts.
 
-def save_csv(posts: list[dict], source: str, group_name: str, output_path: Path):
-    """Save posts to standardized CSV format."""
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    After every scroll only newly rendered posts are extracted; unseen ones
+    are passed to `on_posts` straight away. Stops early once MAX_IDLE_SCROLLS
+    scrolls in a row load nothing. Returns the number of unique posts.
+    Shared by the CLI and the webhook's browser pool.
 
-    df = pd.DataFrame(posts)
+    Errors (including a page-load timeout) propagate to the caller; posts
+    found before the failure have already been passed to `on_posts`.
+    """
+    seen: set[str] = set()
 
-    # Standardize column names
-    column_map = {
-        "author": "Author",
-        "date": "Date",
-        "text": "Text",
-        "reactions": "Reactions",
-        "comments_count": "Comments Count",
-        "comments": "Comments"
-    }
+    print(f"Loading {url}...")
+    await page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until="domcontentloaded")
 
-    df = df.rename(columns=column_map)
+    selectors = config.get("selectors", {})
+    container = selectors.get("post_container", "")
 
-    # Add source columns
-    df.insert(0, "Source", source)
-    df.insert(1, "Group", group_name)
+    # Wait for the first posts to render
+    try:
+        await page.wait_for_selector(container, timeout=3000)
+    except PlaywrightTimeoutError:
+        pass
+
+    idle_scrolls = 0
+    for i in range(num_scrolls):
+        print(f"Scroll {i + 1}/{num_scrolls}...")
+
+        # Extract posts rendered since the last scroll
+        fresh = []
+        for post in await extract_new_posts(page, selectors, i):
+            fingerprint = post_fingerprint(post)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                fresh.append(post)
+        if fresh:
+            on_posts(fresh)
+        print(f"  Found {len(seen)} unique posts so far")
+
+        # Scroll down and wait for the feed to load more
+        await page.evaluate("window.scrollBy(0, window.innerHeight * 2)")
+        if await wait_for_new_posts(page, container):
+            idle_scrolls = 0
+        else:
+            idle_scrolls += 1
+            if idle_scrolls >= MAX_IDLE_SCROLLS:
+                print("  No new posts after several scrolls, stopping")
+                break
+
+    return len(seen)
+
+
+async def scrape_async(url: str, site_name: str, config: dict, num_scrolls: int,
+                       on_posts: Callable[[list[dict]], None]) -> int:
+    """Launch a browser for a single scrape (CLI path)."""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=BROWSER_ARGS)
+        try:
+            context = await new_context(browser, site_name)
+            page = await context.new_page()
+            return await scrape_page(page, url, config, num_scrolls, on_posts)
+        finally:
+            await browser.close()
 
-    # Ensure all standard columns exist
-    for col in ["Source", "Group", "Author", "Date", "Text", "Reactions", "Comments Count", "Comments"]:
-        if col not in df.columns:
-            df[col] = ""
 
-    # Reorder columns
-    df = df[["Source", "Group", "Author", "Date", "Text", "Reactions", "Comments Count", "Comments"]]
+def login(url: str, site_name: str):
+    """Open a visible browser so the user can log in, then save the session."""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=False, args=BROWSER_ARGS)
+        auth_state = load_auth(site_name)
+        context_args = {"storage_state": auth_state} if auth_state else {}
+        context = browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT, **context_args)
+        page = context.new_page()
+        try:
+            print(f"Loading {url}...")
+            page.goto(url, timeout=PAGE_LOAD_TIMEOUT, wait_until="domcontentloaded")
+            print("\n=== LOGIN MODE ===")
+            print("Log in manually in the browser window.")
+            print("Once you can see the feed, press Ctrl+C to save session.\n")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                # Save the session
+                save_auth(site_name, context.storage_state())
+        except PlaywrightSyncTimeoutError:
+            print(f"Timeout loading {url}")
+        finally:
+            browser.close()
 
-    df.to_csv(output_path, index=False)
-    print(f"\nSaved {len(df)} posts to {output_path}")
 
-    return output_path
+CSV_COLUMNS = ["Source", "Group", "Author", "Date", "Text", "Reactions", "Comments Count", "Comments"]
+
+# Post field -> standardized CSV column
+COLUMN_MAP = {
+    "author": "Author",
+    "date": "Date",
+    "text": "Text",
+    "reactions": "Reactions",
+    "comments_count": "Comments Count",
+    "comments": "Comments"
+}
+
+
+class CsvSink:
+    """Append posts to the standardized CSV as they are scraped.
+
+    Rows go to `<output>.part` and are flushed per batch, so memory stays flat
+    on deep scrolls. close() renames the file into place, so the n8n folder
+    watch never picks up a half-written CSV.
+    """
+
+    def __init__(self, output_path: Path, source: str, group_name: str):
+        self.output_path = output_path
+        self.source = source
+        self.group_name = group_name
+        self.count = 0
+        self._part_path = output_path.with_name(output_path.name + ".part")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._part_path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        self._writer.writeheader()
+
+    def write(self, posts: list[dict]):
+        for post in posts:
+            row = {"Source": self.source, "Group": self.group_name}
+            row.update({col: post.get(field, "") for field, col in COLUMN_MAP.items()})
+            self._writer.writerow(row)
+        self._file.flush()
+        self.count += len(posts)
+
+    def close(self) -> Path | None:
+        """Finish the CSV. Returns its path, or None (leaving no file) if nothing was written."""
+        self._file.close()
+        if not self.count:
+            self._part_path.unlink(missing_ok=True)
+            return None
+        os.replace(self._part_path, self.output_path)
+        print(f"\nSaved {self.count} posts to {self.output_path}")
+        return self.output_path
+
+
+def default_output_path(site_name: str, group_name: str, suffix: str = "") -> Path:
+    """Timestamped CSV path under OUTPUT_DIR (`suffix` keeps concurrent runs apart)."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    tail = f"_{suffix}" if suffix else ""
+    return OUTPUT_DIR / f"{site_name}_{group_name}_{timestamp}{tail}.csv"
 
 
 def extract_group_name(url: str, site_name: str) -> str:
@@ -263,28 +393,29 @@ def main():
     site_name, config = match
     print(f"Detected site: {config['name']}")
 
-    # Run scraper
-    posts = scrape(args.url, site_name, config, args.scrolls, args.login)
-
     if args.login:
+        login(args.url, site_name)
         print("Login session saved. Run again without --login to scrape.")
         return
 
-    if not posts:
-        print("No posts found.")
-        return
-
     # Generate output filename
     group_name = extract_group_name(args.url, site_name)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = OUTPUT_DIR / args.output if args.output else default_output_path(site_name, group_name)
 
-    if args.output:
-        output_path = OUTPUT_DIR / args.output
-    else:
-        output_path = OUTPUT_DIR / f"{site_name}_{group_name}_{timestamp}.csv"
+    # Run scraper, writing posts to the CSV as they're found
+    sink = CsvSink(output_path, config["name"], group_name)
+    try:
+        asyncio.run(scrape_async(args.url, site_name, config, args.scrolls, sink.write))
+    except PlaywrightTimeoutError:
+        print(f"Timeout loading {args.url}")
+    except Exception as e:
+        print(f"Error during scrape: {e}")
+    finally:
+        csv_path = sink.close()
 
-    # Save CSV
-    csv_path = save_csv(posts, config["name"], group_name, output_path)
+    if not csv_path:
+        print("No posts found.")
+        return
 
     # Optionally trigger n8n webhook
     if args.trigger_webhook:
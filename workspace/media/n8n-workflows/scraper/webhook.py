@@ -9,13 +9,14 @@ Slack usage:
   Example command: /scrape https://facebook.com/groups/XYZ 15
 
 HTTP usage:
-  POST /scrape {"url": "https://...", "scrolls": 10}
+  POST /scrape {"url": "https://...", "scrolls": 10}  -> {"job_id": ...}
+  GET  /jobs/{job_id}
+
+Scrapes run in-process on a shared Playwright browser (see pool.py) with a
+bounded queue; POST /scrape returns 429 when the queue is full.
 """
 
-import asyncio
 import os
-import subprocess
-import sys
 from datetime import datetime
 from pathlib import Path
 
@@ -23,11 +24,14 @@ from fastapi import FastAPI, Request, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 import httpx
 
+from pool import ScraperPool, ScrapeJob, QueueFull
+
 app = FastAPI(title="HWC Scraper Webhook")
 
-SCRIPT_DIR = Path(__file__).parent
-SCRAPER_PATH = SCRIPT_DIR / "scraper.py"
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL", "")
+N8N_SCRAPER_WEBHOOK = os.environ.get("N8N_SCRAPER_WEBHOOK", "http://localhost:5678/webhook/scraper-complete")
+SCRAPER_CONCURRENCY = int(os.environ.get("SCRAPER_CONCURRENCY", "2"))
+SCRAPER_QUEUE_SIZE = int(os.environ.get("SCRAPER_QUEUE_SIZE", "20"))
 
 
 class ScrapeRequest(BaseModel):
@@ -47,60 +51,65 @@ async def notify_slack(message: str):
         print(f"Slack notification failed: {e}")
 
 
-def run_scraper(url: str, scrolls: int, trigger_n8n: bool):
-    """Run the scraper in a subprocess."""
-    cmd = [
-        sys.executable, str(SCRAPER_PATH),
-        "--url", url,
-        "--scrolls", str(scrolls)
-    ]
-    if trigger_n8n:
-        cmd.append("--trigger-webhook")
+async def on_job_done(job: ScrapeJob):
+    """Notify Slack and trigger n8n when a pooled scrape finishes."""
+    if job.status != "complete":
+        await notify_slack(f":x: Scrape failed: {job.error[:200]}")
+        return
+    if not job.output:
+        await notify_slack(f":warning: No posts found: `{job.url}`")
+        return
+
+    await notify_slack(f":white_check_mark: Saved {job.posts} posts to {job.output}")
+    if job.trigger_n8n:
+        try:
+            async with httpx.AsyncClient() as client:
+                await client.post(N8N_SCRAPER_WEBHOOK, json={"filepath": job.output}, timeout=10)
+        except Exception as e:
+            print(f"n8n webhook failed: {e}")
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300,  # 5 minute timeout
-            cwd=str(SCRIPT_DIR)
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
-        return False, "", "Scraper timed out after 5 minutes"
-    except Exception as e:
-        return False, "", str(e)
 
+pool = ScraperPool(concurrency=SCRAPER_CONCURRENCY, queue_size=SCRAPER_QUEUE_SIZE, on_done=on_job_done)
 
-async def run_scraper_async(url: str, scrolls: int, trigger_n8n: bool):
-    """Run scraper in background and notify Slack."""
-    await notify_slack(f":mag: Starting scrape: `{url}` ({scrolls} scrolls)")
 
-    # Run in thread pool to not block
-    loop = asyncio.get_event_loop()
-    success, stdout, stderr = await loop.run_in_executor(
-        None, run_scraper, url, scrolls, trigger_n8n
-    )
+@app.on_event("startup")
+async def start_pool():
+    await pool.start()
 
-    if success:
-        # Extract post count from output
-        lines = stdout.split("\n")
-        post_line = [l for l in lines if "Saved" in l]
-        count_msg = post_line[0] if post_line else "Scrape complete"
-        await notify_slack(f":white_check_mark: {count_msg}")
-    else:
-        await notify_slack(f":x: Scrape failed: {stderr[:200]}")
+
+@app.on_event("shutdown")
+async def stop_pool():
+    await pool.stop()
+
+
+async def submit_scrape(url: str, scrolls: int, trigger_n8n: bool) -> ScrapeJob:
+    """Queue a scrape on the browser pool and announce it on Slack."""
+    job = pool.submit(url, scrolls, trigger_n8n)
+    await notify_slack(f":mag: Starting scrape: `{url}` ({scrolls} scrolls)")
+    return job
 
 
 @app.post("/scrape")
-async def scrape_endpoint(req: ScrapeRequest, background_tasks: BackgroundTasks):
+async def scrape_endpoint(req: ScrapeRequest):
     """Direct HTTP endpoint to trigger scraper."""
-    background_tasks.add_task(run_scraper_async, req.url, req.scrolls, req.trigger_n8n)
-    return {"status": "started", "url": req.url, "scrolls": req.scrolls}
+    try:
+        job = await submit_scrape(req.url, req.scrolls, req.trigger_n8n)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"status": job.status, "job_id": job.job_id, "url": req.url, "scrolls": req.scrolls}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status of a queued, running or recently finished scrape."""
+    job = pool.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 
 @app.post("/slack")
-async def slack_command(request: Request, background_tasks: BackgroundTasks):
+async def slack_command(request: Request):
     """
     Slack slash command endpoint.
 
@@ -126,12 +135,15 @@ async def slack_command(request: Request, background_tasks: BackgroundTasks):
     if not url.startswith("http"):
         return {"response_type": "ephemeral", "text": f"Invalid URL: {url}"}
 
-    # Start scraper in background
-    background_tasks.add_task(run_scraper_async, url, scrolls, True)
+    # Queue on the browser pool
+    try:
+        job = pool.submit(url, scrolls, True)
+    except QueueFull as e:
+        return {"response_type": "ephemeral", "text": f":hourglass: {e}, try again later."}
 
     return {
         "response_type": "in_channel",
-        "text": f":mag: Starting scrape: `{url}` ({scrolls} scrolls)\nI'll notify you when it's done."
+        "text": f":mag: Starting scrape: `{url}` ({scrolls} scrolls, job `{job.job_id}`)\nI'll notify you when it's done."
     }
 
 
@@ -183,10 +195,9 @@ async def tampermonkey_upload(request: Request, background_tasks: BackgroundTask
     await notify_slack(f":monkey: Tampermonkey upload: {len(posts)} posts from {source}/{group}")
 
     # Trigger n8n webhook
-    n8n_webhook = os.environ.get("N8N_SCRAPER_WEBHOOK", "http://localhost:5678/webhook/scraper-complete")
     try:
         async with httpx.AsyncClient() as client:
-            await client.post(n8n_webhook, json={"filepath": str(output_path)}, timeout=10)
+            await client.post(N8N_SCRAPER_WEBHOOK, json={"filepath": str(output_path)}, timeout=10)
     except Exception as e:
         print(f"n8n webhook failed: {e}")
 
@@ -195,7 +206,7 @@ async def tampermonkey_upload(request: Request, background_tasks: BackgroundTask
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "scraper_exists": SCRAPER_PATH.exists()}
+    return {"status": "ok", "pool": pool.stats()}
 
 
 if __name__ == "__main__":
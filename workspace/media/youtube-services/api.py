@@ -4,6 +4,7 @@ FastAPI service for extracting YouTube transcripts.
 """
 
 import asyncio
+import json
 import logging
 import os
 import shutil
@@ -11,15 +12,19 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 import uvicorn
 
 from transcript import (
     extract_video_id, is_playlist_url, fetch_metadata, fetch_playlist,
     fetch_transcript, clean_transcript, raw_transcript, format_markdown,
+    set_rate_limit, BACKEND_YTA, BACKEND_YTDLP, Segment, VideoMeta,
+    transcript_from_markdown, video_deadline, VideoDeadline,
 )
+from cache import TranscriptCache
+from jobs import JobStore, FINAL_STATUSES
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 logger = logging.getLogger("transcripts")
@@ -40,11 +45,28 @@ HOST = os.getenv("YT_TRANSCRIPTS_HOST", "127.0.0.1")
 PORT = int(os.getenv("YT_TRANSCRIPTS_PORT", "8100"))
 DEFAULT_MODE = os.getenv("YT_TRANSCRIPTS_DEFAULT_MODE", "clean")
 LANGUAGES = os.getenv("YT_TRANSCRIPTS_LANGUAGES", "en,en-US,en-GB").split(",")
-
-# Per-video wall-clock budget (metadata + transcript, incl. one retry).
+# Persistent metadata + segment cache; blank disables it.
+CACHE_PATH = os.getenv("YT_TRANSCRIPTS_CACHE", "/var/lib/hwc/transcripts/cache.sqlite3")
+# Persistent job store; finished jobs are evicted after the TTL.
+JOBS_PATH = Path(os.getenv("YT_TRANSCRIPTS_JOBS_DB", "/var/lib/hwc/transcripts/jobs.sqlite3"))
+JOB_TTL_HOURS = float(os.getenv("YT_TRANSCRIPTS_JOB_TTL_HOURS", "168"))
+
+# Per-video wall-clock budget (metadata + transcript, incl. one retry), not
+# counting time spent waiting on the shared rate limiters.
 VIDEO_TIMEOUT = 60
 
+# Videos extracted in parallel per job. Actual request rate is bounded by the
+# per-backend token buckets below, which are shared across all jobs.
+JOB_CONCURRENCY = max(1, int(os.getenv("YT_TRANSCRIPTS_CONCURRENCY", "4")))
+RATE_BURST = int(os.getenv("YT_TRANSCRIPTS_RATE_BURST", "3"))
+set_rate_limit(BACKEND_YTA, float(os.getenv("YT_TRANSCRIPTS_RATE_TRANSCRIPT_API", "1.0")), RATE_BURST)
+set_rate_limit(BACKEND_YTDLP, float(os.getenv("YT_TRANSCRIPTS_RATE_YTDLP", "0.5")), RATE_BURST)
+
 app = FastAPI(title="YouTube Transcripts", version="4.0.0")
+cache = TranscriptCache(Path(CACHE_PATH)) if CACHE_PATH else None
+jobs = JobStore(JOBS_PATH, ttl_seconds=JOB_TTL_HOURS * 3600)
+jobs.mark_interrupted()
+jobs.evict_expired()
 
 
 # ---------------------------------------------------------------------------
@@ -70,12 +92,8 @@ class JobStatus(BaseModel):
     output_dir: str = ""
     results: list[dict] = Field(default_factory=list)
     error: str = ""
-
-
-# ---------------------------------------------------------------------------
-# Job store
-# ---------------------------------------------------------------------------
-_jobs: dict[str, JobStatus] = {}
+    offset: int = 0
+    next_offset: int = 0
 
 
 # ---------------------------------------------------------------------------
@@ -124,14 +142,42 @@ def resolve_output_dir(base: str, subfolder: str) -> Path:
 # ---------------------------------------------------------------------------
 # Core extraction
 # ---------------------------------------------------------------------------
-async def _extract(url: str, mode: str, out_dir: Path) -> dict:
-    """Extract one video's transcript and write it into out_dir. Returns result dict."""
+async def _get_metadata(video_id: str, hint: VideoMeta | None = None) -> VideoMeta:
+    """Metadata from the cache or a playlist listing, fetching from YouTube only on a miss."""
+    meta = cache.get_meta(video_id) if cache else None
+    if meta is None and hint is not None:
+        return hint
+    if meta is None:
+        meta = await fetch_metadata(video_id)
+        if cache:
+            cache.put_meta(meta)
+    return meta
+
+
+async def _get_segments(video_id: str) -> list[Segment]:
+    """Caption segments from the cache, fetching from YouTube only on a miss."""
+    segments = cache.get_segments(video_id, LANGUAGES) if cache else None
+    if segments is None:
+        segments = await fetch_transcript(video_id, LANGUAGES)
+        if cache:
+            cache.put_segments(video_id, LANGUAGES, segments)
+    return segments
+
+
+async def _extract(url: str, mode: str, out_dir: Path, meta_hint: VideoMeta | None = None) -> dict:
+    """Extract one video's transcript and write it into out_dir. Returns result dict.
+
+    `meta_hint` is metadata from a flat playlist listing; when given, no
+    separate metadata call is made.
+    """
     video_id = extract_video_id(url)
     if not video_id:
         raise ValueError("Invalid YouTube URL")
 
-    meta = await fetch_metadata(video_id)
-    segments = await fetch_transcript(video_id, LANGUAGES)
+    meta, segments = await asyncio.gather(
+        _get_metadata(video_id, meta_hint),
+        _get_segments(video_id),
+    )
 
     mode = mode if mode in ("clean", "raw") else DEFAULT_MODE
     text = raw_transcript(segments) if mode == "raw" else clean_transcript(segments)
@@ -155,13 +201,29 @@ async def _extract(url: str, mode: str, out_dir: Path) -> dict:
     }
 
 
+async def _extract_timed(url: str, mode: str, out_dir: Path, meta_hint: VideoMeta | None = None) -> dict:
+    """_extract() under VIDEO_TIMEOUT. The clock stops while the video is queued
+    on the shared rate limiters, so only real work counts against it."""
+    try:
+        async with asyncio.timeout(VIDEO_TIMEOUT) as deadline:
+            token = video_deadline.set(VideoDeadline(deadline))
+            try:
+                return await _extract(url, mode, out_dir, meta_hint)
+            finally:
+                video_deadline.reset(token)
+    except TimeoutError:
+        if deadline.expired():
+            raise TimeoutError(f"Timed out after {VIDEO_TIMEOUT}s") from None
+        raise
+
+
 # ---------------------------------------------------------------------------
 # POST /transcript — single video, default location (n8n integration path)
 # ---------------------------------------------------------------------------
 @app.post("/transcript")
 async def post_transcript(body: TranscriptRequest):
     try:
-        result = await asyncio.wait_for(_extract(body.url, body.mode, OUTPUT_ROOTS[0]), timeout=VIDEO_TIMEOUT)
+        result = await _extract_timed(body.url, body.mode, OUTPUT_ROOTS[0])
         return result
     except asyncio.TimeoutError:
         raise HTTPException(504, f"Extraction timed out ({VIDEO_TIMEOUT}s limit)")
@@ -185,66 +247,182 @@ async def post_job(body: JobRequest, bg: BackgroundTasks):
     except ValueError as e:
         raise HTTPException(400, str(e))
 
+    evicted = jobs.evict_expired()
+    if evicted:
+        logger.info(f"Evicted {evicted} expired job(s)")
+
     job_id = uuid.uuid4().hex[:12]
-    job = JobStatus(job_id=job_id, output_dir=str(out_dir))
-    _jobs[job_id] = job
+    jobs.create(job_id, str(out_dir))
     bg.add_task(_run_job, job_id, urls, body.mode, str(out_dir))
     return {"job_id": job_id, "status": "queued", "output_dir": str(out_dir)}
 
 
+def _add_result(job_id: str, result: dict) -> None:
+    """Store a per-video result (without transcript text) and wake SSE listeners."""
+    result.pop("transcript", None)
+    jobs.add_result(job_id, result)
+    _notify(job_id)
+
+
 async def _run_job(job_id: str, urls: list[str], mode: str, out_dir_str: str):
-    job = _jobs.get(job_id)
-    if not job:
+    if jobs.get(job_id) is None:
+        return
+    jobs.update(job_id, status="running")
+    _notify(job_id)
+    try:
+        await _process_job(job_id, urls, mode, Path(out_dir_str))
+    except asyncio.CancelledError:
+        # shutdown: keep the partial results, but don't pass them off as complete
+        jobs.update(job_id, status="interrupted", error="Service stopped before the job finished")
+        _notify(job_id)
+        raise
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        jobs.update(job_id, status="failed", error=str(e) or type(e).__name__)
+        _notify(job_id)
         return
-    out_dir = Path(out_dir_str)
-    job.status = "running"
+    jobs.update(job_id, status="complete")
+    _notify(job_id)
+
 
-    # Phase 1 — classify + expand. Each work item is (video_url, dest_dir, playlist_title).
+async def _process_job(job_id: str, urls: list[str], mode: str, out_dir: Path):
+    # Phase 1 — classify + expand. Each work item is
+    # (video_url, dest_dir, playlist_title, meta_from_listing).
     # Playlists expand into their own titled subfolder under out_dir.
-    work: list[tuple[str, Path, str]] = []
+    work: list[tuple[str, Path, str, VideoMeta | None]] = []
+    failed = 0
     for raw in urls:
         video_id = extract_video_id(raw)
         if video_id:
-            work.append((f"https://www.youtube.com/watch?v={video_id}", out_dir, ""))
+            work.append((f"https://www.youtube.com/watch?v={video_id}", out_dir, "", None))
         elif is_playlist_url(raw):
             try:
                 pl = await fetch_playlist(raw)
             except Exception as e:
-                job.results.append({"url": raw, "error": f"Playlist error: {e}", "playlist": ""})
-                job.completed += 1
+                _add_result(job_id, {"url": raw, "error": f"Playlist error: {e}", "playlist": ""})
+                failed += 1
                 continue
             if not pl.video_ids:
-                job.results.append({"url": raw, "error": "Playlist has no videos", "playlist": pl.title})
-                job.completed += 1
+                _add_result(job_id, {"url": raw, "error": "Playlist has no videos", "playlist": pl.title})
+                failed += 1
                 continue
             dest = out_dir / (_sanitize_component(pl.title) or "playlist")
             for vid in pl.video_ids:
-                work.append((f"https://www.youtube.com/watch?v={vid}", dest, pl.title))
+                work.append((f"https://www.youtube.com/watch?v={vid}", dest, pl.title, pl.metas.get(vid)))
         else:
-            job.results.append({"url": raw, "error": "Invalid YouTube URL", "playlist": ""})
-            job.completed += 1
+            _add_result(job_id, {"url": raw, "error": "Invalid YouTube URL", "playlist": ""})
+            failed += 1
 
-    job.total = job.completed + len(work)
+    jobs.update(job_id, total=failed + len(work))
+    _notify(job_id)
 
-    # Phase 2 — extract each video sequentially (rate-limit friendly).
-    for video_url, dest, playlist_title in work:
-        try:
-            result = await asyncio.wait_for(_extract(video_url, mode, dest), timeout=VIDEO_TIMEOUT)
-            result["playlist"] = playlist_title
-            job.results.append(result)
-        except Exception as e:
-            job.results.append({"url": video_url, "error": str(e), "playlist": playlist_title})
-        job.completed += 1
+    # Phase 2 — extract with JOB_CONCURRENCY workers. The shared token buckets
+    # in transcript.py keep the combined request rate under the backend limits.
+    queue: asyncio.Queue[tuple[str, Path, str, VideoMeta | None]] = asyncio.Queue()
+    for item in work:
+        queue.put_nowait(item)
 
-    job.status = "complete"
+    async def worker():
+        while True:
+            try:
+                video_url, dest, playlist_title, meta_hint = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                result = await _extract_timed(video_url, mode, dest, meta_hint)
+                result["playlist"] = playlist_title
+                _add_result(job_id, result)
+            except Exception as e:
+                # bare timeouts from the individual fetches stringify to ""
+                error = str(e) or type(e).__name__
+                _add_result(job_id, {"url": video_url, "error": error, "playlist": playlist_title})
+
+    await asyncio.gather(*(worker() for _ in range(min(JOB_CONCURRENCY, len(work)))))
 
 
 @app.get("/job/{job_id}")
-async def get_job(job_id: str):
-    job = _jobs.get(job_id)
+async def get_job(job_id: str, offset: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=1000)):
+    """Job status plus one page of results (seq >= offset).
+
+    Poll with `offset=next_offset` to receive only new results.
+    """
+    job = jobs.get(job_id)
     if not job:
         raise HTTPException(404, "Job not found")
-    return job.model_dump()
+    results = jobs.results(job_id, offset, limit)
+    next_offset = results[-1]["seq"] + 1 if results else offset
+    return JobStatus(**job, results=results, offset=offset, next_offset=next_offset).model_dump()
+
+
+@app.get("/job/{job_id}/results/{seq}/transcript", response_class=PlainTextResponse)
+async def get_job_transcript(job_id: str, seq: int):
+    """Transcript text for one result, read back from its markdown file."""
+    result = jobs.result(job_id, seq)
+    if not result or not result.get("filename"):
+        raise HTTPException(404, "Result not found")
+    path = Path(result["filename"]).resolve()
+    if not any(path.is_relative_to(root.resolve()) for root in OUTPUT_ROOTS):
+        raise HTTPException(403, "File is outside the allowed locations")
+    try:
+        md = path.read_text(encoding="utf-8")
+    except OSError:
+        raise HTTPException(404, "Transcript file no longer exists")
+    return transcript_from_markdown(md)
+
+
+# ---------------------------------------------------------------------------
+# GET /job/{id}/events — Server-Sent Events stream of per-video results
+# ---------------------------------------------------------------------------
+_job_updates: dict[str, asyncio.Event] = {}
+
+
+def _notify(job_id: str) -> None:
+    event = _job_updates.pop(job_id, None)
+    if event:
+        event.set()
+
+
+def _sse(event: str, data: dict, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/job/{job_id}/events")
+async def job_events(job_id: str, request: Request, after: int = Query(-1, ge=-1)):
+    """Stream `result` events (one per finished video), `status` updates, then `done`.
+
+    Resumes after `after` or the Last-Event-ID header, so a reconnecting client
+    only receives results it hasn't seen.
+    """
+    if jobs.get(job_id) is None:
+        raise HTTPException(404, "Job not found")
+    last_id = request.headers.get("last-event-id")
+    offset = int(last_id) + 1 if last_id and last_id.isdigit() else after + 1
+
+    async def stream():
+        nonlocal offset
+        while True:
+            # Subscribe before reading so an update between read and wait isn't lost
+            update = _job_updates.setdefault(job_id, asyncio.Event())
+            job = jobs.get(job_id)
+            if job is None:
+                return
+            for result in jobs.results(job_id, offset, 1000):
+                offset = result["seq"] + 1
+                yield _sse("result", result, result["seq"])
+            yield _sse("status", job)
+            if job["status"] in FINAL_STATUSES and offset >= job["completed"]:
+                yield _sse("done", job)
+                return
+            if await request.is_disconnected():
+                return
+            try:
+                await asyncio.wait_for(update.wait(), timeout=15)
+            except asyncio.TimeoutError:
+                pass
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ---------------------------------------------------------------------------
@@ -357,7 +535,7 @@ async def ui():
 
 <script>
 const $=id=>document.getElementById(id);
-let _results=[];
+let _results=[], _jobId='', _events=null;
 
 function rowHtml() {
   return `<div class="urlrow">
@@ -397,7 +575,12 @@ function renderResults(status) {
       li.className='ok';
       li.innerHTML=`<div class="body"><div class="title">${badge}${r.title||''}</div><div class="path">${r.filename||''}</div></div>`;
       const b=document.createElement('button'); b.className='copy'; b.textContent='Copy';
-      b.onclick=()=>{navigator.clipboard.writeText(_results[i].transcript||'');b.textContent='Copied!';setTimeout(()=>b.textContent='Copy',1200);};
+      b.onclick=async()=>{
+        const tr=await fetch('/job/'+_jobId+'/results/'+r.seq+'/transcript');
+        if(!tr.ok){b.textContent='Missing';setTimeout(()=>b.textContent='Copy',1200);return;}
+        await navigator.clipboard.writeText(await tr.text());
+        b.textContent='Copied!';setTimeout(()=>b.textContent='Copy',1200);
+      };
       li.appendChild(b);
     }
     $('results').appendChild(li);
@@ -415,18 +598,19 @@ async function run() {
       body:JSON.stringify({urls,mode:$('mode').value,base:$('base').value,subfolder:$('subfolder').value.trim()})});
     if(!r.ok){const e=await r.json();throw new Error(e.detail||r.statusText);}
     const d=await r.json();
+    _jobId=d.job_id;
     $('msg').textContent='Saving to '+d.output_dir+' — expanding...';
-    const poll=setInterval(async()=>{
-      const pr=await fetch('/job/'+d.job_id);
-      if(!pr.ok) return;
-      const pd=await pr.json();
-      _results=pd.results;
+    if(_events) _events.close();
+    _events=new EventSource('/job/'+d.job_id+'/events');
+    _events.addEventListener('result',e=>{ _results.push(JSON.parse(e.data)); renderResults(); });
+    const showStatus=e=>{
+      const pd=JSON.parse(e.data);
       const totalTxt=pd.total?('/'+pd.total):'';
-      $('msg').textContent=(pd.status==='complete'?'Done ':'Processing... ')
+      $('msg').textContent=(pd.status==='running'||pd.status==='queued'?'Processing... ':pd.status==='complete'?'Done ':'Stopped ('+pd.status+') ')
         +'('+pd.completed+totalTxt+') → '+pd.output_dir;
-      renderResults(pd.status);
-      if(pd.status==='complete'){clearInterval(poll);$('go').disabled=false;}
-    },1500);
+    };
+    _events.addEventListener('status',showStatus);
+    _events.addEventListener('done',e=>{ showStatus(e); _events.close(); $('go').disabled=false; });
   } catch(e) {
     $('msg').className='msg err'; $('msg').textContent=e.message; $('go').disabled=false;
   }
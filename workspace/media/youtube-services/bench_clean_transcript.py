@@ -0,0 +1,133 @@
+"""
+Benchmark + equivalence check for the rolling-caption merge in clean_transcript.
+
+Compares transcript._merge_rolling against the previous quadratic merge
+(kept verbatim below) on long VTT inputs and reports per-run timings.
+Exits non-zero if the merged segments ever differ.
+
+Usage:
+    python3 bench_clean_transcript.py                 # synthetic 1h/3h/6h auto-captions
+    python3 bench_clean_transcript.py a.vtt b.vtt     # real VTT files
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+from transcript import Segment, _merge_rolling, _parse_vtt, clean_transcript
+
+
+# ---------------------------------------------------------------------------
+# Previous implementation (reference)
+# ---------------------------------------------------------------------------
+def _legacy_find_overlap(prev: str, curr: str) -> int:
+    max_check = min(len(prev), len(curr))
+    for size in range(max_check, 0, -1):
+        if prev.endswith(curr[:size]):
+            return size
+    return 0
+
+
+def _legacy_merge(segments: list[Segment]) -> list[Segment]:
+    merged_texts: list[str] = []
+    merged_segments: list[Segment] = []
+    for seg in segments:
+        text = seg.text.strip()
+        if not text:
+            continue
+        if merged_texts:
+            prev = merged_texts[-1].lower()
+            curr = text.lower()
+            if prev in curr:
+                idx = curr.index(prev) + len(prev)
+                new_part = text[idx:].strip()
+                if new_part:
+                    merged_texts.append(text)
+                    merged_segments.append(Segment(text=new_part, start=seg.start, duration=seg.duration))
+                continue
+            if curr in prev:
+                continue
+            overlap = _legacy_find_overlap(prev, curr)
+            if overlap > len(curr) * 0.4:
+                new_part = text[overlap:].strip()
+                if new_part:
+                    merged_texts.append(text)
+                    merged_segments.append(Segment(text=new_part, start=seg.start, duration=seg.duration))
+                continue
+        merged_texts.append(text)
+        merged_segments.append(Segment(text=text, start=seg.start, duration=seg.duration))
+    return merged_segments
+
+
+# ---------------------------------------------------------------------------
+# Synthetic YouTube-style rolling auto-captions
+# ---------------------------------------------------------------------------
+_WORDS = (
+    "so the the grain and then you want to cut across um this board right here "
+    "we are going to take a look at how the lathe works and uh what I mean is "
+    "that the tool rest needs to be close to the work piece okay"
+).split()
+
+
+def _ts(t: float) -> str:
+    h, r = divmod(t, 3600)
+    m, s = divmod(r, 60)
+    return f"{int(h):02d}:{int(m):02d}:{s:06.3f}"
+
+
+def synthetic_vtt(hours: float, seed: int = 0) -> str:
+    """Two-line rolling cues: each cue repeats the previous cue's second line."""
+    rng = random.Random(seed)
+    out = ["WEBVTT", ""]
+    t = 0.0
+    prev_line = ""
+    while t < hours * 3600:
+        line = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14)))
+        dur = rng.uniform(1.5, 4.0)
+        out.append(f"{_ts(t)} --> {_ts(t + dur)}")
+        if prev_line:
+            out.append(prev_line)
+        out.append(line)
+        out.append("")
+        prev_line = line
+        # occasional pause long enough to start a new paragraph
+        t += dur + (6.0 if rng.random() < 0.02 else 0.0)
+    return "\n".join(out)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def _best_of(fn, arg, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(name: str, vtt_text: str) -> bool:
+    segments = _parse_vtt(vtt_text)
+    same = _merge_rolling(segments) == _legacy_merge(segments)
+    t_legacy = _best_of(_legacy_merge, segments)
+    t_new = _best_of(_merge_rolling, segments)
+    t_clean = _best_of(clean_transcript, segments)
+    print(f"{name:<24} {len(segments):>8} {t_legacy * 1000:>10.1f} {t_new * 1000:>10.1f} "
+          f"{t_legacy / t_new:>7.1f}x {t_clean * 1000:>10.1f}  {'OK' if same else 'MISMATCH'}")
+    return same
+
+
+def main() -> int:
+    print(f"{'input':<24} {'segments':>8} {'legacy ms':>10} {'merge ms':>10} {'speedup':>8} {'clean ms':>10}")
+    if len(sys.argv) > 1:
+        inputs = [(Path(p).name, Path(p).read_text(encoding="utf-8")) for p in sys.argv[1:]]
+    else:
+        inputs = [(f"synthetic {h}h", synthetic_vtt(h, seed=h)) for h in (1, 3, 6)]
+    ok = all([bench(name, text) for name, text in inputs])
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
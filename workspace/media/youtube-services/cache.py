@@ -0,0 +1,83 @@
+"""
+Transcript cache — hwc-server
+SQLite store of raw caption segments and video metadata keyed by video ID.
+
+Only cache misses hit YouTube; clean/raw rendering and markdown output are
+regenerated locally from the stored segments on every request.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from transcript import Segment, VideoMeta
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    video_id   TEXT PRIMARY KEY,
+    data       TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    video_id   TEXT NOT NULL,
+    langs      TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (video_id, langs)
+);
+"""
+
+
+class TranscriptCache:
+    """Persistent video metadata + caption segment cache.
+
+    Segments are keyed by video ID and the language preference list, since the
+    list decides which caption track gets picked. Failures are never cached.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _langs_key(langs: list[str]) -> str:
+        return ",".join(langs)
+
+    def get_meta(self, video_id: str) -> Optional[VideoMeta]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM meta WHERE video_id = ?", (video_id,)).fetchone()
+        return VideoMeta(**json.loads(row[0])) if row else None
+
+    def put_meta(self, meta: VideoMeta) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (video_id, data, fetched_at) VALUES (?, ?, ?)",
+                (meta.video_id, json.dumps(asdict(meta)), time.time()),
+            )
+
+    def get_segments(self, video_id: str, langs: list[str]) -> Optional[list[Segment]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM segments WHERE video_id = ? AND langs = ?",
+                (video_id, self._langs_key(langs)),
+            ).fetchone()
+        if not row:
+            return None
+        return [Segment(text=t, start=s, duration=d) for t, s, d in json.loads(row[0])]
+
+    def put_segments(self, video_id: str, langs: list[str], segments: list[Segment]) -> None:
+        data = json.dumps([[s.text, s.start, s.duration] for s in segments], separators=(",", ":"))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO segments (video_id, langs, data, fetched_at) VALUES (?, ?, ?, ?)",
+                (video_id, self._langs_key(langs), data, time.time()),
+            )
@@ -0,0 +1,130 @@
+"""
+Job store — hwc-server
+SQLite-backed transcript job state that survives restarts.
+
+Results are stored as small per-video rows (title, url, output filename) —
+never the transcript text, which stays in the written markdown file — so
+memory doesn't grow with job size and clients can page through results.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id     TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,
+    completed  INTEGER NOT NULL DEFAULT 0,
+    total      INTEGER NOT NULL DEFAULT 0,
+    output_dir TEXT NOT NULL,
+    error      TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    seq    INTEGER NOT NULL,
+    data   TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+# Statuses a job can't leave by itself; anything else at startup was cut off
+# by a restart.
+FINAL_STATUSES = ("complete", "interrupted", "failed")
+
+
+class JobStore:
+    """Persistent jobs + per-video results with TTL eviction."""
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, output_dir: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (job_id, status, output_dir, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, output_dir, now, now),
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        """Set any of status/total/error."""
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._db:
+            self._db.execute(
+                f"UPDATE jobs SET {cols}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), time.time(), job_id),
+            )
+
+    def add_result(self, job_id: str, result: dict) -> int:
+        """Append a result and bump `completed`. Returns the result's sequence number."""
+        with self._lock, self._db:
+            (seq,) = self._db.execute("SELECT completed FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            self._db.execute(
+                "INSERT INTO results (job_id, seq, data) VALUES (?, ?, ?)",
+                (job_id, seq, json.dumps(result)),
+            )
+            self._db.execute(
+                "UPDATE jobs SET completed = completed + 1, updated_at = ? WHERE job_id = ?",
+                (time.time(), job_id),
+            )
+        return seq
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, status, completed, total, output_dir, error FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if not row:
+            return None
+        keys = ("job_id", "status", "completed", "total", "output_dir", "error")
+        return dict(zip(keys, row))
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> list[dict]:
+        """Results with seq >= offset, oldest first, each carrying its `seq`."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, data FROM results WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [{**json.loads(data), "seq": seq} for seq, data in rows]
+
+    def result(self, job_id: str, seq: int) -> Optional[dict]:
+        found = self.results(job_id, seq, 1)
+        return found[0] if found and found[0]["seq"] == seq else None
+
+    def evict_expired(self) -> int:
+        """Delete finished jobs (and their results) older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        marks = ",".join("?" * len(FINAL_STATUSES))
+        with self._lock, self._db:
+            cur = self._db.execute(
+                f"DELETE FROM jobs WHERE updated_at < ? AND status IN ({marks})",
+                (cutoff, *FINAL_STATUSES),
+            )
+        return cur.rowcount
+
+    def mark_interrupted(self) -> int:
+        """Flag jobs left queued/running by a previous process."""
+        marks = ",".join("?" * len(FINAL_STATUSES))
+        with self._lock, self._db:
+            cur = self._db.execute(
+                f"UPDATE jobs SET status = 'interrupted', error = 'Service restarted before the job finished', "
+                f"updated_at = ? WHERE status NOT IN ({marks})",
+                (time.time(), *FINAL_STATUSES),
+            )
+        return cur.rowcount
@@ -1,16 +1,108 @@
 """
 YouTube transcript extraction and cleaning.
 
-Uses youtube-transcript-api for captions, yt-dlp for metadata only.
+Uses youtube-transcript-api for captions, yt-dlp (in-process when the library
+is installed, CLI otherwise) for metadata, playlists and the VTT fallback.
 No NLP libraries, no LLM, no spaCy.
 """
 
 import asyncio
+import contextvars
+import json
 import re
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Optional
 
 
+# ---------------------------------------------------------------------------
+# Rate limiting (token bucket per backend, shared across all jobs)
+# ---------------------------------------------------------------------------
+class VideoDeadline:
+    """A video's asyncio.timeout() that stops running while the video waits for
+    a rate-limit token, so a busy bucket never eats into the video's budget.
+    Overlapping waits (metadata and transcript queued at once) pause it once."""
+
+    def __init__(self, timeout: asyncio.Timeout):
+        self._timeout = timeout
+        self._waiting = 0
+        self._remaining: Optional[float] = None
+
+    def pause(self) -> None:
+        self._waiting += 1
+        if self._waiting == 1 and not self._timeout.expired():
+            when = self._timeout.when()
+            if when is not None:
+                self._remaining = when - asyncio.get_running_loop().time()
+                self._timeout.reschedule(None)
+
+    def resume(self) -> None:
+        self._waiting -= 1
+        if self._waiting == 0 and self._remaining is not None:
+            if not self._timeout.expired():
+                self._timeout.reschedule(asyncio.get_running_loop().time() + self._remaining)
+            self._remaining = None
+
+
+# Deadline of the video being extracted in this task, if any (see TokenBucket)
+video_deadline: contextvars.ContextVar[Optional[VideoDeadline]] = contextvars.ContextVar(
+    "video_deadline", default=None
+)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests/second sustained, bursts up to `burst`.
+
+    One bucket per backend is shared by every request in the process, so
+    concurrent jobs together stay under the limit. Waiters queue on the lock,
+    so tokens are handed out in arrival order. A rate of 0 disables limiting.
+    The caller's `video_deadline` is paused while it waits here.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        deadline = video_deadline.get()
+        if deadline is not None:
+            deadline.pause()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            if deadline is not None:
+                deadline.resume()
+
+
+BACKEND_YTA = "youtube_transcript_api"
+BACKEND_YTDLP = "yt-dlp"
+
+_limiters: dict[str, TokenBucket] = {
+    BACKEND_YTA: TokenBucket(rate=1.0, burst=3),
+    BACKEND_YTDLP: TokenBucket(rate=0.5, burst=2),
+}
+
+
+def set_rate_limit(backend: str, rate: float, burst: int) -> None:
+    """Replace the limiter for `backend`. Call at startup, before any requests."""
+    _limiters[backend] = TokenBucket(rate=rate, burst=burst)
+
+
 # ---------------------------------------------------------------------------
 # Video ID extraction
 # ---------------------------------------------------------------------------
@@ -31,6 +123,61 @@ def is_playlist_url(url: str) -> bool:
     return "list=" in url
 
 
+# ---------------------------------------------------------------------------
+# yt-dlp driver — in-process library, subprocess fallback
+# ---------------------------------------------------------------------------
+# yt-dlp runs in-process on a dedicated thread pool so each call skips Python
+# startup and extractor imports (~1 s). YoutubeDL isn't thread-safe, so each
+# pool thread keeps its own long-lived instances. Without the library we fall
+# back to spawning the CLI.
+try:
+    import yt_dlp
+except ImportError:
+    yt_dlp = None
+
+YTDLP_THREADS = 4
+
+_YDL_OPTS = {"quiet": True, "no_warnings": True, "skip_download": True, "socket_timeout": 15}
+_YDL_FLAT_OPTS = {**_YDL_OPTS, "extract_flat": "in_playlist"}
+
+_ytdlp_executor = ThreadPoolExecutor(max_workers=YTDLP_THREADS, thread_name_prefix="yt-dlp")
+_ydl_local = threading.local()
+
+
+def _thread_ydl(flat: bool):
+    attr = "flat" if flat else "full"
+    ydl = getattr(_ydl_local, attr, None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(_YDL_FLAT_OPTS if flat else _YDL_OPTS)
+        setattr(_ydl_local, attr, ydl)
+    return ydl
+
+
+def _ytdlp_info_sync(url: str, flat: bool) -> dict:
+    try:
+        return _thread_ydl(flat).extract_info(url, download=False)
+    except yt_dlp.utils.DownloadError as e:
+        raise RuntimeError(str(e)) from None
+
+
+async def _run_ytdlp(fn, *args, timeout: float):
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(_ytdlp_executor, fn, *args), timeout=timeout)
+
+
+async def _ytdlp_cli_json(args: list[str], timeout: float) -> tuple[Optional[dict], str]:
+    """Run the yt-dlp CLI and parse its JSON output. Returns (info, stderr)."""
+    proc = await asyncio.create_subprocess_exec(
+        "yt-dlp", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    if proc.returncode != 0:
+        return None, stderr.decode().strip()
+    return json.loads(stdout), ""
+
+
 # ---------------------------------------------------------------------------
 # Metadata via yt-dlp (single async call)
 # ---------------------------------------------------------------------------
@@ -46,17 +193,17 @@ class VideoMeta:
 
 async def fetch_metadata(video_id: str) -> VideoMeta:
     url = f"https://www.youtube.com/watch?v={video_id}"
-    proc = await asyncio.create_subprocess_exec(
-        "yt-dlp", "--dump-json", "--no-download", "--no-warnings", "-q", url,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=20)
-    if proc.returncode != 0:
-        raise RuntimeError(f"yt-dlp failed: {stderr.decode().strip()}")
+    await _limiters[BACKEND_YTDLP].acquire()
+    if yt_dlp is not None:
+        try:
+            info = await _run_ytdlp(_ytdlp_info_sync, url, False, timeout=20)
+        except RuntimeError as e:
+            raise RuntimeError(f"yt-dlp failed: {e}") from None
+    else:
+        info, err = await _ytdlp_cli_json(["--dump-json", "--no-download", "--no-warnings", "-q", url], timeout=20)
+        if info is None:
+            raise RuntimeError(f"yt-dlp failed: {err}")
 
-    import json
-    info = json.loads(stdout)
     return VideoMeta(
         video_id=video_id,
         title=info.get("title", "Unknown"),
@@ -74,29 +221,52 @@ async def fetch_metadata(video_id: str) -> VideoMeta:
 class PlaylistInfo:
     title: str
     video_ids: list[str]
+    # Metadata already present in the flat listing, for entries that carry
+    # every field we render — these videos need no per-video metadata call.
+    metas: dict[str, VideoMeta] = field(default_factory=dict)
+
+
+def meta_from_flat_entry(entry: dict) -> Optional[VideoMeta]:
+    """Build VideoMeta from a flat-playlist entry, or None if fields are missing."""
+    video_id = entry.get("id")
+    title = entry.get("title")
+    channel = entry.get("channel") or entry.get("uploader")
+    duration = entry.get("duration")
+    if not (video_id and title and channel and duration is not None):
+        return None
+    return VideoMeta(
+        video_id=video_id,
+        title=title,
+        channel=channel,
+        duration=int(duration),
+        upload_date=entry.get("upload_date") or "",
+        url=f"https://www.youtube.com/watch?v={video_id}",
+    )
 
 
 async def fetch_playlist(url: str) -> PlaylistInfo:
     """Expand a playlist URL into its video IDs + the playlist title.
 
-    Uses `--flat-playlist` so this is one cheap call that does NOT fetch each
-    video; per-video metadata/transcripts are fetched later, one at a time.
+    Uses a flat listing so this is one cheap call that does NOT fetch each
+    video. The listing's per-entry title/channel/duration are kept in `metas`
+    so callers can skip the per-video metadata fetch.
     """
-    proc = await asyncio.create_subprocess_exec(
-        "yt-dlp", "--flat-playlist", "--dump-single-json", "--no-warnings", "-q", url,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=45)
-    if proc.returncode != 0:
-        raise RuntimeError(f"yt-dlp playlist fetch failed: {stderr.decode().strip()}")
-
-    import json
-    info = json.loads(stdout)
-    entries = info.get("entries") or []
-    video_ids = [e["id"] for e in entries if isinstance(e, dict) and e.get("id")]
+    await _limiters[BACKEND_YTDLP].acquire()
+    if yt_dlp is not None:
+        try:
+            info = await _run_ytdlp(_ytdlp_info_sync, url, True, timeout=45)
+        except RuntimeError as e:
+            raise RuntimeError(f"yt-dlp playlist fetch failed: {e}") from None
+    else:
+        info, err = await _ytdlp_cli_json(["--flat-playlist", "--dump-single-json", "--no-warnings", "-q", url], timeout=45)
+        if info is None:
+            raise RuntimeError(f"yt-dlp playlist fetch failed: {err}")
+
+    entries = [e for e in info.get("entries") or [] if isinstance(e, dict) and e.get("id")]
+    video_ids = [e["id"] for e in entries]
+    metas = {m.video_id: m for m in map(meta_from_flat_entry, entries) if m is not None}
     title = info.get("title") or info.get("id") or "playlist"
-    return PlaylistInfo(title=title, video_ids=video_ids)
+    return PlaylistInfo(title=title, video_ids=video_ids, metas=metas)
 
 
 def format_duration(seconds: int) -> str:
@@ -146,6 +316,7 @@ async def fetch_transcript(video_id: str, langs: list[str] | None = None, attemp
 async def _try_youtube_transcript_api(video_id: str, langs: list[str]) -> list[Segment]:
     try:
         from youtube_transcript_api import YouTubeTranscriptApi
+        await _limiters[BACKEND_YTA].acquire()
         # Run in thread since this library is sync
         loop = asyncio.get_event_loop()
         raw = await loop.run_in_executor(None, _fetch_yta_sync, video_id, langs)
@@ -185,7 +356,36 @@ def _fetch_yta_sync(video_id: str, langs: list[str]) -> list[dict]:
 
 
 async def _try_ytdlp_vtt(video_id: str, langs: list[str]) -> list[Segment]:
-    """Fallback: download VTT subtitles via yt-dlp and parse them."""
+    """Fallback: fetch VTT subtitles via yt-dlp and parse them."""
+    await _limiters[BACKEND_YTDLP].acquire()
+    if yt_dlp is None:
+        return await _try_ytdlp_vtt_cli(video_id, langs)
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    try:
+        text = await _run_ytdlp(_fetch_vtt_sync, url, langs, timeout=20)
+    except Exception:
+        return []
+    return _parse_vtt(text) if text else []
+
+
+def _fetch_vtt_sync(url: str, langs: list[str]) -> str:
+    """Pick a VTT track from the info dict and download it into memory.
+
+    Manual subtitles win over auto-captions, then `langs` order decides.
+    """
+    ydl = _thread_ydl(False)
+    info = ydl.extract_info(url, download=False)
+    for source in ("subtitles", "automatic_captions"):
+        tracks = info.get(source) or {}
+        for lang in langs:
+            for fmt in tracks.get(lang) or []:
+                if fmt.get("ext") == "vtt" and fmt.get("url"):
+                    return ydl.urlopen(fmt["url"]).read().decode("utf-8", "replace")
+    return ""
+
+
+async def _try_ytdlp_vtt_cli(video_id: str, langs: list[str]) -> list[Segment]:
+    """CLI fallback: download VTT subtitles via the yt-dlp binary and parse them."""
     import tempfile, os
     url = f"https://www.youtube.com/watch?v={video_id}"
     lang_str = ",".join(langs)
@@ -252,54 +452,112 @@ _FILLER_START = re.compile(
 )
 
 
-def _find_overlap(prev: str, curr: str) -> int:
-    """Find how many characters at the start of curr overlap with the end of prev."""
-    max_check = min(len(prev), len(curr))
-    for size in range(max_check, 0, -1):
-        if prev.endswith(curr[:size]):
-            return size
+# Candidate starts checked with C string ops before switching to KMP; only a
+# highly periodic caption can produce more than a handful.
+_OVERLAP_MAX_CANDIDATES = 4
+
+
+def _kmp_overlap(prev: str, curr: str) -> int:
+    """Longest prefix of curr that is a suffix of prev, in O(len(prev) + len(curr)).
+
+    Builds curr's failure table, then runs the tail of prev through the
+    matcher; the final state is the overlap length.
+    """
+    fail = [0] * len(curr)
+    k = 0
+    for i in range(1, len(curr)):
+        while k and curr[i] != curr[k]:
+            k = fail[k - 1]
+        if curr[i] == curr[k]:
+            k += 1
+        fail[i] = k
+
+    # Only the last len(curr) characters of prev can take part in an overlap
+    tail = prev[-len(curr):]
+    last = len(tail) - 1
+    q = 0
+    for i, ch in enumerate(tail):
+        while q and ch != curr[q]:
+            q = fail[q - 1]
+        if ch == curr[q]:
+            q += 1
+        if q == len(curr) and i < last:
+            # All of curr matched before the end of prev; fall back and keep scanning
+            q = fail[q - 1]
+    return q
+
+
+def _find_overlap(prev: str, curr: str, min_size: int = 1) -> int:
+    """Find how many characters at the start of curr overlap with the end of prev.
+
+    Returns 0 when the overlap is shorter than `min_size`. Any overlap of at
+    least `min_size` starts with curr[:min_size], so candidate starts in prev
+    are located with str.find and verified with startswith, leftmost (largest)
+    first. Pathologically periodic text falls back to KMP, keeping the worst
+    case linear.
+    """
+    if not prev or not curr or min_size > min(len(prev), len(curr)):
+        return 0
+    key = curr[:min_size]
+    i = prev.find(key, max(0, len(prev) - len(curr)))
+    checked = 0
+    while i != -1:
+        if curr.startswith(prev[i:]):
+            return len(prev) - i
+        checked += 1
+        if checked >= _OVERLAP_MAX_CANDIDATES:
+            size = _kmp_overlap(prev, curr)
+            return size if size >= min_size else 0
+        i = prev.find(key, i + 1)
     return 0
 
 
-def clean_transcript(segments: list[Segment], gap_threshold: float = 5.0) -> str:
-    """Clean mode: dedup, strip fillers, paragraph by gaps."""
-    if not segments:
-        return ""
+def _merge_rolling(segments: list[Segment]) -> list[Segment]:
+    """Merge overlapping auto-caption segments.
 
-    # Merge overlapping auto-caption segments.
-    # YouTube auto-captions use a rolling window: each segment contains the
-    # tail of the previous segment plus new words. We extract only the NEW
-    # words from each segment to avoid duplication.
-    merged_texts: list[str] = []
+    YouTube auto-captions use a rolling window: each segment contains the
+    tail of the previous segment plus new words. We extract only the NEW
+    words from each segment to avoid duplication. Each text is lowercased
+    once, and every comparison is linear in the two segments' lengths.
+    """
     merged_segments: list[Segment] = []
+    prev = ""  # lowercased text of the last kept segment
     for seg in segments:
         text = seg.text.strip()
         if not text:
             continue
-        if merged_texts:
-            prev = merged_texts[-1].lower()
-            curr = text.lower()
+        curr = text.lower()
+        if prev:
             # If previous text is contained in current, keep only the new suffix
-            if prev in curr:
-                idx = curr.index(prev) + len(prev)
-                new_part = text[idx:].strip()
+            idx = curr.find(prev)
+            if idx >= 0:
+                new_part = text[idx + len(prev):].strip()
                 if new_part:
-                    merged_texts.append(text)
+                    prev = curr
                     merged_segments.append(Segment(text=new_part, start=seg.start, duration=seg.duration))
                 continue
             # If current is contained in previous, skip entirely (subset)
             if curr in prev:
                 continue
             # If they share a long common suffix/prefix overlap, extract new part
-            overlap = _find_overlap(prev, curr)
+            overlap = _find_overlap(prev, curr, int(len(curr) * 0.4) + 1)
             if overlap > len(curr) * 0.4:
                 new_part = text[overlap:].strip()
                 if new_part:
-                    merged_texts.append(text)
+                    prev = curr
                     merged_segments.append(Segment(text=new_part, start=seg.start, duration=seg.duration))
                 continue
-        merged_texts.append(text)
+        prev = curr
         merged_segments.append(Segment(text=text, start=seg.start, duration=seg.duration))
+    return merged_segments
+
+
+def clean_transcript(segments: list[Segment], gap_threshold: float = 5.0) -> str:
+    """Clean mode: dedup, strip fillers, paragraph by gaps."""
+    if not segments:
+        return ""
+
+    merged_segments = _merge_rolling(segments)
 
     if not merged_segments:
         return ""
@@ -399,3 +657,9 @@ def format_markdown(meta: VideoMeta, transcript_text: str) -> str:
 
 {transcript_text}
 """
+
+
+def transcript_from_markdown(md: str) -> str:
+    """Recover the transcript text from format_markdown output."""
+    _, sep, body = md.partition("\n---\n\n")
+    return (body if sep else md).rstrip("\n")
@@ -2,21 +2,13 @@
 import os
 import sys
 import hashlib
+import json
 
 VIDEO_EXTENSIONS = {".mkv", ".mp4", ".avi", ".mov", ".m4v", ".wmv"}
 DUP_DIR_NAME = "_DUPLICATES"
 MIN_YEAR = 1900
 MAX_YEAR = 2100
 
-def iter_video_files(root):
-    for dirpath, dirnames, filenames in os.walk(root):
-        if DUP_DIR_NAME in dirnames:
-            dirnames.remove(DUP_DIR_NAME)
-        for name in filenames:
-            ext = os.path.splitext(name)[1].lower()
-            if ext in VIDEO_EXTENSIONS:
-                yield os.path.join(dirpath, name)
-
 def sha1_of_file(path, block_size=1024 * 1024):
     h = hashlib.sha1()
     with open(path, "rb") as f:
@@ -55,147 +47,190 @@ def movie_folder_info(dirpath):
 def movie_info_from_name(stem):
     return parse_title_year(stem)
 
-def find_movie_root(dirpath, root):
-    dirpath = os.path.abspath(dirpath)
+def classify_video(path, folder_movie, movie_root, root_info, root):
+    dirpath = os.path.dirname(path)
+    filename = os.path.basename(path)
+    stem, ext = os.path.splitext(filename)
+    if folder_movie is not None:
+        title, year = folder_movie
+        expected_name = f"{title} ({year}){ext}"
+        if filename != expected_name:
+            return ("BAD_NAME", path, os.path.join(dirpath, expected_name), None)
+        return None
+    if movie_root is not None:
+        if os.path.basename(dirpath).lower() == "versions":
+            root_title, root_year = root_info
+            if movie_info_from_name(stem) == (root_title, root_year):
+                canonical_path = os.path.join(movie_root, f"{root_title} ({root_year}){ext}")
+                if os.path.abspath(path) != os.path.abspath(canonical_path):
+                    return ("LOOSE_FILE", path, canonical_path, movie_root)
+        return None
+    name_info = movie_info_from_name(stem)
+    if name_info is not None:
+        title, year = name_info
+        canonical_dir = os.path.join(root, f"{title} ({year})")
+        canonical_path = os.path.join(canonical_dir, f"{title} ({year}){ext}")
+        if os.path.abspath(path) != os.path.abspath(canonical_path):
+            return ("LOOSE_FILE", path, canonical_path, canonical_dir)
+    return None
+
+def scan_tree(root, structure=True, hashes=False):
+    # One walk for every mode. Each directory's title/year is parsed once and
+    # the nearest movie root is inherited from the parent, so nothing has to
+    # walk back up the tree per file.
     root = os.path.abspath(root)
-    while True:
-        if not dirpath.startswith(root):
-            return None
-        if movie_folder_info(dirpath) is not None:
-            return dirpath
-        parent = os.path.dirname(dirpath)
-        if parent == dirpath:
-            return None
-        dirpath = parent
+    movie_roots = {}
+    findings = []
+    sha_to_paths = {}
+    sizes = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        if DUP_DIR_NAME in dirnames:
+            dirnames.remove(DUP_DIR_NAME)
+        folder_movie = movie_folder_info(dirpath)
+        if folder_movie is not None:
+            movie_roots[dirpath] = (dirpath, folder_movie)
+        else:
+            movie_roots[dirpath] = movie_roots.get(os.path.dirname(dirpath), (None, None))
+        movie_root, root_info = movie_roots[dirpath]
+        for name in filenames:
+            ext = os.path.splitext(name)[1].lower()
+            if ext not in VIDEO_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, name)
+            if structure:
+                finding = classify_video(path, folder_movie, movie_root, root_info, root)
+                if finding is not None:
+                    findings.append(finding)
+            if hashes:
+                sha = sha1_of_file(path)
+                sha_to_paths.setdefault(sha, []).append(path)
+                sizes[path] = os.path.getsize(path)
+    return findings, sha_to_paths, sizes
 
 def build_sha_index(root):
-    sha_to_paths = {}
-    for path in iter_video_files(root):
-        sha = sha1_of_file(path)
-        sha_to_paths.setdefault(sha, []).append(path)
-    return sha_to_paths
+    return scan_tree(root, structure=False, hashes=True)[1]
 
-def report_structure(root):
+def build_plan(root, findings, sha_to_paths, sizes):
     root = os.path.abspath(root)
-    print("MODE\tDETAIL\tCURRENT_PATH\tSUGGESTED_PATH_OR_INFO")
-    for path in iter_video_files(root):
-        dirpath = os.path.dirname(path)
-        filename = os.path.basename(path)
-        stem, ext = os.path.splitext(filename)
-        folder_movie = movie_folder_info(dirpath)
-        if folder_movie is not None:
-            title, year = folder_movie
-            expected_name = f"{title} ({year}){ext}"
-            if filename != expected_name:
-                expected_path = os.path.join(dirpath, expected_name)
-                print(f"BAD_NAME\tfile\t{path}\t{expected_path}")
-            continue
-        movie_root = find_movie_root(dirpath, root)
-        if movie_root is not None:
-            base = os.path.basename(dirpath).lower()
-            if base == "versions":
-                root_title, root_year = movie_folder_info(movie_root)
-                name_info = movie_info_from_name(stem)
-                if name_info == (root_title, root_year):
-                    canonical_path = os.path.join(movie_root, f"{root_title} ({root_year}){ext}")
-                    if os.path.abspath(path) != os.path.abspath(canonical_path):
-                        print(f"LOOSE_FILE\tfile\t{path}\t{canonical_path}")
+    plan = []
+    for mode, src, dst, dst_dir in findings:
+        if mode == "BAD_NAME":
+            plan.append({"op": "rename", "src": src, "dst": dst})
+    for mode, src, dst, dst_dir in findings:
+        if mode == "LOOSE_FILE":
+            plan.append({"op": "move", "src": src, "dst_dir": dst_dir, "dst": dst})
+    dup_root = os.path.join(root, DUP_DIR_NAME)
+    for sha, paths in sha_to_paths.items():
+        if len(paths) <= 1:
             continue
-        name_info = movie_info_from_name(stem)
-        if name_info is not None:
-            title, year = name_info
-            canonical_dir = os.path.join(root, f"{title} ({year})")
-            canonical_path = os.path.join(canonical_dir, f"{title} ({year}){ext}")
-            if os.path.abspath(path) != os.path.abspath(canonical_path):
-                print(f"LOOSE_FILE\tfile\t{path}\t{canonical_path}")
-
-def fix_structure(root):
+        ranked = sorted(((sizes[p], p) for p in paths), reverse=True)
+        for _, dup_path in ranked[1:]:
+            target_dir = os.path.join(dup_root, sha)
+            plan.append({
+                "op": "move_duplicate",
+                "sha": sha,
+                "src": dup_path,
+                "dst_dir": target_dir,
+                "dst": os.path.join(target_dir, os.path.basename(dup_path)),
+            })
+    return plan
+
+def write_plan(plan, plan_path):
+    tmp_path = plan_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        for entry in plan:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, plan_path)
+
+def read_plan(plan_path):
+    with open(plan_path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def apply_plan(root, plan):
     root = os.path.abspath(root)
-    renames = []
-    moves = []
-    for path in iter_video_files(root):
-        dirpath = os.path.dirname(path)
-        filename = os.path.basename(path)
-        stem, ext = os.path.splitext(filename)
-        folder_movie = movie_folder_info(dirpath)
-        if folder_movie is not None:
-            title, year = folder_movie
-            expected_name = f"{title} ({year}){ext}"
-            if filename != expected_name:
-                expected_path = os.path.join(dirpath, expected_name)
-                if not os.path.exists(expected_path):
-                    renames.append((path, expected_path))
+    prefix = root.rstrip(os.sep) + os.sep
+    for entry in plan:
+        src, dst = entry["src"], entry["dst"]
+        if not (os.path.abspath(src).startswith(prefix) and os.path.abspath(dst).startswith(prefix)):
+            sys.stdout.write(f"SKIPPED_OUTSIDE_ROOT\t{src}\t{dst}\n")
             continue
-        movie_root = find_movie_root(dirpath, root)
-        if movie_root is not None:
-            base = os.path.basename(dirpath).lower()
-            if base == "versions":
-                root_title, root_year = movie_folder_info(movie_root)
-                name_info = movie_info_from_name(stem)
-                if name_info == (root_title, root_year):
-                    canonical_path = os.path.join(movie_root, f"{root_title} ({root_year}){ext}")
-                    if os.path.abspath(path) != os.path.abspath(canonical_path) and not os.path.exists(canonical_path):
-                        moves.append((path, movie_root, canonical_path))
+        if not os.path.exists(src) or os.path.exists(dst):
             continue
-        name_info = movie_info_from_name(stem)
-        if name_info is not None:
-            title, year = name_info
-            canonical_dir = os.path.join(root, f"{title} ({year})")
-            canonical_path = os.path.join(canonical_dir, f"{title} ({year}){ext}")
-            if os.path.abspath(path) != os.path.abspath(canonical_path) and not os.path.exists(canonical_path):
-                moves.append((path, canonical_dir, canonical_path))
-    for src, dst in renames:
-        os.rename(src, dst)
-        sys.stdout.write(f"RENAMED\t{src}\t{dst}\n")
-    for src, dst_dir, dst in moves:
-        os.makedirs(dst_dir, exist_ok=True)
+        if entry.get("dst_dir"):
+            os.makedirs(entry["dst_dir"], exist_ok=True)
         os.rename(src, dst)
-        sys.stdout.write(f"MOVED\t{src}\t{dst}\n")
-
-def dup_report(root):
-    root = os.path.abspath(root)
-    print("MODE\tDETAIL\tCURRENT_PATH\tSUGGESTED_PATH_OR_INFO")
-    sha_to_paths = build_sha_index(root)
+        if entry["op"] == "rename":
+            sys.stdout.write(f"RENAMED\t{src}\t{dst}\n")
+        elif entry["op"] == "move":
+            sys.stdout.write(f"MOVED\t{src}\t{dst}\n")
+        else:
+            sys.stdout.write(f"MOVED_DUPLICATE\t{entry['sha']}\t{src}\t{dst}\n")
+
+def print_findings(findings):
+    for mode, src, dst, _ in findings:
+        print(f"{mode}\tfile\t{src}\t{dst}")
+
+def print_duplicates(sha_to_paths):
     for sha, paths in sha_to_paths.items():
         if len(paths) > 1:
             kept = paths[0]
             for dup in paths[1:]:
                 print(f"DUPLICATE\t{sha}\t{kept}\t{dup}")
 
+def report_structure(root):
+    print("MODE\tDETAIL\tCURRENT_PATH\tSUGGESTED_PATH_OR_INFO")
+    findings, _, _ = scan_tree(root)
+    print_findings(findings)
+
+def fix_structure(root, plan_path=None):
+    if plan_path is not None:
+        apply_plan(root, read_plan(plan_path))
+        return
+    findings, _, _ = scan_tree(root)
+    apply_plan(root, build_plan(root, findings, {}, {}))
+
+def dup_report(root):
+    print("MODE\tDETAIL\tCURRENT_PATH\tSUGGESTED_PATH_OR_INFO")
+    print_duplicates(build_sha_index(root))
+
 def dup_fix(root):
-    root = os.path.abspath(root)
-    sha_to_paths = build_sha_index(root)
-    dup_root = os.path.join(root, DUP_DIR_NAME)
-    for sha, paths in sha_to_paths.items():
-        if len(paths) <= 1:
-            continue
-        sizes = [(os.path.getsize(p), p) for p in paths]
-        sizes.sort(reverse=True)
-        keep = sizes[0][1]
-        for _, dup_path in sizes[1:]:
-            target_dir = os.path.join(dup_root, sha)
-            os.makedirs(target_dir, exist_ok=True)
-            target_path = os.path.join(target_dir, os.path.basename(dup_path))
-            if not os.path.exists(target_path):
-                os.rename(dup_path, target_path)
-                sys.stdout.write(f"MOVED_DUPLICATE\t{sha}\t{dup_path}\t{target_path}\n")
+    _, sha_to_paths, sizes = scan_tree(root, structure=False, hashes=True)
+    apply_plan(root, build_plan(root, [], sha_to_paths, sizes))
+
+def scan_report(root, plan_path):
+    print("MODE\tDETAIL\tCURRENT_PATH\tSUGGESTED_PATH_OR_INFO")
+    findings, sha_to_paths, sizes = scan_tree(root, structure=True, hashes=True)
+    print_findings(findings)
+    print_duplicates(sha_to_paths)
+    write_plan(build_plan(root, findings, sha_to_paths, sizes), plan_path)
 
 def main():
     if len(sys.argv) < 3:
         print("Usage: media_check.py [report|fix|dup-report|dup-fix] ROOT_DIR", file=sys.stderr)
+        print("       media_check.py scan ROOT_DIR PLAN_FILE", file=sys.stderr)
+        print("       media_check.py fix ROOT_DIR PLAN_FILE", file=sys.stderr)
         sys.exit(1)
     mode = sys.argv[1]
     root = sys.argv[2]
+    plan_path = sys.argv[3] if len(sys.argv) > 3 else None
     if mode == "report":
         report_structure(root)
+    elif mode == "scan":
+        if plan_path is None:
+            print("scan requires a PLAN_FILE", file=sys.stderr)
+            sys.exit(1)
+        scan_report(root, plan_path)
     elif mode == "fix":
-        fix_structure(root)
+        fix_structure(root, plan_path)
     elif mode == "dup-report":
         dup_report(root)
     elif mode == "dup-fix":
         dup_fix(root)
     else:
-        print("Unknown mode, use 'report', 'fix', 'dup-report', or 'dup-fix'", file=sys.stderr)
+        print("Unknown mode, use 'report', 'scan', 'fix', 'dup-report', or 'dup-fix'", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":